@@ -0,0 +1,140 @@
+"""
+Physics on a background thread
+
+In the default loop the physics step and the drawing alternate in one
+thread, so a slow frame (thousands of connections on screen) slows the
+layout down, and a heavy force evaluation makes the window stutter.
+PhysicsThread decouples the two:
+
+- The physics thread owns the pymunk space. It steps the simulation at a
+  fixed rate and publishes the body positions to a SnapshotBuffer after
+  every step.
+- The pygame thread draws from the latest snapshot and never touches the
+  space. Mouse drags become commands ('grab', 'drag', 'release') that the
+  physics thread applies before its next step.
+- Rare structural changes (a new network, a different time step control)
+  run under the physics lock, which is held for the whole of every step.
+
+A simulation uses the thread when async_physics is set before run(), or
+from the command line:
+
+    python main_enhanced.py --async-physics
+"""
+
+import queue
+import threading
+import time
+
+import numpy as np
+
+
+class SnapshotBuffer:
+    """
+    Double-buffered (N, 2) position array for one writer and any readers.
+
+    The writer fills the back buffer without holding the lock and then
+    swaps it to the front, so readers never see a half-written snapshot
+    and never wait for more than the swap.
+    """
+
+    def __init__(self):
+        self._buffers = [np.zeros((0, 2)), np.zeros((0, 2))]
+        self._front = 0
+        self._lock = threading.Lock()
+        self.version = 0  # Number of snapshots published
+
+    def publish(self, positions):
+        """Make a copy of positions the latest snapshot"""
+        back = 1 - self._front
+        if self._buffers[back].shape != positions.shape:
+            self._buffers[back] = np.empty(positions.shape)
+        self._buffers[back][...] = positions
+        with self._lock:
+            self._front = back
+            self.version += 1
+
+    def read(self):
+        """Return (positions, version) of the latest snapshot; positions is a copy"""
+        with self._lock:
+            return self._buffers[self._front].copy(), self.version
+
+
+class PhysicsThread:
+    """
+    Steps a simulation on a daemon thread and publishes its positions.
+
+    Args:
+        simulation: SocialSimulation to step (its step_physics,
+            body_positions and apply_mouse_command methods are used)
+        steps_per_second: Target step rate, or None to step as fast as
+            possible. 60 matches the window loop, so the layout evolves at
+            the same speed as in the default mode
+    """
+
+    def __init__(self, simulation, steps_per_second=60.0):
+        self.simulation = simulation
+        self.steps_per_second = steps_per_second
+        self.snapshot = SnapshotBuffer()
+        self.commands = queue.SimpleQueue()
+        self.lock = threading.RLock()
+        self.steps = 0
+        self.error = None  # Exception that stopped the thread
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def send(self, command):
+        """Queue a mouse command for the physics thread"""
+        self.commands.put(command)
+
+    def publish(self):
+        """Publish the current body positions (call with the lock held)"""
+        self.snapshot.publish(self.simulation.body_positions())
+
+    def _drain(self):
+        while True:
+            try:
+                command = self.commands.get_nowait()
+            except queue.Empty:
+                return
+            self.simulation.apply_mouse_command(command)
+
+    def _run(self):
+        interval = 1.0 / self.steps_per_second if self.steps_per_second else 0.0
+        deadline = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                with self.lock:
+                    self._drain()
+                    self.simulation.step_physics()
+                    self.publish()
+                self.steps += 1
+                if interval:
+                    deadline += interval
+                    delay = deadline - time.perf_counter()
+                    if delay > 0:
+                        self._stop.wait(delay)
+                    else:
+                        # Behind schedule: carry on without trying to catch up
+                        deadline = time.perf_counter()
+        except Exception as e:
+            self.error = e
+
+    def start(self):
+        """Publish the current positions and start stepping"""
+        with self.lock:
+            self.publish()
+        self._stop.clear()
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name='physics', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop stepping and wait for the current step to finish"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
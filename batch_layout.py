@@ -0,0 +1,282 @@
+"""
+Batch layout jobs from the command line
+
+Lays out one or more networks without a display and writes the final
+node positions and layout metrics to disk, one JSON file per network.
+Networks can be built in ('basic', 'clique', 'large'), generated
+('large' with --nodes) or loaded from JSON files holding the usual
+{'nodes': [...], 'connections': [...]} dictionary. Several inputs are laid
+out in parallel by a pool of worker processes.
+
+Each job runs until the layout has converged or the step budget is used
+up. The layout counts as converged once the nodes' average net movement
+over a check window drops below --tolerance pixels per second; using net
+movement rather than instantaneous speed ignores collision jitter around
+a settled layout.
+
+With --cache (and a --seed), finished layouts are stored in an on-disk
+LayoutCache keyed by the network and all layout settings, so repeating a
+job returns its layout without simulating again.
+
+Examples:
+    python batch_layout.py basic clique --output-dir layouts
+    python batch_layout.py basic clique --seed 1 --cache
+    python batch_layout.py data/*.json --force-model fruchterman_reingold \\
+        --param rest_length=80 --steps 5000 --workers 8
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from layout_cache import LayoutCache, settle_layout
+from step_control import StepController
+
+BUILTIN_NETWORKS = ('basic', 'clique', 'large')
+
+# Parameters that are attributes of the simulation rather than force_params
+SIMULATION_PARAMS = ('attraction_force', 'repulsion_force', 'repulsion_distance', 'damping', 'group_gravity')
+
+
+def load_network(source, nodes=None, connection_probability=0.05, rng=None):
+    """
+    Load a network dictionary.
+
+    Args:
+        source: Built-in network name or path to a JSON file
+        nodes: Number of nodes of a generated 'large' network
+        connection_probability: Connection probability of a generated network
+        rng: Seed or random source for generated networks
+    """
+    from social_network_data import create_social_network, create_clique_network, create_large_network
+
+    if source == 'basic':
+        return create_social_network()
+    if source == 'clique':
+        return create_clique_network()
+    if source == 'large':
+        if nodes:
+            return create_large_network(nodes, connection_probability, rng=rng)
+        return create_large_network(30, 0.4, rng=rng)
+
+    with open(source) as f:
+        network_data = json.load(f)
+    if 'nodes' not in network_data or 'connections' not in network_data:
+        raise ValueError(f"{source} must contain 'nodes' and 'connections'")
+    return network_data
+
+
+def parse_param(text):
+    """Parse a NAME=VALUE option into (name, number or None)"""
+    name, separator, value = text.partition('=')
+    if not separator or not name:
+        raise ValueError(f"Expected NAME=VALUE, got {text!r}")
+    if value.lower() == 'none':
+        return name, None
+    return name, float(value)
+
+
+def run_layout(network_data, force_model='linear_spring', params=None, max_steps=2000,
+               tolerance=1.0, check_interval=60, simulation='enhanced', width=1400, height=900,
+               seed=None, initial_layout='random', step_control=None, cache=None):
+    """
+    Lay out a network headlessly.
+
+    Args:
+        network_data: Network dictionary
+        force_model: Registered force model name
+        params: Dictionary of simulation and force model parameters
+        max_steps: Step budget
+        tolerance: Stop once the average net node movement between two
+            checks drops below this (pixels per simulated second)
+        check_interval: Steps between convergence checks
+        simulation: 'enhanced' (walled window) or 'basic'
+        width, height: Size of the simulated window
+        seed: Seed for the initial positions; the same seed gives the same
+            layout on the same machine
+        initial_layout: Initial placement registered in initial_layouts
+        step_control: Optional step_control.StepController (adaptive step
+            and cooling schedule)
+        cache: Optional layout_cache.LayoutCache; a layout with a seed
+            is looked up before simulating and stored afterwards
+
+    Returns:
+        Dictionary with the positions, metrics, step count and timing
+    """
+    from video_export import create_headless_simulation
+
+    if simulation == 'basic':
+        from main import SocialClusteringSimulation as simulation_class
+    else:
+        from main_enhanced import EnhancedSocialClusteringSimulation as simulation_class
+
+    sim = create_headless_simulation(simulation_class, width=width, height=height, seed=seed)
+    sim.force_model = force_model
+    sim.initial_layout = initial_layout
+    sim.step_control = step_control
+    for name, value in (params or {}).items():
+        if name in SIMULATION_PARAMS:
+            setattr(sim, name, value)
+        else:
+            sim.force_params[name] = value
+    sim.create_network(network_data)
+
+    result = {
+        'force_model': force_model,
+        'params': dict(params or {}),
+        'seed': seed,
+        'initial_layout': initial_layout,
+    }
+    result.update(settle_layout(sim, max_steps, tolerance, check_interval, cache))
+    return result
+
+
+def run_job(job):
+    """
+    Load, lay out and save one network (runs in a worker process).
+
+    Errors are returned as {'source': ..., 'error': message} so that one
+    bad input does not stop the rest of the batch.
+    """
+    try:
+        network_data = load_network(job['source'], job.get('nodes'), job.get('connection_probability', 0.05),
+                                    rng=job['layout'].get('seed'))
+        result = run_layout(network_data, **job['layout'])
+    except Exception as e:
+        return {'source': job['source'], 'error': f"{type(e).__name__}: {e}"}
+    result['source'] = job['source']
+    result['output'] = job['output']
+    with open(job['output'], 'w') as out:
+        json.dump(result, out, indent=2)
+    return result
+
+
+def output_paths(sources, output_dir):
+    """Return one unique <output_dir>/<name>.layout.json path per source"""
+    paths = []
+    used = set()
+    for source in sources:
+        stem = os.path.splitext(os.path.basename(source))[0]
+        name = stem
+        suffix = 1
+        while name in used:
+            suffix += 1
+            name = f"{stem}_{suffix}"
+        used.add(name)
+        paths.append(os.path.join(output_dir, f"{name}.layout.json"))
+    return paths
+
+
+def run_batch(sources, output_dir='layouts', workers=None, nodes=None, connection_probability=0.05,
+              progress=None, **layout_options):
+    """
+    Lay out several networks in parallel.
+
+    Args:
+        sources: Built-in network names or JSON file paths
+        output_dir: Directory for the .layout.json files
+        workers: Number of worker processes (1 runs in this process)
+        nodes, connection_probability: Size of generated 'large' networks
+        progress: Optional callback called with each finished result
+        layout_options: Passed on to run_layout
+
+    Returns:
+        List of results in the order of sources (failed jobs have an
+        'error' entry instead of positions)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [{'source': source, 'output': path, 'nodes': nodes,
+             'connection_probability': connection_probability, 'layout': layout_options}
+            for source, path in zip(sources, output_paths(sources, output_dir))]
+
+    if workers == 1 or len(jobs) == 1:
+        results = []
+        for job in jobs:
+            results.append(run_job(job))
+            if progress:
+                progress(results[-1])
+        return results
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(run_job, jobs):
+            results.append(result)
+            if progress:
+                progress(result)
+    return results
+
+
+def main(argv=None):
+    """Command line entry point for batch layouts"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Lay out networks headlessly and save positions and metrics")
+    parser.add_argument('inputs', nargs='+', help=f"network JSON files or built-in names ({', '.join(BUILTIN_NETWORKS)})")
+    parser.add_argument('--output-dir', default='layouts')
+    parser.add_argument('--force-model', default='linear_spring')
+    parser.add_argument('--param', action='append', default=[], metavar='NAME=VALUE',
+                        help="simulation or force model parameter (repeatable)")
+    parser.add_argument('--steps', type=int, default=2000, help="step budget per network")
+    parser.add_argument('--tolerance', type=float, default=1.0,
+                        help="stop when the average net node movement (px/s) drops below this")
+    parser.add_argument('--simulation', choices=['enhanced', 'basic'], default='enhanced')
+    parser.add_argument('--width', type=int, default=1400)
+    parser.add_argument('--height', type=int, default=900)
+    parser.add_argument('--nodes', type=int, default=None, help="size of generated 'large' networks")
+    parser.add_argument('--connection-probability', type=float, default=0.05)
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--initial-layout', default='random',
+                        help="initial placement: random, group, spectral or bfs")
+    parser.add_argument('--adaptive', action='store_true',
+                        help="adapt the time step to the layout energy (damping then applies once per step)")
+    parser.add_argument('--temperature', type=float, default=None, metavar='PX',
+                        help="cap on the per-step node movement, cooled every step (implies --adaptive)")
+    parser.add_argument('--cooling', type=float, default=0.99, help="temperature factor per step")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="seed for generated networks and initial positions")
+    parser.add_argument('--cache', nargs='?', const='', default=None, metavar='DIR',
+                        help="reuse and store converged layouts (needs --seed; default directory "
+                             "~/.cache/social_clustering/layouts)")
+    parser.add_argument('--cache-size', type=float, default=200, metavar='MB',
+                        help="evict least recently used layouts beyond this size")
+    args = parser.parse_args(argv)
+    if args.cache is not None and args.seed is None:
+        parser.error("--cache needs --seed")
+    cache = None
+    if args.cache is not None:
+        cache = LayoutCache(args.cache or None, max_bytes=int(args.cache_size * 1024 * 1024))
+
+    try:
+        params = dict(parse_param(text) for text in args.param)
+        step_control = None
+        if args.adaptive or args.temperature is not None:
+            step_control = StepController(temperature=args.temperature, cooling=args.cooling)
+    except ValueError as e:
+        parser.error(str(e))
+
+    def report(result):
+        if 'error' in result:
+            print(f"{result['source']}: failed ({result['error']})")
+            return
+        status = "converged" if result['converged'] else "step budget reached"
+        if result.get('cached'):
+            status += ", cached"
+        metrics = result['metrics']
+        print(f"{result['source']}: {metrics['nodes']} nodes, {result['steps']} steps ({status}), "
+              f"{metrics['spatial_clusters']} clusters, purity {metrics['cluster_purity']:.2f}, "
+              f"{result['seconds']:.1f}s")
+
+    results = run_batch(args.inputs, output_dir=args.output_dir, workers=args.workers,
+                        nodes=args.nodes, connection_probability=args.connection_probability,
+                        progress=report, force_model=args.force_model, params=params,
+                        max_steps=args.steps, tolerance=args.tolerance, simulation=args.simulation,
+                        width=args.width, height=args.height, seed=args.seed,
+                        initial_layout=args.initial_layout, step_control=step_control, cache=cache)
+    failed = sum(1 for result in results if 'error' in result)
+    print(f"Wrote {len(results) - failed} layouts to {args.output_dir}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
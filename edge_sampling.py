@@ -0,0 +1,117 @@
+"""
+Stochastic edge sampling for dense networks
+
+Attraction costs one pass over the edges per step, and dense networks
+(create_large_network with a high connection probability) have close to
+N^2 / 2 of them. With edge sampling, a force model only visits a random
+sample of about rate * E edges per step:
+
+- Edges are drawn in proportion to their weight (connection strength),
+  so strong ties are visited more often. The cumulative weight is cut
+  into k equal slices and one draw falls in each (stratified sampling):
+  every stretch of the edge list, and so every node, gets its share of
+  the draws, and the draws come out sorted, which keeps the lookups
+  cache friendly.
+- Every drawn edge's force is multiplied by W / (k * w), where W is the
+  total weight, k the number of draws and w the edge's weight. The
+  expected force on every node stays the same as with all edges, and the
+  noise averages out over the steps like a small extra temperature.
+
+Drawing is O(k log E) (binary searches in the cumulative weights), so a
+step never touches all edges. A force model samples when its
+edge_sample_rate parameter is below 1:
+
+    model = create_force_model('linear_spring', edge_sample_rate=0.1, edge_sample_seed=1)
+
+A SampleRateController picks the rate from the measured time of the force
+pass, so dense layouts stay interactive. A simulation uses one when its
+edge_sampling attribute is set:
+
+    simulation.edge_sampling = SampleRateController(target_time=0.008)
+"""
+
+import math
+
+import numpy as np
+
+
+def sample_edges(weights, cumulative, rate, generator, edges=slice(None)):
+    """
+    Draw about rate times the edges in proportion to their weights.
+
+    Args:
+        weights: Weight of every edge
+        cumulative: np.cumsum(weights)
+        rate: Fraction of the edges to draw (0 < rate < 1)
+        generator: numpy.random.Generator
+        edges: Slice of the edges to draw from (one part of the forces)
+
+    Returns:
+        (indices, scale): drawn edge indices (repeats possible) and the
+        factor each drawn edge's force must be multiplied by
+    """
+    start, stop, _ = edges.indices(len(weights))
+    if stop <= start:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    low = cumulative[start - 1] if start else 0.0
+    high = cumulative[stop - 1]
+    count = max(1, math.ceil(rate * (stop - start)))
+    draws = low + (np.arange(count) + generator.random(count)) * ((high - low) / count)
+    indices = np.searchsorted(cumulative, draws, side='right')
+    np.clip(indices, start, stop - 1, out=indices)
+    return indices, (high - low) / (count * weights[indices])
+
+
+class SampleRateController:
+    """
+    Adapt the edge sample rate to a time budget for the force pass.
+
+    After every step the rate is multiplied by (target_time / time) **
+    gain and kept within [min_rate, max_rate]. A gain below 1 spreads each
+    correction over a few steps, so timing noise (a garbage collection, a
+    busy CPU) does not make the rate jump. The rate rises back to max_rate
+    on networks that fit the budget anyway.
+
+    Args:
+        target_time: Seconds per step the force pass should take
+        min_rate, max_rate: Limits of the sample rate
+        gain: Exponent of the correction, in (0, 1]
+    """
+
+    def __init__(self, target_time=0.008, min_rate=0.01, max_rate=1.0, gain=0.5):
+        if not 0 < min_rate <= max_rate <= 1:
+            raise ValueError("sample rates must satisfy 0 < min_rate <= max_rate <= 1")
+        if not 0 < gain <= 1:
+            raise ValueError("gain must be in (0, 1]")
+        self.target_time = target_time
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.gain = gain
+        self.reset()
+
+    def reset(self):
+        """Start again from the full rate, without timing history"""
+        self.rate = self.max_rate
+        self.last_time = None
+
+    def settings(self):
+        """Return the constructor arguments of this controller as a dictionary"""
+        return {
+            'target_time': self.target_time, 'min_rate': self.min_rate, 'max_rate': self.max_rate,
+            'gain': self.gain,
+        }
+
+    def update(self, elapsed):
+        """
+        Adapt the rate to the time of the last force pass.
+
+        Args:
+            elapsed: Seconds the force pass took at the current rate
+
+        Returns:
+            Sample rate to use for the next step
+        """
+        self.last_time = elapsed
+        factor = (self.target_time / max(elapsed, 1e-9)) ** self.gain
+        self.rate = min(max(self.rate * factor, self.min_rate), self.max_rate)
+        return self.rate
@@ -9,6 +9,7 @@ This file shows how to:
 """
 
 from social_network_data import create_social_network, create_clique_network, create_large_network
+from network_analytics import NetworkAnalytics
 from main import SocialClusteringSimulation
 from main_enhanced import EnhancedSocialClusteringSimulation
 
@@ -58,16 +59,25 @@ def example_network_analysis():
     for name, network in networks:
         nodes = network['nodes']
         connections = network['connections']
+        analytics = NetworkAnalytics(network)
+        summary = analytics.summary()
         
         print(f"\n{name}:")
-        print(f"  Nodes: {len(nodes)}")
-        print(f"  Connections: {len(connections)}")
+        print(f"  Nodes: {summary['nodes']}")
+        print(f"  Connections: {summary['connections']}")
         print(f"  Groups: {len(set(n.get('group', 'A') for n in nodes))}")
+        print(f"  Connection density: {summary['density']:.3f}")
+        print(f"  Average degree: {summary['average_degree']:.2f} (max {summary['max_degree']})")
+        print(f"  Clustering coefficient: {summary['average_clustering']:.3f} "
+              f"(global {summary['global_clustering']:.3f})")
         
-        # Calculate connection density
-        max_connections = len(nodes) * (len(nodes) - 1) // 2
-        density = len(connections) / max_connections
-        print(f"  Connection density: {density:.3f}")
+        # Most central individuals
+        pagerank = analytics.pagerank()
+        betweenness = analytics.betweenness(samples=min(50, len(nodes)), rng=0)
+        top_pagerank = max(pagerank, key=pagerank.get)
+        top_betweenness = max(betweenness, key=betweenness.get)
+        print(f"  Highest PageRank: node {top_pagerank} ({pagerank[top_pagerank]:.3f})")
+        print(f"  Highest betweenness: node {top_betweenness} ({betweenness[top_betweenness]:.3f})")
         
         # Analyze connection strengths
         strengths = [conn.get('strength', 'medium') for conn in connections]
@@ -0,0 +1,220 @@
+"""
+Per-phase frame profiler
+
+Measures how long each phase of a frame takes (forces, physics step,
+drawing, ...) with time.perf_counter_ns, keeps a rolling window of recent
+frames for percentiles, and can write one row per frame to a CSV or JSONL
+trace file.
+
+Usage:
+    profiler = FrameProfiler(['apply_social_forces', 'space_step'])
+    profiler.enabled = True
+    with profiler.phase('apply_social_forces'):
+        simulation.apply_social_forces()
+    profiler.end_frame()
+
+Phases may be nested; each phase records only its own (exclusive) time,
+so the phase times add up to the frame time. When the profiler is
+disabled, phase() returns a shared no-op context manager and end_frame()
+returns immediately, so leaving the instrumentation in place costs next
+to nothing.
+"""
+
+import contextlib
+import csv
+import json
+from collections import deque
+from time import perf_counter_ns
+
+_NO_OP = contextlib.nullcontext()
+
+
+class _PhaseTimer:
+    """Reusable context manager that times one named phase"""
+
+    __slots__ = ('profiler', 'name', 'start', 'child_time')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0
+        self.child_time = 0
+
+    def __enter__(self):
+        self.child_time = 0
+        self.profiler._stack.append(self)
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = perf_counter_ns() - self.start
+        stack = self.profiler._stack
+        stack.pop()
+        if stack:
+            stack[-1].child_time += elapsed
+        current = self.profiler._current
+        current[self.name] = current.get(self.name, 0) + elapsed - self.child_time
+        return False
+
+
+class FrameProfiler:
+    """
+    Rolling per-phase timings for a frame loop.
+
+    Args:
+        phases: Phase names in display order (others are added when first
+            used)
+        window: Number of recent frames kept for percentiles
+    """
+
+    def __init__(self, phases=(), window=240):
+        self.enabled = False
+        self.phases = list(phases)
+        self.window = window
+        self.history = {name: deque(maxlen=window) for name in self.phases}
+        self.frame_times = deque(maxlen=window)
+        self.frame_count = 0
+        self._timers = {}
+        self._stack = []
+        self._current = {}
+        self._frame_start = None
+        self._trace = None
+        self._trace_writer = None
+        self._trace_columns = []
+
+    def toggle(self):
+        """Switch profiling on or off, starting from a clean window"""
+        self.enabled = not self.enabled
+        self.reset()
+        return self.enabled
+
+    def phase(self, name):
+        """Return a context manager that times the named phase"""
+        if not self.enabled:
+            return _NO_OP
+        timer = self._timers.get(name)
+        if timer is None:
+            timer = self._timers[name] = _PhaseTimer(self, name)
+            if name not in self.history:
+                self.phases.append(name)
+                self.history[name] = deque(maxlen=self.window)
+        if self._frame_start is None:
+            self._frame_start = perf_counter_ns()
+        return timer
+
+    def end_frame(self):
+        """Close the current frame: store its phase times and trace them"""
+        if not self.enabled or self._frame_start is None:
+            return
+
+        total = perf_counter_ns() - self._frame_start
+        self.frame_times.append(total)
+        for name in self.phases:
+            self.history[name].append(self._current.get(name, 0))
+
+        if self._trace is not None:
+            self._write_trace_row(total)
+
+        self.frame_count += 1
+        self._current = {}
+        self._frame_start = None
+
+    def reset(self):
+        """Forget all recorded frames"""
+        for samples in self.history.values():
+            samples.clear()
+        self.frame_times.clear()
+        self._stack = []
+        self._current = {}
+        self._frame_start = None
+
+    # --- Statistics ---
+
+    @staticmethod
+    def _percentiles(samples, quantiles):
+        if not samples:
+            return [0.0 for _ in quantiles]
+        ordered = sorted(samples)
+        last = len(ordered) - 1
+        return [ordered[min(last, int(round(q * last)))] / 1e6 for q in quantiles]
+
+    def percentiles(self, name=None, quantiles=(0.5, 0.95, 0.99)):
+        """
+        Return percentiles in milliseconds for a phase (or the whole frame
+        if name is None) over the rolling window.
+        """
+        samples = self.frame_times if name is None else self.history.get(name, ())
+        return self._percentiles(samples, quantiles)
+
+    def summary(self):
+        """Return {phase: (p50, p95, p99)} in milliseconds, plus 'frame'"""
+        result = {name: tuple(self.percentiles(name)) for name in self.phases}
+        result['frame'] = tuple(self.percentiles())
+        return result
+
+    # --- Trace output ---
+
+    def open_trace(self, path):
+        """
+        Start writing one row per frame to path.
+
+        Files ending in .jsonl get one JSON object per line, anything else
+        is written as CSV with one nanosecond column per phase.
+        """
+        self.close_trace()
+        self._trace = open(path, 'w', newline='')
+        if path.lower().endswith('.jsonl'):
+            self._trace_writer = None
+        else:
+            self._trace_writer = csv.writer(self._trace)
+            self._trace_writer.writerow(['frame', 'frame_ns'] + [f"{name}_ns" for name in self.phases])
+            self._trace_columns = list(self.phases)
+
+    def _write_trace_row(self, total):
+        if self._trace_writer is None:
+            row = {'frame': self.frame_count, 'frame_ns': total}
+            row.update({f"{name}_ns": ns for name, ns in self._current.items()})
+            self._trace.write(json.dumps(row) + '\n')
+        else:
+            self._trace_writer.writerow(
+                [self.frame_count, total] + [self._current.get(name, 0) for name in self._trace_columns])
+
+    def close_trace(self):
+        if self._trace is not None:
+            self._trace.close()
+        self._trace = None
+        self._trace_writer = None
+
+    # --- Overlay ---
+
+    def overlay_rows(self):
+        """Rows of (label, p50, p95, p99) for an on-screen timing panel"""
+        return [(name, f"{p50:.2f}", f"{p95:.2f}", f"{p99:.2f}")
+                for name, (p50, p95, p99) in self.summary().items()]
+
+    def draw_overlay(self, surface, topright, font):
+        """Draw the timing panel on a pygame surface with its top-right corner at topright"""
+        import pygame
+
+        rows = [("Frame profile (ms)", "p50", "p95", "p99")] + self.overlay_rows()
+        line_height = font.get_linesize()
+        label_width = max(font.size(row[0])[0] for row in rows)
+        column_width = font.size("000.00")[0] + 8
+        width = label_width + 3 * column_width + 20
+        x = topright[0] - width
+        y = topright[1]
+
+        background = pygame.Surface((width, line_height * len(rows) + 10))
+        background.set_alpha(200)
+        background.fill((20, 20, 20))
+        surface.blit(background, (x, y))
+
+        for i, row in enumerate(rows):
+            color = (255, 255, 255) if i == 0 else (200, 200, 200)
+            row_y = y + 5 + i * line_height
+            surface.blit(font.render(row[0], True, color), (x + 10, row_y))
+            for column, value in enumerate(row[1:], 1):
+                # Right-align the numbers in each column
+                text = font.render(value, True, color)
+                right = x + 10 + label_width + column * column_width
+                surface.blit(text, (right - text.get_width(), row_y))
@@ -0,0 +1,266 @@
+"""
+Headless runs and profiling for the Social Clustering Simulation
+
+Runs a simulation for a fixed number of physics steps without a window
+and optionally profiles the run with:
+- cProfile, written as a .pstats file (open with `python -m pstats` or
+  snakeviz)
+- a built-in sampling profiler thread, written as a collapsed-stack file
+  (one "frame;frame;... count" line per stack) that flamegraph.pl,
+  speedscope or inferno can turn into a flame graph
+
+Every run also writes a .json file with the network size, force model,
+step count and timing. The collapsed stacks are rooted in a frame naming
+the network and force model, so flame graphs of different runs are easy
+to tell apart.
+
+Both main.py and main_enhanced.py accept these options:
+
+    python main_enhanced.py --headless 2000 --nodes 1000 --profile sample
+    python main.py --headless 5000 --profile cprofile --profile-output basic
+"""
+
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILERS = ('cprofile', 'sample')
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that samples the call stack of one thread.
+
+    A daemon thread wakes up every interval seconds and records the
+    current stack of the target thread. Sampling adds no overhead to the
+    profiled code itself, only to the interpreter as a whole, and it
+    shows time spent in C extensions (NumPy, pymunk) under the Python
+    function that called them.
+
+    Args:
+        interval: Seconds between samples
+        thread_id: Thread to sample (defaults to the thread calling start)
+        root: Optional name of a frame placed at the root of every stack
+    """
+
+    def __init__(self, interval=0.005, thread_id=None, root=None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.root = root
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _frame_name(frame):
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        stack = []
+        while frame is not None:
+            stack.append(self._frame_name(frame))
+            frame = frame.f_back
+        if self.root:
+            stack.append(self.root)
+        self.samples[';'.join(reversed(stack))] += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+        return False
+
+    @property
+    def sample_count(self):
+        return sum(self.samples.values())
+
+    def write_collapsed(self, path):
+        """Write the samples in collapsed-stack format, most frequent first"""
+        with open(path, 'w') as out:
+            for stack, count in self.samples.most_common():
+                out.write(f"{stack} {count}\n")
+
+
+def run_steps(simulation, steps):
+    """Advance a simulation by a number of physics steps without drawing"""
+    for _ in range(steps):
+        simulation.step_physics()
+
+
+def profile_headless(simulation, steps, profiler=None, output='profile', interval=0.005):
+    """
+    Run a simulation headlessly and optionally profile it.
+
+    Args:
+        simulation: Simulation instance (see video_export.create_headless_simulation)
+        steps: Number of physics steps
+        profiler: None, 'cprofile' or 'sample'
+        output: Path prefix for the .pstats, .collapsed and .json files
+        interval: Seconds between samples of the sampling profiler
+
+    Returns:
+        Dictionary describing the run, as written to <output>.json
+    """
+    if profiler not in (None,) + PROFILERS:
+        raise ValueError(f"Unknown profiler: {profiler} (available: {', '.join(PROFILERS)})")
+
+    model, _ = simulation.force_settings()
+    info = {
+        'simulation': type(simulation).__name__,
+        'nodes': simulation.graph.num_nodes,
+        'connections': simulation.graph.num_edges,
+        'force_model': model,
+        'force_params': dict(simulation.force_params),
+        'initial_layout': getattr(simulation, 'initial_layout', 'random'),
+        'force_backend': type(simulation.force_backend).__name__ if getattr(simulation, 'force_backend', None) else None,
+        'steps': steps,
+        'seed': getattr(simulation, 'seed', None),
+        'profiler': profiler,
+        'files': [],
+    }
+
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    start = time.perf_counter()
+    if profiler == 'cprofile':
+        profile = cProfile.Profile()
+        profile.runcall(run_steps, simulation, steps)
+        elapsed = time.perf_counter() - start
+        path = output + '.pstats'
+        profile.dump_stats(path)
+        info['files'].append(path)
+    elif profiler == 'sample':
+        root = f"{info['simulation']} nodes={info['nodes']} connections={info['connections']} model={model}"
+        sampler = SamplingProfiler(interval=interval, root=root)
+        with sampler:
+            run_steps(simulation, steps)
+        elapsed = time.perf_counter() - start
+        path = output + '.collapsed'
+        sampler.write_collapsed(path)
+        info['samples'] = sampler.sample_count
+        info['files'].append(path)
+    else:
+        run_steps(simulation, steps)
+        elapsed = time.perf_counter() - start
+
+    info['seconds'] = elapsed
+    info['steps_per_second'] = steps / elapsed if elapsed > 0 else 0.0
+    sampling = getattr(simulation, 'edge_sampling', None)
+    info['edge_sample_rate'] = sampling.rate if sampling else None
+    path = output + '.json'
+    info['files'].append(path)
+    with open(path, 'w') as out:
+        json.dump(info, out, indent=2)
+    return info
+
+
+def add_headless_arguments(parser, networks=None):
+    """
+    Add the headless run and profiling options to an argparse parser.
+
+    Args:
+        parser: argparse.ArgumentParser of an entry point
+        networks: Names of the built-in networks the simulation can select
+    """
+    group = parser.add_argument_group('headless runs and profiling')
+    group.add_argument('--headless', type=int, metavar='STEPS',
+                       help="run STEPS physics steps without a display and exit")
+    if networks:
+        group.add_argument('--network', choices=networks, default=networks[0])
+    group.add_argument('--nodes', type=int, default=None,
+                       help="use a generated network with this many nodes")
+    group.add_argument('--connection-probability', type=float, default=0.05,
+                       help="connection probability of the generated network")
+    group.add_argument('--force-model', default=None, help="force model name, e.g. fruchterman_reingold")
+    group.add_argument('--initial-layout', default=None,
+                       help="initial placement: random, group, spectral or bfs")
+    group.add_argument('--seed', type=int, default=None, help="seed for a reproducible network and layout")
+    group.add_argument('--force-processes', type=int, default=None, metavar='N',
+                       help="compute forces on N worker processes with shared memory")
+    group.add_argument('--force-threads', type=int, default=None, metavar='N',
+                       help="compute forces on a pool of N threads")
+    group.add_argument('--edge-sampling', type=float, default=None, metavar='MS',
+                       help="sample the connections of dense networks, adapting the sample "
+                            "rate so the force pass takes about MS milliseconds")
+    group.add_argument('--profile', choices=PROFILERS, default=None)
+    group.add_argument('--profile-output', default='profile', metavar='PREFIX',
+                       help="path prefix of the profile output files")
+    group.add_argument('--sample-interval', type=float, default=5.0, metavar='MS',
+                       help="milliseconds between samples of the sampling profiler")
+
+
+def run_headless_cli(simulation_class, args):
+    """Run a headless (and possibly profiled) simulation from parsed arguments"""
+    from video_export import create_headless_simulation
+
+    simulation = create_headless_simulation(simulation_class, seed=args.seed)
+    if args.force_model:
+        simulation.force_model = args.force_model
+    if args.initial_layout:
+        simulation.initial_layout = args.initial_layout
+    if args.edge_sampling:
+        from edge_sampling import SampleRateController
+        simulation.edge_sampling = SampleRateController(target_time=args.edge_sampling / 1000.0)
+    if getattr(args, 'layout_cache', None) is not None:
+        from layout_cache import LayoutCache
+        simulation.layout_cache = LayoutCache(args.layout_cache or None)
+    if args.nodes:
+        from social_network_data import create_large_network
+        simulation.create_network(create_large_network(args.nodes, args.connection_probability,
+                                                       rng=simulation.rng))
+    elif getattr(args, 'network', None):
+        simulation.current_network = simulation.network_types.index(args.network)
+        simulation.create_network()
+    elif args.initial_layout or simulation.layout_cache is not None:
+        simulation.create_network()
+
+    if args.force_processes:
+        from parallel_forces import SharedMemoryForceBackend
+        simulation.force_backend = SharedMemoryForceBackend(workers=args.force_processes)
+    elif args.force_threads:
+        from parallel_forces import ThreadPoolForceBackend
+        simulation.force_backend = ThreadPoolForceBackend(workers=args.force_threads)
+    try:
+        info = profile_headless(simulation, args.headless, profiler=args.profile,
+                                output=args.profile_output, interval=args.sample_interval / 1000.0)
+    finally:
+        if simulation.force_backend is not None:
+            simulation.force_backend.close()
+
+    print(f"{info['simulation']}: {info['nodes']} nodes, {info['connections']} connections, "
+          f"force model {info['force_model']}")
+    print(f"{info['steps']} steps in {info['seconds']:.2f}s ({info['steps_per_second']:.1f} steps/s)")
+    if info['edge_sample_rate'] is not None:
+        print(f"Edge sample rate: {info['edge_sample_rate']:.1%}")
+    for path in info['files']:
+        print(f"Wrote {path}")
+    return info
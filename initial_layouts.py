@@ -0,0 +1,269 @@
+"""
+Initial node placement for the social layout
+
+Uniformly random starting positions leave the force simulation to untangle
+the whole network, which takes thousands of steps on large graphs. The
+initializers here start closer to the final layout:
+
+- random: uniform positions (the original behaviour)
+- group: each group gets its own sector of the canvas, sized by the number
+  of members
+- spectral: the two smallest non-trivial eigenvectors of the normalised
+  graph Laplacian, found by power iteration over the edge arrays
+- bfs: pivot MDS, a projection of the breadth-first hop distances to a
+  few far-apart pivot nodes
+
+The gain is mostly in layout quality, not in steps. Settling
+create_large_network(500, 0.02) with batch_layout.run_layout and an
+adaptive StepController (6000-step budget, seeds 1 and 2):
+
+    start     steps to converge   average connection length
+    random    did not converge    255-264
+    group     3120 / did not      237-253
+    spectral  4620-5040           194-195
+    bfs       5340 / did not      210-213
+
+A spectral start cuts the steps by about 1.2-2x here (and by 1.5-1.9x
+on 150 nodes), not by an order of magnitude. With
+the default damping (applied once per body pair, so motion dies out
+quickly) every start freezes within 120-600 steps, and a better start
+only shows as shorter final connections (506 px from random, 230 px from
+spectral).
+
+Every initializer returns an (N, 2) array of positions in graph index
+order inside [margin, width - margin] x [margin, height - margin]:
+
+    positions = initial_positions('spectral', graph, 1400, 900, rng=42)
+
+New initializers are plain functions registered with the
+@register_initial_layout decorator.
+"""
+
+import math
+
+import numpy as np
+
+from seeding import make_rng, make_generator
+
+# Registered initializer functions by name
+INITIAL_LAYOUTS = {}
+
+
+def register_initial_layout(name):
+    """Function decorator that makes an initializer available under name"""
+    def decorator(function):
+        INITIAL_LAYOUTS[name] = function
+        return function
+    return decorator
+
+
+def initial_positions(name, graph, width, height, margin=100, rng=None, **options):
+    """
+    Place the nodes of a graph with a registered initializer.
+
+    Args:
+        name: Initializer name (see INITIAL_LAYOUTS)
+        graph: NetworkGraph to place
+        width, height: Size of the canvas
+        margin: Distance kept from the canvas border
+        rng: Seed, random.Random or NumPy Generator
+        options: Initializer specific options
+
+    Returns:
+        (N, 2) array of positions in graph index order
+    """
+    if name not in INITIAL_LAYOUTS:
+        available = ', '.join(sorted(INITIAL_LAYOUTS))
+        raise ValueError(f"Unknown initial layout: {name} (available: {available})")
+    return INITIAL_LAYOUTS[name](graph, width, height, margin=margin, rng=rng, **options)
+
+
+def fit_to_canvas(points, width, height, margin, generator, jitter=None):
+    """
+    Scale an (N, 2) embedding into the canvas, axis by axis.
+
+    The 1st and 99th percentiles map to the canvas border so a few outliers
+    do not squeeze everything else together. Nodes with identical
+    coordinates are separated by a small random jitter (by default a
+    quarter of the average node spacing, at most 10 pixels).
+    """
+    n = len(points)
+    low = np.array([margin, margin], dtype=float)
+    size = np.array([max(width - 2 * margin, 1), max(height - 2 * margin, 1)], dtype=float)
+    if n == 0:
+        return np.zeros((0, 2))
+
+    lo, hi = np.percentile(points, [1, 99], axis=0)
+    span = np.where(hi - lo > 1e-12, hi - lo, 1.0)
+    unit = np.clip((points - lo) / span, 0.0, 1.0)
+    unit[:, hi - lo <= 1e-12] = 0.5
+
+    if jitter is None:
+        jitter = min(0.25 * math.sqrt(size[0] * size[1] / n), 10.0)
+    positions = low + unit * size + generator.uniform(-jitter, jitter, (n, 2))
+    return np.clip(positions, low, low + size)
+
+
+@register_initial_layout('random')
+def random_layout(graph, width, height, margin=100, rng=None):
+    """Uniformly random integer positions, drawn node by node as before"""
+    rng = make_rng(rng)
+    positions = np.zeros((graph.num_nodes, 2))
+    for i in range(graph.num_nodes):
+        positions[i] = (rng.randint(margin, width - margin), rng.randint(margin, height - margin))
+    return positions
+
+
+def random_layout_array(count, width, height, margin, generator):
+    """count uniformly random positions inside the canvas margin"""
+    return generator.uniform((margin, margin), (width - margin, height - margin), (count, 2))
+
+
+@register_initial_layout('group')
+def group_layout(graph, width, height, margin=100, rng=None, gap=0.1):
+    """
+    Place each group in its own sector of an ellipse filling the canvas.
+
+    The angle of each sector is proportional to the size of the group, so
+    all groups get the same density. Nodes without a group share one extra
+    sector.
+
+    Args:
+        gap: Fraction of each sector left empty on both sides
+    """
+    generator = make_generator(rng)
+    n = graph.num_nodes
+    codes, num_groups = graph.group_codes()
+    codes = np.where(codes < 0, num_groups, codes)
+    sizes = np.bincount(codes, minlength=num_groups + 1).astype(float)
+
+    ends = np.cumsum(sizes) / max(n, 1) * 2 * math.pi
+    starts = ends - sizes / max(n, 1) * 2 * math.pi
+    widths = ends - starts
+    angle = starts[codes] + widths[codes] * generator.uniform(gap, 1 - gap, n)
+    # sqrt keeps the density uniform over the sector's area
+    radius = np.sqrt(generator.uniform(0.05, 1.0, n))
+
+    half = np.array([max(width - 2 * margin, 1), max(height - 2 * margin, 1)], dtype=float) / 2
+    centre = np.array([width, height], dtype=float) / 2
+    return centre + np.column_stack([np.cos(angle), np.sin(angle)]) * radius[:, None] * half
+
+
+@register_initial_layout('spectral')
+def spectral_layout(graph, width, height, margin=100, rng=None, iterations=300, tolerance=1e-5,
+                    regularization=0.1):
+    """
+    Spectral embedding from the normalised graph Laplacian.
+
+    Runs orthogonal power iteration with (I + D^-1 A) / 2, whose largest
+    eigenvector is constant; removing that vector leaves the two
+    eigenvectors of the smallest non-zero Laplacian eigenvalues. Every
+    iteration is two bincounts over the edge arrays, so no eigen solver is
+    needed.
+
+    A weak all-to-all link (regularization times the average degree,
+    spread over all nodes) keeps separate components from collapsing into
+    single points. Isolated nodes are placed at random.
+
+    Args:
+        iterations: Maximum number of power iterations
+        tolerance: Stop once no coordinate changes by more than this
+            fraction of the largest coordinate
+        regularization: Weight of the all-to-all link
+    """
+    generator = make_generator(rng)
+    n = graph.num_nodes
+    if n < 3:
+        return random_layout(graph, width, height, margin, generator)
+
+    indptr, indices, weights = graph.adjacency_arrays()
+    rows = np.repeat(np.arange(n), np.diff(indptr))
+    degree = np.bincount(rows, weights=weights, minlength=n)
+    isolated = degree == 0
+    tau = regularization * degree.sum() / n
+    degree = degree + tau
+
+    def normalise(x):
+        return x / math.sqrt(max(float(x @ (degree * x)), 1e-300))
+
+    embedding = generator.standard_normal((n, 2))
+    for _ in range(iterations):
+        product = np.column_stack([
+            np.bincount(rows, weights=weights * embedding[indices, k], minlength=n) + tau * embedding[:, k].mean()
+            for k in range(2)
+        ])
+        update = 0.5 * (embedding + product / degree[:, None])
+        # D-orthogonalise against the constant vector and each other
+        update -= (degree @ update) / degree.sum()
+        update[:, 0] = normalise(update[:, 0])
+        update[:, 1] -= (update[:, 0] @ (degree * update[:, 1])) * update[:, 0]
+        update[:, 1] = normalise(update[:, 1])
+        change = np.abs(update - embedding).max()
+        embedding = update
+        if change < tolerance * np.abs(embedding).max():
+            break
+
+    positions = fit_to_canvas(embedding, width, height, margin, generator)
+    if isolated.any():
+        positions[isolated] = random_layout_array(int(isolated.sum()), width, height, margin, generator)
+    return positions
+
+
+def bfs_distances(graph, source):
+    """Hop distance from source to every node (-1 where unreachable)"""
+    indptr, indices, _ = graph.adjacency_arrays()
+    distance = np.full(graph.num_nodes, -1, dtype=np.int64)
+    distance[source] = 0
+    frontier = np.array([source], dtype=np.int64)
+    level = 0
+    while len(frontier):
+        level += 1
+        starts = indptr[frontier]
+        counts = indptr[frontier + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            break
+        slots = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+        neighbours = indices[slots]
+        frontier = np.unique(neighbours[distance[neighbours] < 0])
+        distance[frontier] = level
+    return distance
+
+
+@register_initial_layout('bfs')
+def bfs_layout(graph, width, height, margin=100, rng=None, pivots=16):
+    """
+    Pivot MDS over breadth-first hop distances.
+
+    Pivots are chosen max-min: each new pivot is the node furthest from
+    the pivots so far. The squared distances to the pivots are double
+    centred and projected onto their two principal axes, which costs one
+    vectorized BFS per pivot plus a pivots x pivots eigenproblem.
+    Unreachable nodes count as one hop further than the furthest
+    reachable node.
+
+    Args:
+        pivots: Number of pivot nodes
+    """
+    generator = make_generator(rng)
+    n = graph.num_nodes
+    k = min(pivots, n)
+    if k < 3:
+        return random_layout(graph, width, height, margin, generator)
+
+    distances = np.zeros((n, k))
+    closest = np.full(n, np.inf)
+    pivot = int(generator.integers(n))
+    for column in range(k):
+        distance = bfs_distances(graph, pivot).astype(float)
+        distance[distance < 0] = distance.max() + 1
+        distances[:, column] = distance
+        closest = np.minimum(closest, distance)
+        pivot = int(np.argmax(closest))
+
+    squared = distances ** 2
+    centred = squared - squared.mean(axis=0) - squared.mean(axis=1)[:, None] + squared.mean()
+    centred *= -0.5
+    values, vectors = np.linalg.eigh(centred.T @ centred)
+    embedding = centred @ vectors[:, ::-1][:, :2]
+    return fit_to_canvas(embedding, width, height, margin, generator)
@@ -0,0 +1,246 @@
+"""
+On-disk cache of converged layouts
+
+The same networks are laid out with the same settings again and again:
+every launch of the simulation, every batch job over the built-in
+networks. A converged layout only depends on the network structure and
+the layout settings, so LayoutCache stores finished layouts in a directory
+under a content hash of both:
+
+- the network: node IDs and groups in order, and every connection with
+  its strength (names and other node data do not affect the layout)
+- the settings: simulation profile, canvas size, force model and all its
+  parameters, damping, initial layout, seed, step control and the
+  convergence budget
+
+Entries are JSON files named by their key. Reading an entry refreshes its
+modification time, and after every write the least recently used entries
+are removed until the cache fits in max_bytes. Several processes (batch
+workers) can share one directory: entries are written atomically and
+eviction tolerates files that disappear underneath it.
+
+    cache = LayoutCache()  # ~/.cache/social_clustering/layouts
+    key = layout_key(network_data, settings)
+    result = cache.get(key)
+
+settle_layout runs a simulation to convergence through the cache; both
+batch_layout.py and SocialSimulation.create_network use it.
+"""
+
+import hashlib
+import json
+import math
+import os
+import tempfile
+import time
+
+import numpy as np
+
+# Bump when a change to the simulation makes cached layouts stale
+CACHE_VERSION = 1
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+def default_cache_dir():
+    """Return the default cache directory ($XDG_CACHE_HOME or ~/.cache)"""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'social_clustering', 'layouts')
+
+
+def network_fingerprint(network_data):
+    """
+    Return a SHA-256 hex digest of the parts of a network that shape its layout.
+
+    Node order is kept, because it decides the order of the initial
+    positions.
+    """
+    structure = {
+        'nodes': [[node['id'], node.get('group')] for node in network_data['nodes']],
+        'connections': [[c['from'], c['to'], c.get('strength')] for c in network_data['connections']],
+    }
+    return hashlib.sha256(json.dumps(structure, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def layout_key(network_data, settings):
+    """
+    Return the cache key of a network laid out with settings.
+
+    Args:
+        network_data: Network dictionary
+        settings: JSON-serializable dictionary of everything else the
+            layout depends on (see SocialSimulation.layout_settings)
+    """
+    content = {'version': CACHE_VERSION, 'network': network_fingerprint(network_data), 'settings': settings}
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class LayoutCache:
+    """
+    Size-bounded, least-recently-used cache of layout results on disk.
+
+    Args:
+        directory: Cache directory (created on first write)
+        max_bytes: Total size the entries are evicted down to
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """Return the cached result for key (and mark it as recently used), or None"""
+        path = self.path(key)
+        try:
+            with open(path) as f:
+                result = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return result
+
+    def put(self, key, result):
+        """Store a JSON-serializable result under key, then evict old entries"""
+        os.makedirs(self.directory, exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'w') as out:
+                json.dump(result, out)
+            os.replace(temporary, self.path(key))
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        self.evict()
+
+    def entries(self):
+        """Return (modification time, size, path) of every entry, oldest first"""
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return entries
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue  # Evicted by another process
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        return entries
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def size_bytes(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def clear(self):
+        """Remove every entry"""
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def __len__(self):
+        return len(self.entries())
+
+    def __contains__(self, key):
+        return os.path.exists(self.path(key))
+
+
+def layout_metrics(simulation):
+    """Return size, connection length and spatial clustering metrics of a layout"""
+    from spatial_clustering import cluster_layout
+
+    positions = {node_id: (body.position.x, body.position.y)
+                 for node_id, body in simulation.node_bodies.items()}
+    lengths = [math.dist(positions[c['from']], positions[c['to']]) for c in simulation.connections]
+    clusters = cluster_layout(positions, simulation.nodes,
+                              node_radius=getattr(simulation, 'node_radius', 15))
+    return {
+        'nodes': len(simulation.nodes),
+        'connections': len(simulation.connections),
+        'average_connection_length': sum(lengths) / len(lengths) if lengths else 0.0,
+        'spatial_clusters': clusters['num_clusters'],
+        'noise_nodes': clusters['noise'],
+        'cluster_purity': clusters['purity'],
+    }
+
+
+def settle_layout(sim, max_steps=2000, tolerance=1.0, check_interval=60, cache=None):
+    """
+    Run a simulation until its layout has converged or the budget is used up.
+
+    Args:
+        sim: Simulation with its network created
+        max_steps, tolerance, check_interval: See batch_layout.run_layout
+        cache: Optional LayoutCache. Only used when the simulation has a
+            seed; on a hit the bodies are moved to the cached positions
+            without simulating
+
+    Returns:
+        Dictionary with the positions, metrics, step count, timing and
+        whether it came from the cache
+    """
+    start = time.perf_counter()
+    key = None
+    if cache is not None and sim.seed is not None:
+        settings = dict(sim.layout_settings(), max_steps=max_steps, tolerance=tolerance,
+                        check_interval=check_interval)
+        key = layout_key({'nodes': sim.nodes, 'connections': sim.connections}, settings)
+        result = cache.get(key)
+        if result is not None:
+            for node_id, body in sim.node_bodies.items():
+                body.position = tuple(result['positions'][str(node_id)])
+                body.velocity = (0, 0)
+            return dict(result, cached=True, seconds=time.perf_counter() - start)
+
+    steps = 0
+    converged = False
+    movement = 0.0
+    window = 0.0  # Simulated seconds since the last check
+    last_positions = sim.body_positions()
+    while steps < max_steps:
+        sim.step_physics()
+        window += sim.time_step
+        steps += 1
+        if steps % check_interval == 0:
+            positions = sim.body_positions()
+            displacement = np.hypot(*(positions - last_positions).T)
+            movement = float(displacement.mean()) / window if len(displacement) else 0.0
+            last_positions = positions
+            window = 0.0
+            if movement < tolerance:
+                converged = True
+                break
+
+    result = {
+        'steps': steps,
+        'converged': converged,
+        'movement': movement,
+        'seconds': time.perf_counter() - start,
+        'metrics': layout_metrics(sim),
+        'positions': {str(node_id): [body.position.x, body.position.y]
+                      for node_id, body in sim.node_bodies.items()},
+    }
+    if key is not None:
+        cache.put(key, result)
+    return dict(result, cached=False)
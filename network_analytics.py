@@ -0,0 +1,227 @@
+"""
+Graph analytics for the social network
+
+Structural metrics beyond the node and connection counts printed by
+examples.py: degree distribution, clustering coefficients, betweenness
+centrality and PageRank.
+
+Results are memoized per graph version. Changing the graph through
+NetworkGraph.add_node, add_connection or remove_connection bumps its
+version, which discards every cached result on the next call.
+"""
+
+from collections import Counter, deque
+
+import numpy as np
+
+from network_graph import as_graph
+from seeding import make_rng
+
+
+class NetworkAnalytics:
+    """Cached structural metrics of a network dictionary or NetworkGraph"""
+
+    def __init__(self, network, weighted=True):
+        self.graph = as_graph(network, weighted=weighted)
+        self._cache = {}
+        self._cache_version = self.graph.version
+
+    def _cached(self, key, compute):
+        """Return the cached value for key, computing it if missing or stale"""
+        if self.graph.version != self._cache_version:
+            self._cache.clear()
+            self._cache_version = self.graph.version
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def _by_id(self, values):
+        return dict(zip(self.graph.node_ids, values))
+
+    # --- Degree ---
+
+    def degrees(self):
+        """Return {node_id: number of connections}"""
+        return self._cached('degrees', lambda: self._by_id(
+            [self.graph.degree(i) for i in range(self.graph.num_nodes)]))
+
+    def degree_distribution(self):
+        """Return {degree: number of nodes with that degree}, sorted by degree"""
+        def compute():
+            counts = Counter(self.degrees().values())
+            return dict(sorted(counts.items()))
+        return self._cached('degree_distribution', compute)
+
+    # --- Clustering coefficients ---
+
+    def triangles(self):
+        """
+        Return {node_id: number of triangles the node belongs to}.
+
+        Uses the forward algorithm: every edge is oriented from the lower
+        to the higher (degree, index) rank, so each triangle is found
+        exactly once by intersecting two short neighbour sets.
+        """
+        def compute():
+            graph = self.graph
+            rank = sorted(range(graph.num_nodes), key=lambda i: (graph.degree(i), i))
+            position = [0] * graph.num_nodes
+            for order, i in enumerate(rank):
+                position[i] = order
+            forward = [
+                {j for j in graph.adjacency[i] if position[j] > position[i]}
+                for i in range(graph.num_nodes)
+            ]
+
+            counts = [0] * graph.num_nodes
+            for u in range(graph.num_nodes):
+                for v in forward[u]:
+                    for w in forward[u] & forward[v]:
+                        counts[u] += 1
+                        counts[v] += 1
+                        counts[w] += 1
+            return self._by_id(counts)
+        return self._cached('triangles', compute)
+
+    def local_clustering(self):
+        """Return {node_id: local clustering coefficient}"""
+        def compute():
+            triangles = self.triangles()
+            coefficients = {}
+            for node_id, degree in self.degrees().items():
+                possible = degree * (degree - 1) / 2.0
+                coefficients[node_id] = triangles[node_id] / possible if possible else 0.0
+            return coefficients
+        return self._cached('local_clustering', compute)
+
+    def average_clustering(self):
+        """Mean local clustering coefficient over all nodes"""
+        def compute():
+            values = list(self.local_clustering().values())
+            return sum(values) / len(values) if values else 0.0
+        return self._cached('average_clustering', compute)
+
+    def global_clustering(self):
+        """Transitivity: 3 x triangles / connected triples"""
+        def compute():
+            triangles = sum(self.triangles().values()) / 3
+            triples = sum(d * (d - 1) / 2.0 for d in self.degrees().values())
+            return 3 * triangles / triples if triples else 0.0
+        return self._cached('global_clustering', compute)
+
+    # --- Centrality ---
+
+    def betweenness(self, samples=None, rng=None, normalized=True):
+        """
+        Return {node_id: betweenness centrality} using Brandes' algorithm.
+
+        Args:
+            samples: Number of source nodes to sample. None uses every node
+                (exact result); smaller values give an unbiased estimate in
+                O(samples * edges) time.
+            rng: Seed, random.Random or numpy Generator used to choose the
+                sample sources. Estimates from a seed are cached; estimates
+                from a random source are drawn anew on every call.
+            normalized: Scale by the number of node pairs not including
+                the node itself
+
+        Shortest paths count hops; connection strength is ignored.
+        """
+        def compute():
+            graph = self.graph
+            n = graph.num_nodes
+            sources = list(range(n))
+            if samples is not None and samples < n:
+                sources = make_rng(rng).sample(sources, samples)
+
+            centrality = [0.0] * n
+            for source in sources:
+                # Breadth-first search counting shortest paths
+                order = []
+                predecessors = [[] for _ in range(n)]
+                paths = [0] * n
+                distance = [-1] * n
+                paths[source] = 1
+                distance[source] = 0
+                queue = deque([source])
+                while queue:
+                    v = queue.popleft()
+                    order.append(v)
+                    for w in graph.adjacency[v]:
+                        if distance[w] < 0:
+                            distance[w] = distance[v] + 1
+                            queue.append(w)
+                        if distance[w] == distance[v] + 1:
+                            paths[w] += paths[v]
+                            predecessors[w].append(v)
+
+                # Accumulate dependencies in reverse BFS order
+                dependency = [0.0] * n
+                for w in reversed(order):
+                    for v in predecessors[w]:
+                        dependency[v] += paths[v] / paths[w] * (1 + dependency[w])
+                    if w != source:
+                        centrality[w] += dependency[w]
+
+            # Each undirected pair is counted from both ends
+            scale = 0.5 * n / len(sources) if sources else 0.0
+            if normalized and n > 2:
+                scale /= (n - 1) * (n - 2) / 2.0
+            return self._by_id([value * scale for value in centrality])
+        sampled = samples is not None and samples < self.graph.num_nodes
+        if sampled and not isinstance(rng, int):
+            return compute()
+        return self._cached(('betweenness', samples if sampled else None, rng if sampled else None,
+                             normalized), compute)
+
+    def pagerank(self, damping=0.85, tolerance=1e-6, max_iterations=100):
+        """
+        Return {node_id: PageRank} by power iteration over the CSR adjacency arrays.
+
+        Connections are followed in proportion to their weight. Each
+        iteration is one np.bincount over the edges, and iteration stops
+        once the total change drops below tolerance.
+        """
+        def compute():
+            graph = self.graph
+            n = graph.num_nodes
+            if n == 0:
+                return {}
+            indptr, indices, weights = graph.adjacency_arrays()
+            rows = np.repeat(np.arange(n), np.diff(indptr))
+            strengths = np.bincount(rows, weights, minlength=n)
+            dangling = strengths == 0
+            # Share of each node's rank passed along each of its connections
+            transition = damping * weights / strengths[rows]
+            rank = np.full(n, 1.0 / n)
+
+            for _ in range(max_iterations):
+                # Nodes without connections spread their rank evenly
+                base = (1.0 - damping) / n + damping * rank[dangling].sum() / n
+                new_rank = base + np.bincount(indices, rank[rows] * transition, minlength=n)
+                change = np.abs(new_rank - rank).sum()
+                rank = new_rank
+                if change < tolerance:
+                    break
+            return self._by_id(rank.tolist())
+        return self._cached(('pagerank', damping, tolerance, max_iterations), compute)
+
+    # --- Summary ---
+
+    def summary(self):
+        """Return a dictionary of headline metrics for the network"""
+        def compute():
+            graph = self.graph
+            n = graph.num_nodes
+            degrees = list(self.degrees().values())
+            max_edges = n * (n - 1) / 2.0
+            return {
+                'nodes': n,
+                'connections': graph.num_edges,
+                'density': graph.num_edges / max_edges if max_edges else 0.0,
+                'average_degree': sum(degrees) / n if n else 0.0,
+                'max_degree': max(degrees) if degrees else 0,
+                'average_clustering': self.average_clustering(),
+                'global_clustering': self.global_clustering(),
+            }
+        return self._cached('summary', compute)
@@ -0,0 +1,272 @@
+"""
+Compact graph structure for the social network data
+
+The network builders in social_network_data.py return plain dictionaries
+with a 'nodes' list and a 'connections' list. That format is easy to read
+and write by hand, but answering "who is connected to whom" means scanning
+the whole connection list. NetworkGraph converts the dictionaries once into
+index-based adjacency lists so analysis code can walk the graph in time
+proportional to the number of edges.
+
+For the vectorized force kernels the same structure is also available as
+NumPy arrays (edge_arrays, degree_array), built on first use and rebuilt
+whenever the graph changes.
+"""
+
+import numpy as np
+
+# Numeric weight for each connection strength (matches the line thickness
+# used by EnhancedSocialClusteringSimulation.draw_network)
+STRENGTH_WEIGHTS = {
+    'strong': 3.0,
+    'medium': 2.0,
+    'weak': 1.0,
+}
+
+DEFAULT_STRENGTH = 'medium'
+
+
+def connection_weight(connection, weighted=True):
+    """Return the numeric weight of a connection dictionary"""
+    if not weighted:
+        return 1.0
+    strength = connection.get('strength', DEFAULT_STRENGTH)
+    return STRENGTH_WEIGHTS.get(strength, STRENGTH_WEIGHTS[DEFAULT_STRENGTH])
+
+
+class NetworkGraph:
+    """
+    Index-based, undirected view of a network dictionary.
+
+    Nodes are numbered 0..n-1 in the order they appear in network['nodes'].
+    Duplicate connections between the same pair keep the strongest weight,
+    and connections that reference unknown nodes or the node itself are
+    ignored.
+
+    The version counter increases with every change made through add_node,
+    add_connection or remove_connection, so cached results computed from
+    the graph can tell when they are stale.
+    """
+
+    def __init__(self, network_data, weighted=True):
+        self.weighted = weighted
+        self.version = 0
+        self._arrays = {}
+        self._arrays_version = None
+        self.nodes = list(network_data['nodes'])
+        self.node_ids = [node['id'] for node in self.nodes]
+        self.index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        self.groups = [node.get('group') for node in self.nodes]
+
+        # adjacency[i] maps neighbour index -> edge weight
+        self.adjacency = [dict() for _ in self.nodes]
+        for connection in network_data['connections']:
+            self._link(connection)
+
+    def _link(self, connection):
+        """Store a connection in the adjacency lists; returns True if it changed them"""
+        i = self.index.get(connection['from'])
+        j = self.index.get(connection['to'])
+        return self._link_indices(i, j, connection_weight(connection, self.weighted))
+    
+    def _link_indices(self, i, j, weight):
+        if i is None or j is None or i == j:
+            return False
+        if weight <= self.adjacency[i].get(j, 0.0):
+            return False
+        self.adjacency[i][j] = weight
+        self.adjacency[j][i] = weight
+        return True
+    
+    @classmethod
+    def from_edge_chunks(cls, nodes, chunks, weighted=True):
+        """
+        Build a graph from node dictionaries and connection arrays.
+        
+        Args:
+            nodes: Iterable of node dictionaries
+            chunks: Iterable of (sources, targets, weights) arrays of node
+                IDs and STRENGTH_WEIGHTS values, e.g. from network_streams
+            weighted: Use the weights (False gives every edge weight 1)
+        
+        No connection dictionaries are created, so a streamed network
+        only ever holds one chunk besides the graph itself.
+        """
+        graph = cls({'nodes': nodes, 'connections': []}, weighted=weighted)
+        index = graph.index
+        for sources, targets, weights in chunks:
+            weights = weights.tolist() if weighted else [1.0] * len(sources)
+            for source, target, weight in zip(sources.tolist(), targets.tolist(), weights):
+                graph._link_indices(index.get(source), index.get(target), weight)
+        return graph
+
+    def add_node(self, node):
+        """Add a node dictionary to the graph"""
+        if node['id'] in self.index:
+            raise ValueError(f"Node {node['id']} already exists")
+        self.index[node['id']] = len(self.node_ids)
+        self.nodes.append(node)
+        self.node_ids.append(node['id'])
+        self.groups.append(node.get('group'))
+        self.adjacency.append({})
+        self.version += 1
+
+    def add_connection(self, connection):
+        """Add a connection dictionary ({'from', 'to', 'strength'}) to the graph"""
+        if self._link(connection):
+            self.version += 1
+
+    def remove_connection(self, from_id, to_id):
+        """Remove the connection between two node IDs if it exists"""
+        i = self.index[from_id]
+        j = self.index[to_id]
+        if j in self.adjacency[i]:
+            del self.adjacency[i][j]
+            del self.adjacency[j][i]
+            self.version += 1
+
+    @property
+    def num_nodes(self):
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self):
+        return sum(len(neighbors) for neighbors in self.adjacency) // 2
+
+    def edges(self):
+        """Yield each undirected edge once as (i, j, weight) with i < j"""
+        for i, neighbors in enumerate(self.adjacency):
+            for j, weight in neighbors.items():
+                if i < j:
+                    yield i, j, weight
+
+    def degree(self, i):
+        return len(self.adjacency[i])
+
+    def strength(self, i):
+        """Weighted degree of node index i"""
+        return sum(self.adjacency[i].values())
+
+    def total_weight(self):
+        """Sum of all edge weights (each undirected edge counted once)"""
+        return sum(self.strength(i) for i in range(self.num_nodes)) / 2.0
+
+    def neighbors(self, node_id):
+        """Return the node IDs directly connected to node_id"""
+        return [self.node_ids[j] for j in self.adjacency[self.index[node_id]]]
+
+    def ego_network(self, i, depth=2):
+        """
+        Return the ego network of node index i: every node within depth hops.
+
+        Found by breadth-first search over the adjacency lists, so the cost
+        depends only on the size of the ego network. Results are cached per
+        graph version, so inspecting the same node again is free.
+
+        Returns:
+            (depths, edges): depths maps node index to its hop distance from
+            i (0 for i itself); edges lists the (a, b, weight) connections
+            among those nodes, with a the end closer to i
+        """
+        def build():
+            depths = {i: 0}
+            frontier = [i]
+            for hop in range(1, depth + 1):
+                next_frontier = []
+                for u in frontier:
+                    for v in self.adjacency[u]:
+                        if v not in depths:
+                            depths[v] = hop
+                            next_frontier.append(v)
+                frontier = next_frontier
+
+            edges = []
+            for u, hops in depths.items():
+                for v, weight in self.adjacency[u].items():
+                    other = depths.get(v)
+                    if other is not None and (hops, u) < (other, v):
+                        edges.append((u, v, weight))
+            return depths, edges
+        return self._cached_array(('ego', i, depth), build)
+
+    def _cached_array(self, key, build):
+        if self._arrays_version != self.version:
+            self._arrays.clear()
+            self._arrays_version = self.version
+        if key not in self._arrays:
+            self._arrays[key] = build()
+        return self._arrays[key]
+
+    def edge_arrays(self):
+        """
+        Return (sources, targets, weights) NumPy arrays with one entry per edge.
+
+        Sources are always the lower node index, so (sources, targets) pairs
+        are unique and sorted by source.
+        """
+        def build():
+            edges = list(self.edges())
+            if not edges:
+                return (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64),
+                        np.zeros(0, dtype=np.float64))
+            sources, targets, weights = zip(*edges)
+            return (np.array(sources, dtype=np.int64), np.array(targets, dtype=np.int64),
+                    np.array(weights, dtype=np.float64))
+        return self._cached_array('edges', build)
+
+    def edge_keys(self):
+        """Sorted array of source * num_nodes + target for every edge"""
+        def build():
+            sources, targets, _ = self.edge_arrays()
+            return np.sort(sources * self.num_nodes + targets)
+        return self._cached_array('edge_keys', build)
+
+    def adjacency_arrays(self):
+        """
+        Return (indptr, indices, weights): the adjacency lists in CSR form.
+
+        The neighbours of node i are indices[indptr[i]:indptr[i + 1]], with
+        the matching edge weights in weights.
+        """
+        def build():
+            sources, targets, weights = self.edge_arrays()
+            rows = np.concatenate([sources, targets])
+            columns = np.concatenate([targets, sources])
+            order = np.argsort(rows, kind='stable')
+            indptr = np.zeros(self.num_nodes + 1, dtype=np.int64)
+            np.cumsum(np.bincount(rows, minlength=self.num_nodes), out=indptr[1:])
+            return indptr, columns[order], np.concatenate([weights, weights])[order]
+        return self._cached_array('csr', build)
+
+    def group_codes(self):
+        """
+        Return (codes, num_groups): an integer group code per node.
+
+        Codes follow the order in which groups first appear; nodes without
+        a group get -1.
+        """
+        def build():
+            lookup = {}
+            codes = [-1 if group is None else lookup.setdefault(group, len(lookup))
+                     for group in self.groups]
+            return np.array(codes, dtype=np.int64), len(lookup)
+        return self._cached_array('group_codes', build)
+
+    def group_sizes(self):
+        """NumPy array with the number of nodes in each group code"""
+        def build():
+            codes, num_groups = self.group_codes()
+            return np.bincount(codes[codes >= 0], minlength=num_groups)
+        return self._cached_array('group_sizes', build)
+
+    def degree_array(self):
+        """NumPy array with the number of connections of each node"""
+        return self._cached_array('degrees', lambda: np.array(
+            [len(neighbors) for neighbors in self.adjacency], dtype=np.float64))
+
+
+def as_graph(network, weighted=True):
+    """Return network as a NetworkGraph, converting a network dictionary if needed"""
+    if isinstance(network, NetworkGraph):
+        return network
+    return NetworkGraph(network, weighted=weighted)
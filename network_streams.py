@@ -0,0 +1,417 @@
+"""
+Streaming generators for large synthetic networks
+
+create_large_network builds complete 'nodes' and 'connections' lists, so
+a network with millions of connections needs gigabytes of dictionaries
+before anything can be written or laid out. The streams here produce the
+same kind of network lazily:
+
+- nodes() yields node dictionaries one at a time
+- edge_chunks() yields (sources, targets, weights) NumPy arrays of at
+  most chunk_size connections, with node IDs and STRENGTH_WEIGHTS values
+  in the layout of NetworkGraph.edge_arrays
+- connections() yields connection dictionaries one at a time
+
+Connections go straight into a file (write_json) or the compact graph
+structure (to_graph) without ever being held in memory all at once.
+Random pairs are found by geometric skipping: the gap to the next
+connected pair is drawn directly, so the cost grows with the number of
+connections, not the number of possible pairs.
+
+Models:
+- GroupModelStream: the create_large_network model (five interleaved
+  groups, strong/medium connections inside a group, weak ones between)
+- StochasticBlockStream: consecutive blocks with their own connection
+  probabilities
+- PreferentialAttachmentStream: Barabasi-Albert growth, each new node
+  connects to existing nodes with probability proportional to degree
+- SmallWorldStream: Watts-Strogatz ring lattice with random rewiring
+
+With an integer seed every iteration of a stream yields the same network:
+
+    stream = SmallWorldStream(2_000_000, neighbors=6, rng=1)
+    stream.write_json('small_world.json')
+    graph = stream.to_graph()
+"""
+
+import json
+from array import array
+
+import numpy as np
+
+from network_graph import NetworkGraph, STRENGTH_WEIGHTS
+from seeding import make_rng, make_generator
+
+STRONG = STRENGTH_WEIGHTS['strong']
+MEDIUM = STRENGTH_WEIGHTS['medium']
+WEAK = STRENGTH_WEIGHTS['weak']
+STRENGTH_NAMES = {weight: name for name, weight in STRENGTH_WEIGHTS.items()}
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def group_name(index):
+    """Group label of the index-th group: A, B, ..., Z, G26, G27, ..."""
+    return chr(65 + index) if index < 26 else f"G{index}"
+
+
+def bernoulli_indices(total, probability, generator, batch=DEFAULT_CHUNK_SIZE):
+    """
+    Yield the indices in range(total) kept with the given probability.
+
+    Each index is kept independently. Instead of one random number per
+    index, the gaps between kept indices are drawn from a geometric
+    distribution, at most batch at a time (fewer when fewer indices are
+    expected to remain). Indices come in increasing order.
+    """
+    if total <= 0 or probability <= 0:
+        return
+    if probability >= 1:
+        for start in range(0, total, batch):
+            yield np.arange(start, min(start + batch, total), dtype=np.int64)
+        return
+    position = -1
+    while True:
+        expected = (total - 1 - position) * probability
+        count = int(min(batch, expected + 4 * expected ** 0.5 + 16))
+        indices = position + np.cumsum(generator.geometric(probability, count))
+        if indices[-1] >= total:
+            indices = indices[indices < total]
+            if len(indices):
+                yield indices
+            return
+        position = int(indices[-1])
+        yield indices
+
+
+def rechunk(chunks, size):
+    """Regroup (sources, targets, weights) chunks into chunks of exactly size connections (the last may be shorter)"""
+    pending = []
+    count = 0
+    for chunk in chunks:
+        if not len(chunk[0]):
+            continue
+        pending.append(chunk)
+        count += len(chunk[0])
+        while count >= size:
+            merged = [np.concatenate(parts) for parts in zip(*pending)]
+            yield tuple(part[:size] for part in merged)
+            rest = tuple(part[size:] for part in merged)
+            count -= size
+            pending = [rest] if count else []
+    if count:
+        yield tuple(np.concatenate(parts) for parts in zip(*pending))
+
+
+def write_network_json(path, nodes, connections):
+    """
+    Write a {'nodes': [...], 'connections': [...]} network file from iterables.
+
+    Only one node or connection is in memory at a time. The file can be
+    read by batch_layout.load_network like any other network file.
+    """
+    with open(path, 'w') as out:
+        out.write('{"nodes": [')
+        for count, node in enumerate(nodes):
+            out.write((',\n' if count else '\n') + json.dumps(node))
+        out.write('\n], "connections": [')
+        for count, connection in enumerate(connections):
+            out.write((',\n' if count else '\n') + json.dumps(connection))
+        out.write('\n]}\n')
+
+
+class NetworkStream:
+    """
+    Base class of the network streams.
+
+    Subclasses set num_nodes and implement group(index) and
+    _edge_chunks(generator).
+
+    Args:
+        rng: Seed, random.Random or NumPy Generator (an integer seed makes
+            every iteration yield the same network)
+        chunk_size: Connections per chunk of edge_chunks
+    """
+
+    def __init__(self, num_nodes, rng=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        if num_nodes < 0:
+            raise ValueError("num_nodes must not be negative")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        self.num_nodes = num_nodes
+        self.rng = rng
+        self.chunk_size = chunk_size
+
+    def group(self, index):
+        """Group of the node with 0-based index"""
+        raise NotImplementedError
+
+    def _edge_chunks(self, generator):
+        raise NotImplementedError
+
+    def nodes(self):
+        """Yield the node dictionaries (IDs 1..num_nodes)"""
+        for i in range(self.num_nodes):
+            yield {'id': i + 1, 'name': f'Person_{i + 1}', 'group': self.group(i)}
+
+    def edge_chunks(self):
+        """Yield (sources, targets, weights) arrays of node IDs with sources < targets"""
+        return rechunk(self._edge_chunks(make_generator(self.rng)), self.chunk_size)
+
+    def connections(self):
+        """Yield the connection dictionaries"""
+        for sources, targets, weights in self.edge_chunks():
+            for source, target, weight in zip(sources.tolist(), targets.tolist(), weights.tolist()):
+                yield {'from': source, 'to': target, 'strength': STRENGTH_NAMES[weight]}
+
+    def to_network(self):
+        """Return the whole network as a dictionary (for small networks)"""
+        return {'nodes': list(self.nodes()), 'connections': list(self.connections())}
+
+    def to_graph(self, weighted=True):
+        """Build a NetworkGraph without creating connection dictionaries"""
+        return NetworkGraph.from_edge_chunks(self.nodes(), self.edge_chunks(), weighted=weighted)
+
+    def write_json(self, path):
+        """Stream the network into a JSON network file"""
+        write_network_json(path, self.nodes(), self.connections())
+
+
+class StochasticBlockStream(NetworkStream):
+    """
+    Stochastic block model: nodes in consecutive blocks, each pair connected
+    with the probability of their two blocks.
+
+    Connections inside a block are strong or medium (half each), those
+    between blocks weak.
+
+    Args:
+        sizes: Number of nodes in each block
+        p_in: Connection probability inside a block
+        p_out: Connection probability between blocks
+        probabilities: Optional (blocks, blocks) matrix replacing p_in and
+            p_out
+    """
+
+    def __init__(self, sizes, p_in=0.1, p_out=0.01, probabilities=None, rng=None,
+                 chunk_size=DEFAULT_CHUNK_SIZE):
+        self.sizes = [int(size) for size in sizes]
+        super().__init__(sum(self.sizes), rng, chunk_size)
+        blocks = len(self.sizes)
+        if probabilities is None:
+            probabilities = np.full((blocks, blocks), float(p_out))
+            np.fill_diagonal(probabilities, float(p_in))
+        self.probabilities = np.asarray(probabilities, dtype=float)
+        if self.probabilities.shape != (blocks, blocks):
+            raise ValueError(f"probabilities must be a {blocks}x{blocks} matrix")
+        self.starts = np.concatenate([[0], np.cumsum(self.sizes)]).astype(np.int64)
+
+    def group(self, index):
+        return group_name(int(np.searchsorted(self.starts, index, side='right')) - 1)
+
+    def node_index(self, block, local):
+        """0-based node index of the local-th node(s) of a block"""
+        return self.starts[block] + local
+
+    def _edge_chunks(self, generator):
+        batch = self.chunk_size
+        for r, size in enumerate(self.sizes):
+            # Pairs a < b inside the block, numbered row by row
+            rows = np.arange(size, dtype=np.int64)
+            offsets = rows * size - rows * (rows + 1) // 2
+            for indices in bernoulli_indices(size * (size - 1) // 2, self.probabilities[r, r], generator, batch):
+                a = np.searchsorted(offsets, indices, side='right') - 1
+                b = a + 1 + indices - offsets[a]
+                weights = np.where(generator.random(len(indices)) < 0.5, STRONG, MEDIUM)
+                yield self._pairs(self.node_index(r, a), self.node_index(r, b), weights)
+            for s in range(r + 1, len(self.sizes)):
+                other = self.sizes[s]
+                for indices in bernoulli_indices(size * other, self.probabilities[r, s], generator, batch):
+                    yield self._pairs(self.node_index(r, indices // other), self.node_index(s, indices % other),
+                                      np.full(len(indices), WEAK))
+
+    @staticmethod
+    def _pairs(first, second, weights):
+        """(sources, targets, weights) with node IDs, lower ID first"""
+        return np.minimum(first, second) + 1, np.maximum(first, second) + 1, weights
+
+
+class GroupModelStream(StochasticBlockStream):
+    """
+    The create_large_network model as a stream.
+
+    Node i belongs to group A-E by i modulo 5; same-group pairs connect
+    with probability 2p (strong or medium), other pairs with 0.3p (weak).
+    This is a stochastic block model whose blocks are interleaved instead
+    of consecutive. The nodes match create_large_network exactly; the
+    connections follow the same model but come from NumPy's random
+    generator, so they differ from create_large_network for the same seed.
+    """
+
+    GROUPS = 5
+
+    def __init__(self, num_nodes=50, connection_probability=0.3, rng=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        sizes = [len(range(r, num_nodes, self.GROUPS)) for r in range(self.GROUPS)]
+        super().__init__(sizes, p_in=min(2 * connection_probability, 1.0),
+                         p_out=0.3 * connection_probability, rng=rng, chunk_size=chunk_size)
+        self.connection_probability = connection_probability
+
+    def group(self, index):
+        return group_name(index % self.GROUPS)
+
+    def node_index(self, block, local):
+        return block + self.GROUPS * local
+
+
+class PreferentialAttachmentStream(NetworkStream):
+    """
+    Barabasi-Albert preferential attachment.
+
+    Starts from a clique of edges_per_node + 1 nodes; every further node
+    connects to edges_per_node distinct earlier nodes, chosen with
+    probability proportional to their degree. Nodes are assigned to
+    groups round robin, and all connections are medium.
+
+    Choosing by degree means picking a random end of a random existing
+    connection, so the stream keeps one int32 per connection end (8 bytes
+    per connection) instead of the connections themselves.
+
+    Args:
+        edges_per_node: Connections made by each new node
+        groups: Number of groups
+    """
+
+    def __init__(self, num_nodes, edges_per_node=3, groups=5, rng=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        super().__init__(num_nodes, rng, chunk_size)
+        if edges_per_node < 1:
+            raise ValueError("edges_per_node must be positive")
+        self.edges_per_node = edges_per_node
+        self.groups = groups
+
+    def group(self, index):
+        return group_name(index % self.groups)
+
+    def edge_chunks(self):
+        # A plain Python loop over random.Random: each node depends on all
+        # earlier ones, so the choices cannot be vectorized
+        return rechunk(self._edge_chunks(make_rng(self.rng)), self.chunk_size)
+
+    def _edge_chunks(self, rng):
+        m = self.edges_per_node
+        n = self.num_nodes
+        seed_nodes = min(m + 1, n)
+        ends = array('i')
+        sources = array('q')
+        targets = array('q')
+        size = self.chunk_size
+
+        def flush():
+            chunk = (np.array(sources, dtype=np.int64) + 1, np.array(targets, dtype=np.int64) + 1,
+                     np.full(len(sources), MEDIUM))
+            del sources[:], targets[:]
+            return chunk
+
+        for a in range(seed_nodes):
+            for b in range(a + 1, seed_nodes):
+                sources.append(a)
+                targets.append(b)
+                ends.extend((a, b))
+                if len(sources) >= size:
+                    yield flush()
+        random = rng.random
+        for new in range(seed_nodes, n):
+            chosen = set()
+            while len(chosen) < m:
+                chosen.add(ends[int(random() * len(ends))])
+            for node in sorted(chosen):
+                sources.append(node)
+                targets.append(new)
+                ends.extend((node, new))
+            if len(sources) >= size:
+                yield flush()
+        if len(sources):
+            yield flush()
+
+
+class SmallWorldStream(NetworkStream):
+    """
+    Watts-Strogatz small world.
+
+    Nodes sit on a ring, each connected to its neighbors nearest nodes
+    (neighbors / 2 on each side) by strong connections. Each lattice
+    connection is rewired with probability rewire to a random node
+    outside the lattice neighborhood, becoming a weak shortcut. Two
+    rewired connections can rarely land on the same pair; NetworkGraph
+    merges such duplicates. Groups are equal arcs of the ring.
+
+    Args:
+        neighbors: Even number of lattice neighbors per node
+        rewire: Rewiring probability per connection
+        groups: Number of groups
+    """
+
+    def __init__(self, num_nodes, neighbors=4, rewire=0.1, groups=5, rng=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        super().__init__(num_nodes, rng, chunk_size)
+        if neighbors % 2 or neighbors < 2:
+            raise ValueError("neighbors must be a positive even number")
+        if num_nodes <= neighbors + 1 and num_nodes:
+            raise ValueError("num_nodes must be larger than neighbors + 1")
+        self.neighbors = neighbors
+        self.rewire = rewire
+        self.groups = groups
+
+    def group(self, index):
+        return group_name(index * self.groups // max(self.num_nodes, 1))
+
+    def _edge_chunks(self, generator):
+        n = self.num_nodes
+        half = self.neighbors // 2
+        rows = max(1, self.chunk_size // half)
+        steps = np.arange(1, half + 1, dtype=np.int64)
+        for start in range(0, n, rows):
+            first = np.repeat(np.arange(start, min(start + rows, n), dtype=np.int64), half)
+            offset = np.tile(steps, len(first) // half)
+            rewired = generator.random(len(first)) < self.rewire
+            # Shortcuts skip the lattice neighborhood on both sides
+            offset[rewired] = generator.integers(half + 1, n - half, int(rewired.sum()))
+            second = (first + offset) % n
+            weights = np.where(rewired, WEAK, STRONG)
+            yield np.minimum(first, second) + 1, np.maximum(first, second) + 1, weights
+
+
+STREAM_MODELS = {
+    'group': GroupModelStream,
+    'block': StochasticBlockStream,
+    'preferential_attachment': PreferentialAttachmentStream,
+    'small_world': SmallWorldStream,
+}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stream a synthetic network into a JSON network file")
+    parser.add_argument('model', choices=list(STREAM_MODELS))
+    parser.add_argument('nodes', type=int)
+    parser.add_argument('output')
+    parser.add_argument('--probability', type=float, default=0.001,
+                        help="connection probability (group model) or p_in (block model)")
+    parser.add_argument('--p-out', type=float, default=0.0001, help="between-block probability (block model)")
+    parser.add_argument('--blocks', type=int, default=5, help="number of equal blocks (block model)")
+    parser.add_argument('--edges-per-node', type=int, default=3, help="preferential attachment")
+    parser.add_argument('--neighbors', type=int, default=4, help="small world lattice neighbors")
+    parser.add_argument('--rewire', type=float, default=0.1, help="small world rewiring probability")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.model == 'group':
+        stream = GroupModelStream(args.nodes, args.probability, rng=args.seed)
+    elif args.model == 'block':
+        sizes = [len(range(b, args.nodes, args.blocks)) for b in range(args.blocks)]
+        stream = StochasticBlockStream(sizes, args.probability, args.p_out, rng=args.seed)
+    elif args.model == 'preferential_attachment':
+        stream = PreferentialAttachmentStream(args.nodes, args.edges_per_node, rng=args.seed)
+    else:
+        stream = SmallWorldStream(args.nodes, args.neighbors, args.rewire, rng=args.seed)
+    stream.write_json(args.output)
+    print(f"Wrote {args.output}")
@@ -0,0 +1,379 @@
+"""
+Parallel force computation
+
+The force models evaluate a whole layout in a few NumPy operations, but
+on 100k-node layouts a single core is still the bottleneck. A force
+backend splits one evaluation into parts (force_models.compute_part):
+each part covers a balanced run of grid cells for the repulsion, a
+slice of the edges for the attraction and a slice of the node rows, and
+the parts add up to the full forces. The backends sort the nodes into
+grid cells once per evaluation (force_models.CellGrid) and share the grid
+between the parts.
+
+ThreadPoolForceBackend is the lightweight option: it runs the parts on a
+ThreadPoolExecutor. The heavy NumPy operations (sorting, searchsorted,
+bincount, the element-wise arithmetic) release the GIL, so threads run
+them in parallel without process start-up or copies.
+
+SharedMemoryForceBackend runs the parts on a pool of worker processes
+that live as long as the backend. Positions and per-worker force
+accumulators are multiprocessing.shared_memory arrays, so a step only
+sends a tiny "compute n nodes" message to each worker; the graph arrays
+and the force model are sent once, when they change. The main process
+sums the partial forces.
+
+A simulation uses a backend when its force_backend attribute is set:
+
+    simulation.force_backend = ThreadPoolForceBackend(workers=4)
+    simulation.force_backend = SharedMemoryForceBackend(workers=4)
+    ...
+    simulation.force_backend.close()
+
+Compare the backends with the serial kernel on generated networks:
+
+    python parallel_forces.py --nodes 1000 5000 20000 --workers 1 2 4
+
+Backends have the same compute(model, positions, graph) interface, so
+apply_social_forces does not depend on which one is used.
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from force_models import CellGrid, compute_part
+
+
+class GraphArrays:
+    """
+    Picklable snapshot of the NetworkGraph arrays the force models use.
+
+    Sent to the workers instead of the graph itself, which also holds the
+    node dictionaries and adjacency lists.
+    """
+
+    def __init__(self, graph):
+        self.num_nodes = graph.num_nodes
+        self._edges = graph.edge_arrays()
+        self._edge_keys = graph.edge_keys()
+        self._degrees = graph.degree_array()
+        self._group_codes = graph.group_codes()
+        self._group_sizes = graph.group_sizes()
+
+    def edge_arrays(self):
+        return self._edges
+
+    def edge_keys(self):
+        return self._edge_keys
+
+    def degree_array(self):
+        return self._degrees
+
+    def group_codes(self):
+        return self._group_codes
+
+    def group_sizes(self):
+        return self._group_sizes
+
+
+class ThreadPoolForceBackend:
+    """
+    Force backend running the force parts on a thread pool.
+
+    Args:
+        workers: Number of threads (defaults to the CPU count)
+        parts: Number of parts per evaluation (defaults to workers)
+    """
+
+    def __init__(self, workers=None, parts=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.parts = parts or self.workers
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='force-worker')
+
+    def compute(self, model, positions, graph):
+        """Return the (N, 2) forces of model for positions, computed in parallel"""
+        if self._executor is None:
+            raise RuntimeError("Force backend is closed")
+        if self.parts == 1:
+            return model.compute(positions, graph)
+        # The graph builds its arrays lazily, which is not thread-safe;
+        # the threads share a snapshot of the finished arrays instead
+        arrays = GraphArrays(graph)
+        # The cell sort is done once here instead of once per part
+        grid = model.cell_grid(positions) if hasattr(model, 'cell_grid') else None
+        futures = [self._executor.submit(compute_part, model, positions, arrays, (index, self.parts), grid)
+                   for index in range(self.parts)]
+        forces = futures[0].result()
+        for future in futures[1:]:
+            forces += future.result()
+        return forces
+
+    def close(self):
+        """Shut the thread pool down"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+def _attach(name, shape, dtype=np.float64):
+    """Open an existing shared memory block as an array"""
+    # Workers share the main process's resource tracker, so attaching only
+    # repeats the main process's registration; the main process unlinks
+    if sys.version_info >= (3, 13):
+        block = shared_memory.SharedMemory(name=name, track=False)
+    else:
+        block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _worker(index, count, connection):
+    """Worker process loop: compute one part of the forces per request"""
+    graph = None
+    model = None
+    blocks = []
+    positions = forces = cells = None
+    while True:
+        message = connection.recv()
+        kind = message[0]
+        if kind == 'compute':
+            _, n, sample_rate, grid_shape = message
+            if sample_rate is not None:
+                model.edge_sample_rate = sample_rate  # Adapted between steps
+            grid = None
+            if grid_shape is not None:
+                cutoff, stride, num_cells = grid_shape
+                grid = CellGrid.from_arrays(cutoff, stride, cells[0, :n], cells[1, :num_cells],
+                                            cells[2, :num_cells], cells[3, :num_cells])
+            try:
+                forces[:n] = compute_part(model, positions[:n], graph, (index, count), grid)
+            except Exception as e:
+                connection.send(f"{type(e).__name__}: {e}")
+            else:
+                connection.send(None)
+        elif kind == 'buffers':
+            _, positions_name, forces_name, cells_name, capacity = message
+            for block in blocks:
+                block.close()
+            positions_block, positions = _attach(positions_name, (capacity, 2))
+            forces_block, all_forces = _attach(forces_name, (count, capacity, 2))
+            cells_block, cells = _attach(cells_name, (4, capacity), np.int64)
+            forces = all_forces[index]
+            blocks = [positions_block, forces_block, cells_block]
+            connection.send(None)
+        elif kind == 'graph':
+            graph = message[1]
+        elif kind == 'model':
+            model = message[1]
+        elif kind == 'stop':
+            break
+    positions = forces = all_forces = cells = None
+    for block in blocks:
+        block.close()
+
+
+class SharedMemoryForceBackend:
+    """
+    Force backend running on persistent worker processes.
+
+    Args:
+        workers: Number of worker processes (defaults to the CPU count)
+        capacity: Smallest number of nodes the shared buffers are created
+            for; they grow when a larger graph arrives
+    """
+
+    def __init__(self, workers=None, capacity=1024):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_capacity = capacity
+        self.capacity = 0  # Buffers are created on the first compute
+        self._blocks = []
+        self._positions = None
+        self._forces = None
+        self._cells = None
+        self._graph = None
+        self._graph_state = None
+        self._model = None
+        self._connections = []
+        self._processes = []
+        # Start the resource tracker before the workers so they share it
+        resource_tracker.ensure_running()
+        for index in range(self.workers):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_worker, args=(index, self.workers, child),
+                                              name=f'force-worker-{index}', daemon=True)
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+
+    def _allocate(self, capacity):
+        """Create shared buffers for capacity nodes and hand them to the workers"""
+        positions = shared_memory.SharedMemory(create=True, size=capacity * 2 * 8)
+        forces = shared_memory.SharedMemory(create=True, size=self.workers * capacity * 2 * 8)
+        cells = shared_memory.SharedMemory(create=True, size=4 * capacity * 8)
+        self._broadcast(('buffers', positions.name, forces.name, cells.name, capacity))
+        # The old buffers may only go once every worker has switched over
+        self._wait()
+        self._release_buffers()
+        self._blocks = [positions, forces, cells]
+        self._positions = np.ndarray((capacity, 2), dtype=np.float64, buffer=positions.buf)
+        self._forces = np.ndarray((self.workers, capacity, 2), dtype=np.float64, buffer=forces.buf)
+        # Cell grid rows: node order, then key, start and size of every cell
+        self._cells = np.ndarray((4, capacity), dtype=np.int64, buffer=cells.buf)
+        self.capacity = capacity
+
+    def _release_buffers(self):
+        self._positions = self._forces = self._cells = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def _broadcast(self, message):
+        for connection in self._connections:
+            connection.send(message)
+
+    def _wait(self):
+        """Wait for every worker's reply and raise the first error"""
+        errors = [error for error in (connection.recv() for connection in self._connections) if error]
+        if errors:
+            raise RuntimeError(f"Force worker failed: {errors[0]}")
+
+    def compute(self, model, positions, graph):
+        """
+        Return the (N, 2) forces of model for positions, computed in parallel.
+
+        The graph and model are only sent to the workers when they change
+        (a new graph, a new graph version or a different model object); the
+        model's edge sample rate goes with every step. The cell grid of the
+        repulsion is built here once and shared through memory.
+        """
+        if not self._processes:
+            raise RuntimeError("Force backend is closed")
+        n = len(positions)
+        if n > self.capacity:
+            self._allocate(max(n, 2 * self.capacity, self.min_capacity))
+        # Compared by identity, and kept alive so a new graph can never
+        # reuse the id of the one the workers hold
+        graph_state = (graph.version, n)
+        if graph is not self._graph or graph_state != self._graph_state:
+            self._broadcast(('graph', GraphArrays(graph)))
+            self._graph = graph
+            self._graph_state = graph_state
+        if model is not self._model:
+            self._broadcast(('model', model))
+            self._model = model
+
+        self._positions[:n] = positions
+        grid_shape = self._share_grid(model, positions)
+        self._broadcast(('compute', n, getattr(model, 'edge_sample_rate', None), grid_shape))
+        self._wait()
+        return self._forces[:, :n].sum(axis=0)
+
+    def _share_grid(self, model, positions):
+        """Sort the nodes into cells once and place the grid in shared memory for every worker"""
+        grid = model.cell_grid(positions) if hasattr(model, 'cell_grid') else None
+        if grid is None:
+            return None
+        num_cells = len(grid.cell_keys)
+        self._cells[0, :len(grid.order)] = grid.order
+        self._cells[1, :num_cells] = grid.cell_keys
+        self._cells[2, :num_cells] = grid.starts
+        self._cells[3, :num_cells] = grid.counts
+        return grid.cutoff, grid.stride, num_cells
+
+    def close(self):
+        """Stop the workers and free the shared memory"""
+        if not self._processes:
+            return
+        self._broadcast(('stop',))
+        for process in self._processes:
+            process.join()
+        for connection in self._connections:
+            connection.close()
+        self._processes = []
+        self._connections = []
+        self._release_buffers()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+def benchmark(sizes=(1000, 5000, 20000), workers=(1, 2, 4), force_model='linear_spring',
+              repeats=5, density=20000.0, seed=0):
+    """
+    Time the serial kernel against both backends.
+
+    Args:
+        sizes: Node counts of the generated networks (about 3 connections
+            per node)
+        workers: Thread / process counts to try
+        force_model: Registered force model name
+        repeats: Evaluations timed per configuration (after one warm-up)
+        density: Square pixels of canvas per node, so the number of
+            repulsion pairs per node stays constant across sizes
+        seed: Seed of the networks and positions
+
+    Returns:
+        List of {'nodes', 'backend', 'workers', 'milliseconds', 'speedup'}
+        dictionaries
+    """
+    from force_models import create_force_model
+    from network_graph import NetworkGraph
+    from social_network_data import create_large_network
+
+    model = create_force_model(force_model)
+    rows = []
+    for n in sizes:
+        graph = NetworkGraph(create_large_network(n, 1.5 / n, rng=seed))
+        side = (n * density) ** 0.5
+        positions = np.random.default_rng(seed).uniform(0, side, (n, 2))
+
+        def timed(compute):
+            compute(model, positions, graph)
+            start = time.perf_counter()
+            for _ in range(repeats):
+                compute(model, positions, graph)
+            return (time.perf_counter() - start) / repeats * 1000
+
+        serial = timed(lambda model, positions, graph: model.compute(positions, graph))
+        rows.append({'nodes': n, 'backend': 'serial', 'workers': 1, 'milliseconds': serial, 'speedup': 1.0})
+        for backend_class in (ThreadPoolForceBackend, SharedMemoryForceBackend):
+            for count in workers:
+                with backend_class(workers=count) as backend:
+                    milliseconds = timed(backend.compute)
+                rows.append({'nodes': n, 'backend': backend_class.__name__, 'workers': count,
+                             'milliseconds': milliseconds, 'speedup': serial / milliseconds})
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the parallel force backends")
+    parser.add_argument('--nodes', type=int, nargs='+', default=[1000, 5000, 20000])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--force-model', default='linear_spring')
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, force model {args.force_model}")
+    print(f"{'nodes':>7} {'backend':<26} {'workers':>7} {'ms/step':>9} {'speedup':>8}")
+    for row in benchmark(args.nodes, args.workers, args.force_model, args.repeats):
+        print(f"{row['nodes']:>7} {row['backend']:<26} {row['workers']:>7} "
+              f"{row['milliseconds']:>9.1f} {row['speedup']:>7.2f}x")
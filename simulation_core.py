@@ -0,0 +1,966 @@
+"""
+Shared simulation core for the Social Clustering Simulation
+
+main.py, main_enhanced.py and all_in_one.py are thin launchers around
+SocialSimulation. The launchers differ only in their parameter profile
+(PROFILES): window size, force constants, node size, walls and which
+networks and UI panels are available. Network creation, the force path,
+mouse handling and drawing live here once, so every fix and speedup
+reaches all entry points.
+
+A profile is selected by name, and individual values can be overridden:
+
+    simulation = SocialSimulation('basic', seed=42)
+    simulation = SocialSimulation('enhanced', width=1000, height=700)
+
+pygame and pymunk are imported where they are first needed, not by this
+module: importing the launchers (for their classes or profiles) stays
+cheap, constructing a simulation loads pymunk, and pygame and the window
+are only opened when the simulation is drawn or run.
+"""
+
+import time
+from contextlib import nullcontext
+
+import numpy as np
+from social_network_data import create_social_network, create_clique_network, create_large_network
+from network_graph import NetworkGraph, STRENGTH_WEIGHTS
+from force_models import create_force_model
+from spatial_clustering import cluster_layout, cluster_colors, NOISE, NOISE_COLOR
+from frame_profiler import FrameProfiler
+from seeding import make_rng
+from step_control import StepController, apply_controlled_forces
+from initial_layouts import INITIAL_LAYOUTS, initial_positions
+from layout_cache import settle_layout
+from spatial_index import GridIndex
+from viewport import Camera, cull_edges
+from async_physics import PhysicsThread
+from edge_sampling import SampleRateController
+
+# Ego network view: connection color by strength weight, ring color by hops
+EGO_EDGE_COLORS = {3.0: (255, 210, 90), 2.0: (220, 160, 70), 1.0: (160, 120, 80)}
+EGO_RING_COLORS = [(255, 255, 255), (255, 255, 0), (255, 150, 0), (200, 90, 0)]
+
+# Frame phases measured by the profiler overlay (T key), in display order
+PROFILED_PHASES = ['events', 'apply_social_forces', 'space_step', 'update_clusters',
+                   'draw_network', 'draw_ui', 'draw_metrics', 'display_flip']
+
+# Parameter profiles of the launchers. 'basic' keeps the stronger forces of
+# the original main.py; 'enhanced' lowers them for stability and adds walls
+PROFILES = {
+    'basic': {
+        'width': 1200,
+        'height': 800,
+        'caption': "Social Attraction & Clustering Simulation",
+        'attraction_force': 5000,
+        'repulsion_force': 3000,
+        'repulsion_distance': 100,
+        'damping': 0.98,
+        'force_params': {'rest_length': 50},
+        'node_radius': 15,
+        'margin': 50,           # Distance of the initial positions from the border
+        'walls': False,
+        'network_types': ['basic'],
+        'control_panel': False,  # One-line key hint instead of the full panel
+    },
+    'enhanced': {
+        'width': 1400,
+        'height': 900,
+        'caption': "Enhanced Social Attraction & Clustering Simulation",
+        'attraction_force': 2000,
+        'repulsion_force': 1500,
+        'repulsion_distance': 80,
+        'damping': 0.95,
+        'force_params': {'rest_length': 60, 'max_attraction': 1000, 'max_repulsion': 800},
+        'node_radius': 18,
+        'margin': 100,
+        'walls': True,
+        'network_types': ['basic', 'clique', 'large'],
+        'control_panel': True,
+    },
+}
+
+NETWORK_NAMES = {'basic': 'Basic Network', 'clique': 'Clique Network', 'large': 'Large Network'}
+
+
+class SocialSimulation:
+    """
+    Interactive social clustering simulation.
+
+    Args:
+        width, height: Window size (defaults to the profile's size)
+        seed: Seed or random.Random instance for reproducible runs
+        profile: Name in PROFILES (defaults to the class's PROFILE)
+        overrides: Profile values to replace, e.g. walls=False
+    """
+
+    PROFILE = 'enhanced'
+
+    def __init__(self, width=None, height=None, seed=None, profile=None, **overrides):
+        profile = profile or self.PROFILE
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown profile: {profile} (available: {', '.join(PROFILES)})")
+        settings = dict(PROFILES[profile], **overrides)
+        self.profile = profile
+        self.width = width or settings['width']
+        self.height = height or settings['height']
+        width, height = self.width, self.height
+        
+        # Random source for networks and initial positions (seed or
+        # random.Random for reproducible layouts)
+        self.seed = seed
+        self.rng = make_rng(seed)
+        
+        # The window is opened on first use of self.screen (see open_display)
+        self.caption = settings['caption']
+        self._screen = None
+        self._draw_options = None
+        self.clock = None
+        
+        # Initialize Pymunk space
+        import pymunk
+        self.space = pymunk.Space()
+        self.space.gravity = (0, 0)
+        
+        # Simulation parameters
+        self.attraction_force = settings['attraction_force']
+        self.repulsion_force = settings['repulsion_force']
+        self.repulsion_distance = settings['repulsion_distance']
+        self.damping = settings['damping']
+        self.force_model = 'linear_spring'  # Name registered in force_models
+        self.group_gravity = 0.0      # Pull towards group centroid (0 = off)
+        self.group_gravity_strength = 10.0  # Strength used when toggled on
+        self.force_params = dict(settings['force_params'])
+        self.initial_layout = 'random'  # Name registered in initial_layouts
+        self.time_step = 1/60.0        # Physics step in seconds
+        self.step_control = None      # Optional step_control.StepController
+        self.edge_sampling = None     # Optional edge_sampling.SampleRateController
+        self.force_backend = None     # Optional parallel_forces backend (None = this thread)
+        self.async_physics = False    # Step the physics on a background thread in run()
+        self.physics_thread = None    # async_physics.PhysicsThread while it runs
+        self.layout_cache = None      # Optional layout_cache.LayoutCache (needs a seed)
+        self.node_radius = settings['node_radius']
+        self.margin = settings['margin']
+        self.walls = settings['walls']
+        self.control_panel = settings['control_panel']
+        
+        # Network data
+        self.nodes = []
+        self.connections = []
+        self.graph = None
+        self.node_bodies = {}
+        self.node_shapes = {}  # Store shapes for custom drawing
+        self.bodies = []       # Node bodies in graph index order
+        self._force_model = None
+        self._force_model_key = None
+        
+        # Color scheme for groups
+        self.group_colors = {
+            'A': (255, 100, 100),    # Red
+            'B': (100, 255, 100),    # Green
+            'C': (100, 100, 255),    # Blue
+            'Tech': (255, 165, 0),   # Orange
+            'Art': (255, 20, 147),   # Deep Pink
+            'Sports': (0, 255, 255), # Cyan
+            'Bridge': (255, 255, 0), # Yellow
+        }
+        
+        # UI state
+        self.show_forces = False
+        self.show_metrics = self.control_panel
+        self.show_clusters = False
+        self.cluster_result = None
+        self.cluster_palette = []
+        self.cluster_refresh_interval = 15  # Frames between re-clustering
+        self.frame_count = 0
+        self.paused = False
+        self.profiler = FrameProfiler(PROFILED_PHASES)
+        self.profiler_font = None
+        self.selected_body = None
+        self.mouse_joint = None
+        self.dragging = False         # Left button holds a node (UI side)
+        
+        # View state
+        self.camera = Camera(width, height)
+        self.label_zoom = 0.6         # Hide node labels below this zoom
+        self.max_drawn_edges = 20000  # Draw a subset of the visible edges beyond this
+        self.label_font = None
+        self.spatial_index = None     # Grid over the positions last drawn
+        self.panning = False
+        self.hover_node = None        # Graph index of the node under the mouse
+        self.ego_mode = False         # Click a node to show its ego network
+        self.ego_depth = 2            # Hops included in the ego network
+        self.ego_center = None        # Graph index of the inspected node
+        self.dim_overlay = None       # Cached translucent surface for dimming
+        
+        # Network selection
+        self.network_types = list(settings['network_types'])
+        self.current_network = 0
+        
+        # Create boundary walls to keep nodes in view
+        if self.walls:
+            self.create_boundaries()
+        
+        # Create initial network
+        self.create_network()
+        
+    @property
+    def screen(self):
+        """Surface drawn on; opens the window the first time it is needed"""
+        if self._screen is None:
+            self.open_display()
+        return self._screen
+    
+    @screen.setter
+    def screen(self, surface):
+        self._screen = surface
+        self._draw_options = None
+    
+    @property
+    def draw_options(self):
+        """pymunk debug drawing options for the current screen"""
+        if self._draw_options is None:
+            import pymunk.pygame_util
+            self._draw_options = pymunk.pygame_util.DrawOptions(self.screen)
+        return self._draw_options
+    
+    def open_display(self):
+        """Initialize pygame and open the simulation window"""
+        import pygame
+        pygame.init()
+        self.screen = pygame.display.set_mode((self.width, self.height))
+        pygame.display.set_caption(self.caption)
+        self.clock = pygame.time.Clock()
+        
+    def create_boundaries(self):
+        """Create boundary walls to keep nodes within the screen"""
+        import pymunk
+        # Create static bodies for boundaries
+        thickness = 20
+        static_body = pymunk.Body(body_type=pymunk.Body.STATIC)
+        
+        # Top wall
+        top_wall = pymunk.Segment(static_body, (0, thickness), (self.width, thickness), thickness)
+        top_wall.elasticity = 0.8
+        top_wall.friction = 0.7
+        
+        # Bottom wall
+        bottom_wall = pymunk.Segment(static_body, (0, self.height - thickness), (self.width, self.height - thickness), thickness)
+        bottom_wall.elasticity = 0.8
+        bottom_wall.friction = 0.7
+        
+        # Left wall
+        left_wall = pymunk.Segment(static_body, (thickness, 0), (thickness, self.height), thickness)
+        left_wall.elasticity = 0.8
+        left_wall.friction = 0.7
+        
+        # Right wall
+        right_wall = pymunk.Segment(static_body, (self.width - thickness, 0), (self.width - thickness, self.height), thickness)
+        right_wall.elasticity = 0.8
+        right_wall.friction = 0.7
+        
+        self.space.add(static_body, top_wall, bottom_wall, left_wall, right_wall)
+        
+    def create_network(self, network_data=None):
+        """
+        Create the social network with nodes and connections
+        
+        Args:
+            network_data: Network dictionary to use instead of the selected
+                built-in network
+        """
+        import pymunk
+        # Drop a dragged node, then clear node bodies, not the entire space
+        # (preserves boundaries)
+        self.apply_mouse_command(('release',))
+        self.dragging = False
+        for body in list(self.node_bodies.values()):
+            if body in self.space.bodies:
+                self.space.remove(body, *body.shapes)
+        self.node_bodies.clear()
+        self.time_step = 1/60.0
+        if self.step_control is not None:
+            self.step_control.reset()
+            self.time_step = self.step_control.dt
+        if self.edge_sampling is not None:
+            self.edge_sampling.reset()
+        self.node_shapes.clear()
+        self.cluster_result = None
+        self.spatial_index = None
+        self.hover_node = None
+        self.ego_center = None
+        
+        # Select network type
+        if network_data is None:
+            network_type = self.network_types[self.current_network]
+            if network_type == 'basic':
+                network_data = create_social_network()
+            elif network_type == 'clique':
+                network_data = create_clique_network()
+            else:
+                network_data = create_large_network(30, 0.4, rng=self.rng)
+        
+        self.nodes = network_data['nodes']
+        self.connections = network_data['connections']
+        self.graph = NetworkGraph(network_data)
+        
+        # Create pymunk bodies for each node
+        positions = initial_positions(self.initial_layout, self.graph, self.width, self.height,
+                                      margin=self.margin, rng=self.rng)
+        for node, position in zip(self.nodes, positions):
+            body = pymunk.Body(1, pymunk.moment_for_circle(1, 0, self.node_radius))
+            body.position = (float(position[0]), float(position[1]))
+            body.velocity = (0, 0)
+            
+            # Create shape for the body
+            shape = pymunk.Circle(body, self.node_radius)
+            shape.elasticity = 0.8
+            shape.friction = 0.7
+            shape.collision_type = 1
+            
+            self.space.add(body, shape)
+            self.node_bodies[node['id']] = body
+            self.node_shapes[node['id']] = shape
+        self.bodies = [self.node_bodies[node_id] for node_id in self.graph.node_ids]
+        
+        # Start from the converged layout, cached or settled now
+        if self.layout_cache is not None and self.seed is not None:
+            settle_layout(self, cache=self.layout_cache)
+        if self.physics_thread is not None:
+            self.physics_thread.publish()
+    
+    def apply_social_forces(self):
+        """Apply attraction and repulsion forces based on social connections"""
+        if self.paused:
+            return
+            
+        bodies = self.bodies
+        if not bodies:
+            return
+        positions = self.body_positions()
+        
+        # Compute all forces at once with the selected force model
+        model = self.current_force_model()
+        if self.edge_sampling is not None:
+            model.edge_sample_rate = self.edge_sampling.rate
+            start = time.perf_counter()
+        if self.force_backend is not None:
+            forces = self.force_backend.compute(model, positions, self.graph)
+        else:
+            forces = model.compute(positions, self.graph)
+        if self.edge_sampling is not None:
+            self.edge_sampling.update(time.perf_counter() - start)
+        
+        if self.step_control is not None:
+            # The controller replaces the stability tweaks: damping applies
+            # once per step and the step size adapts to the energy
+            self.time_step = apply_controlled_forces(bodies, forces, self.damping, self.step_control)
+            return
+        
+        # The original pairwise loop damped every body once per pair it was
+        # part of, so keep the same effective damping per step
+        damping = self.damping ** (len(bodies) - 1)
+        for body, (force_x, force_y) in zip(bodies, forces.tolist()):
+            body.apply_force_at_local_point((force_x, force_y), (0, 0))
+            body.velocity = (body.velocity.x * damping, body.velocity.y * damping)
+    
+    def step_physics(self):
+        """Apply the forces and advance the physics space by one step"""
+        self.apply_social_forces()
+        if not self.paused:
+            self.space.step(self.time_step)
+    
+    def start_physics_thread(self, steps_per_second=60.0):
+        """Move the physics to a background thread (see async_physics)"""
+        if self.physics_thread is None:
+            self.physics_thread = PhysicsThread(self, steps_per_second)
+            self.physics_thread.start()
+        return self.physics_thread
+    
+    def stop_physics_thread(self):
+        """Stop the background physics thread; physics runs in run() again"""
+        if self.physics_thread is not None:
+            self.physics_thread.stop()
+            self.physics_thread = None
+    
+    def physics_locked(self):
+        """Context manager that holds the physics thread between steps (no-op without it)"""
+        if self.physics_thread is None:
+            return nullcontext()
+        return self.physics_thread.lock
+    
+    def force_settings(self):
+        """Return (model name, parameters) of the force model for the current settings"""
+        model_name = self.force_model
+        if self.group_gravity and 'group_gravity' not in model_name.split('+'):
+            model_name += '+group_gravity'
+        params = {
+            'attraction_force': self.attraction_force,
+            'repulsion_force': self.repulsion_force,
+            'repulsion_distance': self.repulsion_distance,
+            'group_gravity': self.group_gravity,
+        }
+        if self.edge_sampling is not None:
+            params['edge_sample_seed'] = self.seed
+        params.update(self.force_params)
+        return model_name, params
+    
+    def layout_settings(self):
+        """Return everything besides the network that the converged layout depends on"""
+        model_name, params = self.force_settings()
+        return {
+            'profile': self.profile,
+            'width': self.width,
+            'height': self.height,
+            'walls': self.walls,
+            'node_radius': self.node_radius,
+            'margin': self.margin,
+            'force_model': model_name,
+            'force_params': params,
+            'damping': self.damping,
+            'initial_layout': self.initial_layout,
+            'seed': self.seed,
+            'step_control': self.step_control.settings() if self.step_control else None,
+            'edge_sampling': self.edge_sampling.settings() if self.edge_sampling else None,
+        }
+    
+    def current_force_model(self):
+        """Return the force model for the current settings, reusing it while they are unchanged"""
+        model_name, params = self.force_settings()
+        key = (model_name, tuple(sorted(params.items())))
+        if self._force_model_key != key:
+            self._force_model = create_force_model(model_name, **params)
+            self._force_model_key = key
+        return self._force_model
+    
+    def update_clusters(self):
+        """Re-run spatial clustering over the current body positions"""
+        positions = dict(zip(self.graph.node_ids, self.display_positions().tolist()))
+        self.cluster_result = cluster_layout(positions, self.nodes, node_radius=self.node_radius)
+        self.cluster_palette = cluster_colors(self.cluster_result['num_clusters'])
+    
+    def node_color(self, node):
+        """Return the fill color for a node (group color or cluster overlay)"""
+        if self.show_clusters and self.cluster_result:
+            cluster = self.cluster_result['clusters'].get(node['id'], NOISE)
+            if cluster == NOISE:
+                return NOISE_COLOR
+            return self.cluster_palette[cluster]
+        
+        group = node.get('group', 'A')
+        return self.group_colors.get(group, (200, 200, 200))
+    
+    def handle_mouse_interaction(self, event):
+        """Handle mouse events for dragging nodes, zooming and panning"""
+        import pygame
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if event.button == 1:
+                mouse_pos = self.camera.screen_to_world(pygame.mouse.get_pos())
+                
+                node = self.pick_node(mouse_pos)
+                if self.ego_mode:
+                    self.ego_center = node
+                if node is not None:
+                    self.send_mouse_command(('grab', node, mouse_pos))
+                    self.dragging = True
+            elif event.button == 3:
+                self.panning = True
+        
+        elif event.type == pygame.MOUSEBUTTONUP:
+            if event.button == 1 and self.dragging:
+                self.send_mouse_command(('release',))
+                self.dragging = False
+            elif event.button == 3:
+                self.panning = False
+        
+        elif event.type == pygame.MOUSEMOTION:
+            if self.panning:
+                self.camera.pan(*event.rel)
+            if self.dragging:
+                self.send_mouse_command(('drag', self.camera.screen_to_world(pygame.mouse.get_pos())))
+            else:
+                self.hover_node = self.pick_node(self.camera.screen_to_world(pygame.mouse.get_pos()))
+        
+        elif event.type == pygame.MOUSEWHEEL:
+            self.camera.zoom_at(pygame.mouse.get_pos(), 1.15 ** event.y)
+    
+    def send_mouse_command(self, command):
+        """Apply a mouse command now, or queue it for the physics thread"""
+        if self.physics_thread is not None:
+            self.physics_thread.send(command)
+        else:
+            self.apply_mouse_command(command)
+    
+    def apply_mouse_command(self, command):
+        """
+        Apply a mouse command to the physics space
+        
+        Args:
+            command: ('grab', node index, world position), ('drag', world
+                position) or ('release',)
+        """
+        import pymunk
+        kind = command[0]
+        if kind == 'grab':
+            _, node, position = command
+            self.apply_mouse_command(('release',))
+            if node >= len(self.bodies):
+                return  # Picked before the network changed
+            self.selected_body = self.bodies[node]
+            self.mouse_joint = pymunk.PinJoint(self.selected_body, self.space.static_body,
+                                               (0, 0), tuple(position))
+            self.space.add(self.mouse_joint)
+        elif kind == 'drag' and self.mouse_joint:
+            self.mouse_joint.anchor_b = tuple(command[1])
+        elif kind == 'release' and self.mouse_joint:
+            if self.mouse_joint in self.space.constraints:
+                self.space.remove(self.mouse_joint)
+            self.mouse_joint = None
+            self.selected_body = None
+    
+    def pick_node(self, world_pos):
+        """
+        Return the graph index of the node at world_pos, or None
+        
+        Uses the grid index of the last drawn frame, so picking matches what
+        is on screen and costs the same for any network size. The index is
+        built on demand if nothing has been drawn since the network changed.
+        """
+        if self.graph is None or not self.graph.num_nodes:
+            return None
+        if self.spatial_index is None:
+            self.update_spatial_index(self.display_positions())
+        # Stay easy to hit when nodes are tiny on screen
+        radius = max(self.node_radius, 5 / self.camera.zoom)
+        return self.spatial_index.nearest(world_pos[0], world_pos[1], radius)
+    
+    def update_spatial_index(self, positions):
+        """
+        Point the grid index at positions, rebuilding it only when needed.
+        
+        The index keeps a slack of one node radius, so while the layout
+        settles it is rebuilt only after a node has moved that far since
+        the last rebuild, not on every frame.
+        """
+        if self.spatial_index is None or not self.spatial_index.update(positions):
+            self.spatial_index = GridIndex(positions, cell_size=max(4 * self.node_radius, 1),
+                                           slack=self.node_radius)
+        return self.spatial_index
+    
+    def body_positions(self):
+        """Return an (N, 2) array of body positions in graph index order"""
+        bodies = self.bodies
+        coordinates = np.fromiter((value for body in bodies for value in body.position), float, 2 * len(bodies))
+        return coordinates.reshape(-1, 2)
+    
+    def display_positions(self):
+        """Return the positions to draw: the latest physics thread snapshot, or the bodies"""
+        if self.physics_thread is not None:
+            return self.physics_thread.snapshot.read()[0]
+        return self.body_positions()
+    
+    def draw_network(self):
+        """Draw the visible part of the network with enhanced visualization"""
+        import pygame
+        if self.graph is None or not self.graph.num_nodes:
+            return
+        
+        camera = self.camera
+        positions = self.display_positions()
+        screen_positions = camera.world_to_screen(positions)
+        view = camera.visible_rect(margin=self.node_radius)
+        
+        # Draw connections with varying thickness based on strength
+        sources, targets, weights = self.graph.edge_arrays()
+        visible = cull_edges(positions, sources, targets, view)
+        # Skip connections shorter than a pixel on screen
+        delta = np.abs(screen_positions[targets] - screen_positions[sources])
+        visible &= (delta.max(axis=1) >= 1)
+        visible = np.nonzero(visible)[0]
+        if len(visible) > self.max_drawn_edges:
+            # Too many to draw smoothly: draw an even subset
+            visible = visible[::-(-len(visible) // self.max_drawn_edges)]
+        starts = screen_positions[sources[visible]].tolist()
+        ends = screen_positions[targets[visible]].tolist()
+        for start_pos, end_pos, weight in zip(starts, ends, weights[visible].tolist()):
+            # Line thickness based on connection strength
+            if weight >= 3:
+                pygame.draw.line(self.screen, (150, 150, 150), start_pos, end_pos, 3)
+            elif weight >= 2:
+                pygame.draw.line(self.screen, (120, 120, 120), start_pos, end_pos, 2)
+            else:
+                pygame.draw.line(self.screen, (80, 80, 80), start_pos, end_pos, 1)
+        
+        self.draw_hover_connections(screen_positions)
+        
+        # Draw the nodes inside the view with custom colors
+        visible = self.update_spatial_index(positions).query_rect(*view)
+        radius = max(1, int(round(self.node_radius * camera.zoom)))
+        show_labels = camera.zoom >= self.label_zoom
+        if show_labels and self.label_font is None:
+            self.label_font = pygame.font.Font(None, 24)
+        
+        nodes = self.graph.nodes
+        if radius <= 1:
+            # Zoomed far out: plot every node as a single pixel in one pass
+            points = screen_positions[visible].astype(np.int64)
+            inside = ((points >= 0) & (points < (self.width, self.height))).all(axis=1)
+            colors = np.array([self.node_color(nodes[i]) for i in visible[inside].tolist()]).reshape(-1, 3)
+            pixels = pygame.surfarray.pixels3d(self.screen)
+            pixels[points[inside, 0], points[inside, 1]] = colors
+            del pixels  # Unlock the surface
+        else:
+            for i, pos in zip(visible.tolist(), screen_positions[visible].tolist()):
+                node = nodes[i]
+                
+                # Get color for the group (or spatial cluster)
+                pygame.draw.circle(self.screen, self.node_color(node), pos, radius)
+                if radius > 3:
+                    pygame.draw.circle(self.screen, (255, 255, 255), pos, radius, 2)  # White border
+                
+                # Draw node ID
+                if show_labels:
+                    text = self.label_font.render(str(node['id']), True, (0, 0, 0))
+                    self.screen.blit(text, text.get_rect(center=pos))
+        
+        self.draw_ego_network(screen_positions, radius, show_labels)
+        self.draw_hover(screen_positions, radius)
+    
+    def get_dim_overlay(self):
+        """Return the translucent surface used to dim the screen, creating it once"""
+        import pygame
+        size = self.screen.get_size()
+        if self.dim_overlay is None or self.dim_overlay.get_size() != size:
+            self.dim_overlay = pygame.Surface(size, pygame.SRCALPHA)
+            self.dim_overlay.fill((20, 20, 20, 200))
+        return self.dim_overlay
+    
+    def draw_ego_network(self, screen_positions, radius, show_labels):
+        """Dim the network and redraw the ego network of the inspected node on top"""
+        import pygame
+        if self.ego_center is None:
+            return
+        depths, edges = self.graph.ego_network(self.ego_center, self.ego_depth)
+        self.screen.blit(self.get_dim_overlay(), (0, 0))
+        
+        # Connections colored and sized by strength
+        finite = np.isfinite(screen_positions).all(axis=1)
+        for a, b, weight in edges:
+            if finite[a] and finite[b]:
+                color = EGO_EDGE_COLORS.get(weight, EGO_EDGE_COLORS[1.0])
+                pygame.draw.line(self.screen, color, screen_positions[a].tolist(),
+                                 screen_positions[b].tolist(), max(1, int(weight)))
+        
+        # Nodes ringed by their distance from the inspected node
+        nodes = self.graph.nodes
+        for i, hops in depths.items():
+            if not finite[i]:
+                continue
+            pos = screen_positions[i].tolist()
+            pygame.draw.circle(self.screen, self.node_color(nodes[i]), pos, radius)
+            ring_color = EGO_RING_COLORS[min(hops, len(EGO_RING_COLORS) - 1)]
+            pygame.draw.circle(self.screen, ring_color, pos, radius + 2, 3 if hops == 0 else 2)
+            if show_labels:
+                text = self.label_font.render(str(nodes[i]['id']), True, (0, 0, 0))
+                self.screen.blit(text, text.get_rect(center=pos))
+    
+    def ego_summary(self):
+        """Return metric lines describing the inspected node's ego network"""
+        if self.ego_center is None:
+            return []
+        depths, _ = self.graph.ego_network(self.ego_center, self.ego_depth)
+        node = self.graph.nodes[self.ego_center]
+        counts = [0] * (self.ego_depth + 1)
+        for hops in depths.values():
+            counts[hops] += 1
+        strengths = {weight: 0 for weight in STRENGTH_WEIGHTS.values()}
+        for weight in self.graph.adjacency[self.ego_center].values():
+            strengths[weight] = strengths.get(weight, 0) + 1
+        lines = [f"Ego: {node.get('name', node['id'])}"]
+        lines += [f"  {hops}-hop: {count}" for hops, count in enumerate(counts) if hops]
+        lines.append("  Strong/med/weak: " + "/".join(
+            str(strengths.get(STRENGTH_WEIGHTS[name], 0)) for name in ('strong', 'medium', 'weak')))
+        return lines
+    
+    def hover_neighbors(self, screen_positions):
+        """Yield (screen position, weight) of each neighbor of the hovered node"""
+        # Only the hovered node's adjacency list is visited
+        for neighbor, weight in self.graph.adjacency[self.hover_node].items():
+            pos = screen_positions[neighbor]
+            if np.isfinite(pos).all():
+                yield pos.tolist(), weight
+    
+    def draw_hover_connections(self, screen_positions):
+        """Highlight the connections of the node under the mouse"""
+        import pygame
+        if self.hover_node is None or not np.isfinite(screen_positions[self.hover_node]).all():
+            return
+        center = screen_positions[self.hover_node].tolist()
+        for pos, weight in self.hover_neighbors(screen_positions):
+            pygame.draw.line(self.screen, (255, 255, 0), center, pos, max(1, int(weight)))
+    
+    def draw_hover(self, screen_positions, radius):
+        """Ring the node under the mouse and its neighbors, and show its name"""
+        import pygame
+        if self.hover_node is None or not np.isfinite(screen_positions[self.hover_node]).all():
+            return
+        center = screen_positions[self.hover_node].tolist()
+        ring = max(radius + 3, 4)
+        for pos, _ in self.hover_neighbors(screen_positions):
+            pygame.draw.circle(self.screen, (255, 255, 0), pos, ring, 2)
+        pygame.draw.circle(self.screen, (255, 255, 255), center, ring + 2, 3)
+        
+        if self.label_font is None:
+            self.label_font = pygame.font.Font(None, 24)
+        node = self.graph.nodes[self.hover_node]
+        text = self.label_font.render(str(node.get('name', node['id'])), True, (255, 255, 0))
+        self.screen.blit(text, (center[0] + ring + 4, center[1] - ring - 12))
+    
+    def draw_ui(self):
+        """Draw user interface elements"""
+        import pygame
+        font_large = pygame.font.Font(None, 36)
+        if not self.control_panel:
+            # One-line key hint of the basic profile
+            info_text = font_large.render("ESC: Quit | R: Reset | Drag nodes to move them", True, (200, 200, 200))
+            self.screen.blit(info_text, (10, 10))
+            self.draw_profiler_overlay()
+            return
+        font_small = pygame.font.Font(None, 24)
+        
+        # Background for UI
+        ui_bg = pygame.Surface((400, 400))
+        ui_bg.set_alpha(200)
+        ui_bg.fill((20, 20, 20))
+        self.screen.blit(ui_bg, (10, 10))
+        
+        # Title
+        title = font_large.render("Social Clustering Simulation", True, (255, 255, 255))
+        self.screen.blit(title, (20, 20))
+        
+        # Controls
+        controls = [
+            "Controls:",
+            "Mouse: Drag nodes",
+            "Wheel / right drag: Zoom / pan",
+            "V: Fit view to network",
+            "E: Ego network (click a node, 1-3: depth)",
+            "R: Reset simulation",
+            "N: Next network",
+            "I: Next initial layout",
+            "P: Pause/Resume",
+            "F: Toggle force display",
+            "C: Toggle spatial cluster colors",
+            "G: Toggle group gravity",
+            "A: Toggle adaptive time step",
+            "S: Toggle edge sampling (dense networks)",
+            "T: Toggle frame profiler",
+            "ESC: Quit"
+        ]
+        
+        for i, control in enumerate(controls):
+            color = (255, 255, 255) if i == 0 else (200, 200, 200)
+            text = font_small.render(control, True, color)
+            self.screen.blit(text, (20, 60 + i * 20))
+        
+        # Network info
+        network_name = NETWORK_NAMES[self.network_types[self.current_network]]
+        network_text = font_small.render(
+            f"Network: {network_name} ({self.initial_layout} start)", True, (255, 255, 0))
+        self.screen.blit(network_text, (20, 380))
+        
+        # Status
+        status = "PAUSED" if self.paused else "RUNNING"
+        if self.group_gravity:
+            status += " (group gravity)"
+        if self.step_control:
+            status += f" (adaptive step {self.time_step * 1000:.0f} ms)"
+        if self.edge_sampling:
+            status += f" (edges {self.edge_sampling.rate:.0%})"
+        if self.physics_thread is not None:
+            status += " (async physics)"
+        if self.ego_mode:
+            status += f" (ego view, depth {self.ego_depth})"
+        status_color = (255, 100, 100) if self.paused else (100, 255, 100)
+        status_text = font_small.render(f"Status: {status}", True, status_color)
+        self.screen.blit(status_text, (20, 400))
+        
+        # Metrics
+        if self.show_metrics:
+            with self.profiler.phase('draw_metrics'):
+                self.draw_metrics()
+        
+        self.draw_profiler_overlay()
+    
+    def draw_profiler_overlay(self):
+        """Draw the frame timing panel (T key), left of the metrics"""
+        import pygame
+        if self.profiler.enabled:
+            if self.profiler_font is None:
+                self.profiler_font = pygame.font.Font(None, 20)
+            self.profiler.draw_overlay(self.screen, (self.width - 210, 20), self.profiler_font)
+    
+    def draw_metrics(self):
+        """Draw network metrics"""
+        import pygame
+        font_small = pygame.font.Font(None, 20)
+        
+        # Calculate metrics
+        total_nodes = len(self.nodes)
+        total_connections = len(self.connections)
+        
+        # Calculate average distance between connected nodes
+        sources, targets, _ = self.graph.edge_arrays()
+        positions = self.display_positions()
+        delta = positions[targets] - positions[sources]
+        avg_distance = float(np.hypot(delta[:, 0], delta[:, 1]).mean()) if len(delta) else 0
+        
+        # Display metrics
+        metrics = [
+            f"Nodes: {total_nodes}",
+            f"Connections: {total_connections}",
+            f"Avg Distance: {avg_distance:.1f}",
+            f"Groups: {len(set(n.get('group', 'A') for n in self.nodes))}"
+        ]
+        if self.show_clusters and self.cluster_result:
+            metrics.append(f"Spatial clusters: {self.cluster_result['num_clusters']}")
+            metrics.append(f"Cluster purity: {self.cluster_result['purity']:.2f}")
+        metrics += self.ego_summary()
+        
+        for i, metric in enumerate(metrics):
+            text = font_small.render(metric, True, (200, 200, 200))
+            self.screen.blit(text, (self.width - 200, 20 + i * 20))
+    
+    def handle_key(self, key):
+        """Handle a key press; returns False if the simulation should quit"""
+        import pygame
+        if key == pygame.K_ESCAPE:
+            return False
+        elif key == pygame.K_r:
+            self.create_network()
+        elif key == pygame.K_n:
+            self.current_network = (self.current_network + 1) % len(self.network_types)
+            self.create_network()
+        elif key == pygame.K_p:
+            self.paused = not self.paused
+        elif key == pygame.K_f:
+            self.show_forces = not self.show_forces
+        elif key == pygame.K_c:
+            self.show_clusters = not self.show_clusters
+        elif key == pygame.K_g:
+            self.group_gravity = 0.0 if self.group_gravity else self.group_gravity_strength
+        elif key == pygame.K_t:
+            self.profiler.toggle()
+        elif key == pygame.K_i:
+            layouts = list(INITIAL_LAYOUTS)
+            self.initial_layout = layouts[(layouts.index(self.initial_layout) + 1) % len(layouts)]
+            self.create_network()
+        elif key == pygame.K_a:
+            self.step_control = None if self.step_control else StepController()
+            self.time_step = self.step_control.dt if self.step_control else 1/60.0
+        elif key == pygame.K_s:
+            self.edge_sampling = None if self.edge_sampling else SampleRateController()
+        elif key == pygame.K_v:
+            self.camera.fit(self.display_positions())
+        elif key == pygame.K_e:
+            self.ego_mode = not self.ego_mode
+            if not self.ego_mode:
+                self.ego_center = None
+        elif key in (pygame.K_1, pygame.K_2, pygame.K_3) and self.ego_mode:
+            self.ego_depth = key - pygame.K_0
+        return True
+    
+    def run(self):
+        """Main simulation loop"""
+        import pygame
+        if self._screen is None:
+            self.open_display()
+        running = True
+        profiler = self.profiler
+        if self.async_physics:
+            self.start_physics_thread()
+        
+        while running:
+            with profiler.phase('events'):
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        running = False
+                    elif event.type == pygame.KEYDOWN:
+                        with self.physics_locked():
+                            running = self.handle_key(event.key) and running
+                    
+                    self.handle_mouse_interaction(event)
+            
+            if self.physics_thread is not None:
+                # The physics thread steps on its own; stop if it failed
+                if self.physics_thread.error is not None:
+                    raise self.physics_thread.error
+            else:
+                # Apply social forces
+                with profiler.phase('apply_social_forces'):
+                    self.apply_social_forces()
+                
+                # Update physics
+                if not self.paused:
+                    with profiler.phase('space_step'):
+                        self.space.step(self.time_step)
+            
+            # Refresh the cluster overlay every few frames
+            self.frame_count += 1
+            if self.show_clusters and (self.cluster_result is None or
+                                       self.frame_count % self.cluster_refresh_interval == 0):
+                with profiler.phase('update_clusters'):
+                    self.update_clusters()
+            
+            # Draw everything
+            self.screen.fill((30, 30, 30))
+            with profiler.phase('draw_network'):
+                self.draw_network()
+            with profiler.phase('draw_ui'):
+                self.draw_ui()
+            
+            with profiler.phase('display_flip'):
+                pygame.display.flip()
+            profiler.end_frame()
+            self.clock.tick(60)
+        
+        profiler.close_trace()
+        self.stop_physics_thread()
+        if self.force_backend is not None:
+            self.force_backend.close()
+        pygame.quit()
+
+def run_cli(simulation_class, description, argv=None):
+    """
+    Command line entry point shared by the launchers.
+
+    Runs the simulation in a window, or headlessly (and possibly profiled)
+    with --headless.
+    """
+    import argparse
+    from headless_profile import add_headless_arguments, run_headless_cli
+    
+    network_types = PROFILES[simulation_class.PROFILE]['network_types']
+    parser = argparse.ArgumentParser(description=description)
+    add_headless_arguments(parser, networks=network_types if len(network_types) > 1 else None)
+    parser.add_argument('--async-physics', action='store_true',
+                        help="step the physics on a background thread, decoupled from drawing")
+    parser.add_argument('--layout-cache', nargs='?', const='', default=None, metavar='DIR',
+                        help="start from cached converged layouts (needs --seed; default directory "
+                             "~/.cache/social_clustering/layouts)")
+    args = parser.parse_args(argv)
+    if args.layout_cache is not None and args.seed is None:
+        parser.error("--layout-cache needs --seed")
+    
+    if args.headless:
+        run_headless_cli(simulation_class, args)
+    else:
+        simulation = simulation_class(seed=args.seed)
+        simulation.async_physics = args.async_physics
+        if args.edge_sampling:
+            simulation.edge_sampling = SampleRateController(target_time=args.edge_sampling / 1000.0)
+        if args.layout_cache is not None:
+            from layout_cache import LayoutCache
+            simulation.layout_cache = LayoutCache(args.layout_cache or None)
+            simulation.create_network()
+        simulation.run()
@@ -74,15 +74,18 @@ def create_social_network():
         'connections': connections
     }
 
-def create_large_network(num_nodes=50, connection_probability=0.3):
+def create_large_network(num_nodes=50, connection_probability=0.3, rng=None):
     """
     Create a larger random social network for more complex simulations.
     
     Args:
         num_nodes: Number of nodes in the network
         connection_probability: Probability of connection between any two nodes
+        rng: Seed, random.Random or NumPy Generator (None uses the global
+            random module)
     """
-    import random
+    from seeding import make_rng
+    rng = make_rng(rng)
     
     nodes = []
     for i in range(1, num_nodes + 1):
@@ -97,20 +100,20 @@ def create_large_network(num_nodes=50, connection_probability=0.3):
     for i in range(1, num_nodes + 1):
         for j in range(i + 1, num_nodes + 1):
             # Higher probability for same group connections
-            node_i = next(n for n in nodes if n['id'] == i)
-            node_j = next(n for n in nodes if n['id'] == j)
+            node_i = nodes[i - 1]
+            node_j = nodes[j - 1]
             
             if node_i['group'] == node_j['group']:
                 # Same group: higher connection probability
-                if random.random() < connection_probability * 2:
+                if rng.random() < connection_probability * 2:
                     connections.append({
                         'from': i,
                         'to': j,
-                        'strength': random.choice(['strong', 'medium'])
+                        'strength': rng.choice(['strong', 'medium'])
                     })
             else:
                 # Different group: lower connection probability
-                if random.random() < connection_probability * 0.3:
+                if rng.random() < connection_probability * 0.3:
                     connections.append({
                         'from': i,
                         'to': j,
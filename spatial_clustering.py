@@ -0,0 +1,146 @@
+"""
+Spatial clustering of a finished layout
+
+Community detection looks at the connection structure. This module looks
+at where the physics actually put the nodes: it runs DBSCAN over the body
+positions to find groups of nodes that sit close together on screen.
+
+Neighbour queries use a uniform grid whose cells are eps wide, so each
+query only has to check the 3x3 block of cells around a node. For layouts
+where nodes keep roughly their collision distance apart this makes the
+whole clustering O(N).
+"""
+
+import colorsys
+import math
+from collections import defaultdict, deque
+
+from community_detection import partition_agreement
+
+NOISE = -1
+
+# Colour used for nodes that do not belong to any cluster
+NOISE_COLOR = (90, 90, 90)
+
+
+def _build_grid(points, cell_size):
+    """Bucket point indices by the grid cell that contains them"""
+    grid = defaultdict(list)
+    for index, (x, y) in enumerate(points):
+        grid[(int(math.floor(x / cell_size)), int(math.floor(y / cell_size)))].append(index)
+    return grid
+
+
+def _region_query(points, grid, index, eps):
+    """Return indices of all points within eps of points[index] (including itself)"""
+    x, y = points[index]
+    cx = int(math.floor(x / eps))
+    cy = int(math.floor(y / eps))
+    eps_squared = eps * eps
+
+    neighbors = []
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            for other in grid.get((cx + dx, cy + dy), ()):
+                ox, oy = points[other]
+                if (ox - x) ** 2 + (oy - y) ** 2 <= eps_squared:
+                    neighbors.append(other)
+    return neighbors
+
+
+def dbscan(points, eps, min_samples=3):
+    """
+    Cluster 2D points with DBSCAN.
+
+    Args:
+        points: Sequence of (x, y) positions
+        eps: Neighbourhood radius
+        min_samples: Neighbours (including the point itself) needed for a
+            point to be a core point
+
+    Returns:
+        List with a cluster index per point, or NOISE (-1) for outliers
+    """
+    points = [(float(x), float(y)) for x, y in points]
+    grid = _build_grid(points, eps)
+    labels = [None] * len(points)
+    cluster = 0
+
+    for index in range(len(points)):
+        if labels[index] is not None:
+            continue
+
+        neighbors = _region_query(points, grid, index, eps)
+        if len(neighbors) < min_samples:
+            labels[index] = NOISE
+            continue
+
+        # Grow a new cluster outwards from this core point
+        labels[index] = cluster
+        queue = deque(neighbors)
+        while queue:
+            other = queue.popleft()
+            if labels[other] == NOISE:
+                labels[other] = cluster  # Border point
+            if labels[other] is not None:
+                continue
+            labels[other] = cluster
+            other_neighbors = _region_query(points, grid, other, eps)
+            if len(other_neighbors) >= min_samples:
+                queue.extend(other_neighbors)
+        cluster += 1
+
+    return labels
+
+
+def cluster_layout(positions, nodes, eps=None, node_radius=18, min_samples=3):
+    """
+    Run DBSCAN over a layout and compare the clusters with node groups.
+
+    Args:
+        positions: Mapping of node ID to (x, y) position
+        nodes: Node dictionaries (used for the 'group' field)
+        eps: Neighbourhood radius; defaults to four node radii, slightly
+            more than the rest distance of connected nodes
+        node_radius: Radius of a drawn node
+        min_samples: DBSCAN core point threshold
+
+    Returns:
+        Dictionary with:
+            'clusters': {node_id: cluster index or -1 for noise}
+            'num_clusters': number of clusters found
+            'noise': number of nodes not in any cluster
+            'purity': share of clustered nodes whose cluster's majority
+                group matches their own
+    """
+    if eps is None:
+        eps = 4 * node_radius
+
+    node_ids = [node['id'] for node in nodes if node['id'] in positions]
+    groups = {node['id']: node.get('group') for node in nodes}
+    labels = dbscan([positions[node_id] for node_id in node_ids], eps, min_samples)
+
+    clustered = [(label, groups[node_id]) for node_id, label in zip(node_ids, labels) if label != NOISE]
+    if clustered:
+        cluster_labels, cluster_groups = zip(*clustered)
+        purity = partition_agreement(list(cluster_labels), list(cluster_groups))['purity']
+    else:
+        purity = 0.0
+
+    return {
+        'clusters': dict(zip(node_ids, labels)),
+        'num_clusters': len(set(labels) - {NOISE}),
+        'noise': labels.count(NOISE),
+        'purity': purity,
+    }
+
+
+def cluster_colors(num_clusters):
+    """Return num_clusters visually distinct RGB colours"""
+    colors = []
+    for i in range(num_clusters):
+        # Golden ratio hue steps keep neighbouring cluster IDs apart
+        hue = (i * 0.618033988749895) % 1.0
+        r, g, b = colorsys.hsv_to_rgb(hue, 0.65, 0.95)
+        colors.append((int(r * 255), int(g * 255), int(b * 255)))
+    return colors
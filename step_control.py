@@ -0,0 +1,148 @@
+"""
+Adaptive time step and cooling schedule for the force simulation
+
+With a fixed step of 1/60 s the layout either oscillates or creeps towards
+equilibrium, depending on how the forces and damping are tuned. A
+StepController replaces those hand-tuned settings:
+
+- Adaptive step (after Hu, "Efficient and high quality force-directed
+  graph drawing"): the energy of the layout is the sum of the squared node
+  forces. While it keeps falling the step grows; as soon as it rises (the
+  layout overshoots and oscillates) the step shrinks.
+- Cooling schedule (simulated annealing): an optional temperature caps
+  how far any node may move in one step, and it drops by a constant
+  factor every step, so the layout is guaranteed to come to rest.
+
+A simulation uses a controller when its step_control attribute is set:
+
+    simulation.step_control = StepController(temperature=60, cooling=0.99)
+
+apply_social_forces then sets the body velocities itself and stores the
+step to use in simulation.time_step.
+"""
+
+import numpy as np
+
+
+class StepController:
+    """
+    Adaptive time step with an optional cooling schedule.
+
+    Args:
+        dt: Initial step in seconds
+        min_dt, max_dt: Limits of the adaptive step
+        shrink: Factor applied to the step when the energy rises (its
+            inverse is applied when the energy keeps falling)
+        patience: Number of consecutive energy decreases before the step
+            grows
+        temperature: Initial cap on the distance a node moves in one step
+            (pixels), or None for no cap
+        cooling: Factor applied to the temperature after every step
+        min_temperature: Lower limit of the temperature
+    """
+
+    def __init__(self, dt=1/60.0, min_dt=1/240.0, max_dt=1/15.0, shrink=0.9, patience=5,
+                 temperature=None, cooling=0.99, min_temperature=0.0):
+        if not 0 < shrink < 1:
+            raise ValueError("shrink must be between 0 and 1")
+        if not 0 < cooling <= 1:
+            raise ValueError("cooling must be in (0, 1]")
+        self.initial_dt = dt
+        self.min_dt = min_dt
+        self.max_dt = max_dt
+        self.shrink = shrink
+        self.patience = patience
+        self.initial_temperature = temperature
+        self.cooling = cooling
+        self.min_temperature = min_temperature
+        self.reset()
+
+    def reset(self):
+        """Start a new layout: initial step and temperature, no energy history"""
+        self.dt = self.initial_dt
+        self.temperature = self.initial_temperature
+        self.energy = None
+        self.progress = 0
+        self.steps = 0
+
+    def settings(self):
+        """Return the constructor arguments of this controller as a dictionary"""
+        return {
+            'dt': self.initial_dt, 'min_dt': self.min_dt, 'max_dt': self.max_dt,
+            'shrink': self.shrink, 'patience': self.patience,
+            'temperature': self.initial_temperature, 'cooling': self.cooling,
+            'min_temperature': self.min_temperature,
+        }
+
+    def update(self, forces):
+        """
+        Adapt the step to the forces of the current layout.
+
+        Args:
+            forces: (N, 2) array of node forces
+
+        Returns:
+            Step to use for this physics step
+        """
+        energy = float(np.einsum('ij,ij->', forces, forces))
+        if self.energy is not None:
+            if energy < self.energy:
+                self.progress += 1
+                if self.progress >= self.patience:
+                    self.progress = 0
+                    self.dt = min(self.dt / self.shrink, self.max_dt)
+            else:
+                self.progress = 0
+                self.dt = max(self.dt * self.shrink, self.min_dt)
+        self.energy = energy
+        return self.dt
+
+    def limit(self, velocities, dt):
+        """
+        Cap the velocities so no node moves further than the temperature,
+        then cool down.
+
+        Args:
+            velocities: (N, 2) array of velocities for the coming step
+            dt: Step the velocities will be integrated over
+
+        Returns:
+            The capped velocities (the array is modified in place)
+        """
+        self.steps += 1
+        if self.temperature is None:
+            return velocities
+        speed = np.hypot(velocities[:, 0], velocities[:, 1])
+        limit = self.temperature / dt
+        fast = speed > limit
+        velocities[fast] *= (limit / speed[fast])[:, None]
+        self.temperature = max(self.temperature * self.cooling, self.min_temperature)
+        return velocities
+
+
+def apply_controlled_forces(bodies, forces, damping, controller):
+    """
+    Integrate forces into body velocities under a StepController.
+
+    The velocity of the coming step is damping * v + F / m * dt, capped by
+    the controller's temperature. Velocities are set directly instead of
+    applying the forces to the bodies, so the cap covers the whole move.
+
+    Args:
+        bodies: pymunk bodies in the order of forces
+        forces: (N, 2) array of forces
+        damping: Velocity factor applied once per step
+        controller: StepController
+
+    Returns:
+        Step (seconds) the physics space should be advanced by
+    """
+    dt = controller.update(forces)
+    n = len(bodies)
+    velocities = np.fromiter((c for body in bodies for c in body.velocity), dtype=float, count=2 * n).reshape(n, 2)
+    masses = np.fromiter((body.mass for body in bodies), dtype=float, count=n)
+    velocities = velocities * damping + forces * (dt / masses)[:, None]
+    controller.limit(velocities, dt)
+    for body, velocity in zip(bodies, velocities.tolist()):
+        body.velocity = velocity
+    return dt
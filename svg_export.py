@@ -0,0 +1,243 @@
+"""
+Static vector export (SVG, optionally PDF) of a network layout
+
+Writes node positions, connections and labels as an SVG document. The
+file is streamed element by element, so memory use does not grow with the
+number of connections, and connections may come from any iterable.
+
+Connections are styled by strength like
+EnhancedSocialClusteringSimulation.draw_network, and nodes are filled with
+their group color. For very large graphs, two options keep the output
+small:
+- max_edges drops the weakest connections once the limit is reached
+- bundle_cell_size merges all connections between the same pair of
+  layout cells into one line whose width grows with the number of
+  connections it represents
+
+Example:
+    python svg_export.py --network large --steps 600 layout.svg
+"""
+
+import heapq
+import math
+import random
+from xml.sax.saxutils import escape
+
+# Connection styles by strength: (stroke color, stroke width)
+EDGE_STYLES = {
+    'strong': ((150, 150, 150), 3),
+    'medium': ((120, 120, 120), 2),
+    'weak': ((80, 80, 80), 1),
+}
+
+DEFAULT_NODE_COLOR = (200, 200, 200)
+BACKGROUND_COLOR = (30, 30, 30)
+
+# Lower rank is dropped first when max_edges is exceeded
+_STRENGTH_RANK = {'weak': 0, 'medium': 1, 'strong': 2}
+
+
+def _rgb(color):
+    return f"rgb({color[0]},{color[1]},{color[2]})"
+
+
+def _layout_bounds(positions, margin):
+    xs = [x for x, _ in positions.values()]
+    ys = [y for _, y in positions.values()]
+    if not xs:
+        return 0, 0, 2 * margin, 2 * margin
+    return (min(xs) - margin, min(ys) - margin,
+            max(xs) - min(xs) + 2 * margin, max(ys) - min(ys) + 2 * margin)
+
+
+def _strength(connection):
+    strength = connection.get('strength')
+    return strength if strength in EDGE_STYLES else 'weak'
+
+
+def _select_edges(connections, max_edges, seed=0):
+    """
+    Keep at most max_edges connections, preferring stronger ones.
+
+    A single pass over the connections (which may be a generator) keeps a
+    heap of the max_edges best candidates. Within the strength tier that
+    crosses the limit, connections are kept uniformly at random. Memory is
+    bounded by max_edges.
+    """
+    rng = random.Random(seed)
+    heap = []
+    for order, connection in enumerate(connections):
+        entry = (_STRENGTH_RANK[_strength(connection)], rng.random(), order, connection)
+        if len(heap) < max_edges:
+            heapq.heappush(heap, entry)
+        elif heap and entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+    # Restore the input order so the output is stable
+    for entry in sorted(heap, key=lambda entry: entry[2]):
+        yield entry[3]
+
+
+def _write_bundled_edges(out, connections, positions, cell_size):
+    """Merge connections between the same pair of cells into weighted lines"""
+    bundles = {}
+    for connection in connections:
+        start = positions.get(connection['from'])
+        end = positions.get(connection['to'])
+        if start is None or end is None:
+            continue
+        a = (math.floor(start[0] / cell_size), math.floor(start[1] / cell_size))
+        b = (math.floor(end[0] / cell_size), math.floor(end[1] / cell_size))
+        if b < a:
+            a, b = b, a
+            start, end = end, start
+        bundle = bundles.get((a, b))
+        if bundle is None:
+            bundles[(a, b)] = [start[0], start[1], end[0], end[1], 1]
+        else:
+            bundle[0] += start[0]
+            bundle[1] += start[1]
+            bundle[2] += end[0]
+            bundle[3] += end[1]
+            bundle[4] += 1
+
+    out.write('<g stroke="rgb(120,120,120)" stroke-linecap="round" stroke-opacity="0.7">\n')
+    for x1, y1, x2, y2, count in bundles.values():
+        width = 1 + math.log2(count)
+        out.write(f'<line x1="{x1 / count:.1f}" y1="{y1 / count:.1f}" '
+                  f'x2="{x2 / count:.1f}" y2="{y2 / count:.1f}" stroke-width="{width:.2f}"/>\n')
+    out.write('</g>\n')
+    return len(bundles)
+
+
+def write_svg(out, nodes, connections, positions, group_colors=None, node_radius=18,
+              labels=True, max_edges=None, bundle_cell_size=None, margin=None):
+    """
+    Stream a network layout as SVG to a text file object.
+
+    Args:
+        out: Writable text file object
+        nodes: Node dictionaries (for 'id', 'group' and labels)
+        connections: Iterable of connection dictionaries
+        positions: Mapping of node ID to (x, y)
+        group_colors: Mapping of group name to RGB color
+        node_radius: Radius of the node circles
+        labels: Draw the node ID inside each node
+        max_edges: Drop the weakest connections beyond this many
+        bundle_cell_size: If set, bundle connections between layout cells
+            of this size instead of drawing them one by one
+        margin: Space around the layout (defaults to two node radii)
+
+    Returns:
+        Number of connection (or bundle) lines written
+    """
+    group_colors = group_colors or {}
+    margin = 2 * node_radius if margin is None else margin
+    x, y, width, height = _layout_bounds(positions, margin)
+
+    out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    out.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+              f'viewBox="{x:.1f} {y:.1f} {width:.1f} {height:.1f}">\n')
+    out.write('<style>\n')
+    for strength, (color, stroke_width) in EDGE_STYLES.items():
+        out.write(f'.{strength}{{stroke:{_rgb(color)};stroke-width:{stroke_width}}}\n')
+    out.write(f'circle{{stroke:white;stroke-width:2}}\n'
+              f'text{{font-family:sans-serif;font-size:{node_radius * 0.9:.0f}px;'
+              f'text-anchor:middle;dominant-baseline:central}}\n')
+    out.write('</style>\n')
+    out.write(f'<rect x="{x:.1f}" y="{y:.1f}" width="{width:.1f}" height="{height:.1f}" '
+              f'fill="{_rgb(BACKGROUND_COLOR)}"/>\n')
+
+    # Connections first so nodes are drawn on top
+    if max_edges is not None:
+        connections = _select_edges(connections, max_edges)
+    edge_count = 0
+    if bundle_cell_size:
+        edge_count = _write_bundled_edges(out, connections, positions, bundle_cell_size)
+    else:
+        out.write('<g>\n')
+        for connection in connections:
+            start = positions.get(connection['from'])
+            end = positions.get(connection['to'])
+            if start is None or end is None:
+                continue
+            out.write(f'<line class="{_strength(connection)}" x1="{start[0]:.1f}" y1="{start[1]:.1f}" '
+                      f'x2="{end[0]:.1f}" y2="{end[1]:.1f}"/>\n')
+            edge_count += 1
+        out.write('</g>\n')
+
+    out.write('<g>\n')
+    for node in nodes:
+        position = positions.get(node['id'])
+        if position is None:
+            continue
+        color = group_colors.get(node.get('group'), DEFAULT_NODE_COLOR)
+        out.write(f'<circle cx="{position[0]:.1f}" cy="{position[1]:.1f}" r="{node_radius}" '
+                  f'fill="{_rgb(color)}"/>\n')
+        if labels:
+            out.write(f'<text x="{position[0]:.1f}" y="{position[1]:.1f}">{escape(str(node["id"]))}</text>\n')
+    out.write('</g>\n')
+    out.write('</svg>\n')
+    return edge_count
+
+
+def export_svg(path, nodes, connections, positions, **options):
+    """
+    Write a layout to an .svg file, or to .pdf if cairosvg is installed.
+
+    Takes the same options as write_svg.
+    """
+    if path.lower().endswith('.pdf'):
+        try:
+            import cairosvg
+        except ImportError:
+            raise RuntimeError("PDF export requires cairosvg (pip install cairosvg)")
+        import io
+        buffer = io.StringIO()
+        write_svg(buffer, nodes, connections, positions, **options)
+        cairosvg.svg2pdf(bytestring=buffer.getvalue().encode('utf-8'), write_to=path)
+        return
+
+    with open(path, 'w', encoding='utf-8', buffering=1 << 20) as out:
+        write_svg(out, nodes, connections, positions, **options)
+
+
+def export_simulation_svg(simulation, path, **options):
+    """Export the current layout of a running simulation"""
+    positions = {node_id: (body.position.x, body.position.y)
+                 for node_id, body in simulation.node_bodies.items()}
+    options.setdefault('group_colors', getattr(simulation, 'group_colors', None))
+    options.setdefault('node_radius', getattr(simulation, 'node_radius', 15))
+    export_svg(path, simulation.nodes, simulation.connections, positions, **options)
+
+
+def main():
+    """Command line entry point for SVG export"""
+    import argparse
+    from video_export import create_headless_simulation
+
+    parser = argparse.ArgumentParser(description="Lay out a network headlessly and export it as SVG/PDF")
+    parser.add_argument('output', help="output .svg (or .pdf with cairosvg installed)")
+    parser.add_argument('--network', choices=['basic', 'clique', 'large'], default='basic')
+    parser.add_argument('--steps', type=int, default=600, help="physics steps before exporting")
+    parser.add_argument('--max-edges', type=int, default=None)
+    parser.add_argument('--bundle', type=float, default=None, metavar='CELL_SIZE',
+                        help="bundle connections between layout cells of this size")
+    parser.add_argument('--no-labels', action='store_true')
+    parser.add_argument('--seed', type=int, default=None, help="seed for a reproducible layout")
+    args = parser.parse_args()
+    if args.max_edges is not None and args.max_edges < 0:
+        parser.error("--max-edges must not be negative")
+
+    simulation = create_headless_simulation(seed=args.seed)
+    simulation.current_network = simulation.network_types.index(args.network)
+    simulation.create_network()
+    for _ in range(args.steps):
+        simulation.step_physics()
+
+    export_simulation_svg(simulation, args.output, labels=not args.no_labels,
+                          max_edges=args.max_edges, bundle_cell_size=args.bundle)
+    print(f"Exported layout to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""
+Scaling stress tests for the Social Clustering Simulation
+
+test_simulation.py checks behaviour on small networks. This script checks
+how the cost grows with the network size, so an accidental return to
+O(N^2) work (a pairwise loop, a dense matrix) fails a test instead of
+quietly slowing down large layouts.
+
+Every operation is run headlessly on networks of increasing size (about 6
+connections per node, spread at a constant density), then:
+1. the time (or peak traced memory) at each size is checked against the
+   budgets stored in scaling_budgets.json
+2. the scaling exponent k of cost ~ N^k is fitted on a log-log scale and
+   checked against the operation's maximum exponent
+
+Linear operations may reach N^1.6: in CPython, building large
+dictionary-based structures grows faster than linear (allocator and cache
+effects; NetworkGraph construction measures about N^1.45), while
+quadratic work fits at N^2 or above.
+
+This script tests:
+1. Network builders (create_large_network is quadratic by design, the
+   streaming generator is linear)
+2. NetworkGraph construction and its arrays
+3. Physics step (forces and pymunk)
+4. Frame time (physics step and drawing)
+5. Peak memory of building and stepping a network
+
+The budgets are about three times the times measured on a reference
+machine. After a deliberate performance change, measure again and
+rewrite them with:
+
+    python test_scaling.py --update-budgets
+"""
+
+import json
+import os
+import sys
+import time
+import traceback
+import tracemalloc
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np
+
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scaling_budgets.json')
+
+# Average connections per node and square pixels per node of the test networks
+DEGREE = 6.0
+AREA_PER_NODE = 20000.0
+
+# Measured values of this run, by operation and size (for --update-budgets)
+RESULTS = {}
+
+
+def fit_exponent(sizes, values):
+    """Slope of log(values) over log(sizes): k in values ~ sizes^k"""
+    return float(np.polyfit(np.log(sizes), np.log(values), 1)[0])
+
+
+def best_time(function, repeats=3):
+    """Fastest of several runs of function, in milliseconds"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def median_time(function, repeats):
+    """Median of several runs of function, in milliseconds"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1000
+
+
+def scaling_network(num_nodes):
+    """Group model network with DEGREE connections per node on average"""
+    from network_streams import GroupModelStream
+    return GroupModelStream(num_nodes, DEGREE / num_nodes, rng=1).to_network()
+
+
+def spread_simulation(num_nodes):
+    """
+    Headless enhanced simulation of a test network at constant density.
+
+    The window keeps its normal size; the nodes are spread over a square
+    that grows with the network and the camera is fitted to it.
+    """
+    from main_enhanced import EnhancedSocialClusteringSimulation
+    from video_export import create_headless_simulation
+
+    simulation = create_headless_simulation(EnhancedSocialClusteringSimulation, seed=1, walls=False)
+    simulation.create_network(scaling_network(num_nodes))
+    side = (num_nodes * AREA_PER_NODE) ** 0.5
+    positions = np.random.default_rng(1).uniform(0, side, (num_nodes, 2))
+    for body, position in zip(simulation.bodies, positions.tolist()):
+        body.position = position
+    simulation.camera.fit(positions)
+    return simulation
+
+
+def measure_create_large_network(num_nodes):
+    from social_network_data import create_large_network
+    return best_time(lambda: create_large_network(num_nodes, DEGREE / num_nodes, rng=1))
+
+
+def measure_group_stream(num_nodes):
+    return best_time(lambda: scaling_network(num_nodes))
+
+
+def measure_network_graph(num_nodes):
+    from network_graph import NetworkGraph
+    network = scaling_network(num_nodes)
+
+    def build():
+        graph = NetworkGraph(network)
+        graph.edge_arrays()
+        graph.adjacency_arrays()
+    return best_time(build)
+
+
+def measure_physics_step(num_nodes):
+    simulation = spread_simulation(num_nodes)
+    for _ in range(3):
+        simulation.step_physics()
+    return median_time(simulation.step_physics, 10)
+
+
+def measure_frame(num_nodes):
+    from video_export import render_frame
+    simulation = spread_simulation(num_nodes)
+
+    def frame():
+        simulation.step_physics()
+        render_frame(simulation)
+    frame()
+    return median_time(frame, 8)
+
+
+def measure_peak_memory(num_nodes):
+    """Peak traced megabytes of building, laying out and stepping a network"""
+    tracemalloc.start()
+    try:
+        simulation = spread_simulation(num_nodes)
+        for _ in range(3):
+            simulation.step_physics()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+# Operation name -> (measure function, sizes, unit)
+OPERATIONS = {
+    'create_large_network': (measure_create_large_network, [250, 500, 1000, 2000], 'ms'),
+    'group_stream': (measure_group_stream, [4000, 8000, 16000, 32000], 'ms'),
+    'network_graph': (measure_network_graph, [4000, 8000, 16000, 32000], 'ms'),
+    'physics_step': (measure_physics_step, [1000, 2000, 4000, 8000, 16000], 'ms'),
+    'frame': (measure_frame, [1000, 2000, 4000, 8000, 16000], 'ms'),
+    'peak_memory': (measure_peak_memory, [2000, 4000, 8000, 16000], 'MB'),
+}
+
+
+def load_budgets(path=BUDGET_FILE):
+    with open(path) as f:
+        return json.load(f)
+
+
+def check_operation(name, budgets):
+    """
+    Measure one operation at all its sizes and check it against its budgets.
+
+    Returns:
+        True if every size is within budget and the fitted exponent is at
+        most the operation's max_exponent
+    """
+    measure, sizes, unit = OPERATIONS[name]
+    budget = budgets['operations'][name]
+    values = []
+    ok = True
+    for size in sizes:
+        value = measure(size)
+        values.append(value)
+        limit = budget['limits'].get(str(size))
+        within = limit is None or value <= limit
+        ok &= within
+        mark = "✓" if within else "✗"
+        limit_text = f"{limit:.1f} {unit}" if limit is not None else "none"
+        print(f"{mark} {name} N={size}: {value:.1f} {unit} (budget {limit_text})")
+    exponent = fit_exponent(sizes, values)
+    RESULTS[name] = {'values': dict(zip(map(str, sizes), values)), 'exponent': exponent}
+    within = exponent <= budget['max_exponent']
+    ok &= within
+    mark = "✓" if within else "✗"
+    print(f"{mark} {name} scales as N^{exponent:.2f} (max N^{budget['max_exponent']:.2f})")
+    return ok
+
+
+def assert_within_budgets(*names):
+    """Check every named operation, then fail with the ones over budget"""
+    budgets = load_budgets()
+    failed = [name for name in names if not check_operation(name, budgets)]
+    assert not failed, f"over budget: {', '.join(failed)}"
+
+
+def test_builder_scaling():
+    """Test the network builders: the quadratic dictionary builder and the linear stream"""
+    print("Testing network builder scaling...")
+    assert_within_budgets('create_large_network', 'group_stream')
+
+
+def test_graph_scaling():
+    """Test NetworkGraph construction scaling"""
+    print("\nTesting graph construction scaling...")
+    assert_within_budgets('network_graph')
+
+
+def test_step_scaling():
+    """Test the per-step physics time"""
+    print("\nTesting physics step scaling...")
+    assert_within_budgets('physics_step')
+
+
+def test_frame_scaling():
+    """Test the frame time (physics step and drawing)"""
+    print("\nTesting frame time scaling...")
+    assert_within_budgets('frame')
+
+
+def test_memory_scaling():
+    """Test the peak memory of building and stepping networks"""
+    print("\nTesting peak memory scaling...")
+    assert_within_budgets('peak_memory')
+
+
+def update_budgets(margin=3.0, path=BUDGET_FILE):
+    """Measure every operation and store margin times the results as the new budgets"""
+    budgets = load_budgets(path)
+    for name in OPERATIONS:
+        check_operation(name, budgets)
+        limits = {size: float(f"{value * margin:.3g}") for size, value in RESULTS[name]['values'].items()}
+        budgets['operations'][name]['limits'] = limits
+    with open(path, 'w') as out:
+        json.dump(budgets, out, indent=2)
+        out.write('\n')
+    print(f"Wrote {path}")
+
+
+def run_all_tests():
+    """Run all scaling tests and report results"""
+    print("Social Clustering Simulation - Scaling Tests")
+    print("=" * 50)
+
+    tests = [
+        ("Builder Scaling Test", test_builder_scaling),
+        ("Graph Scaling Test", test_graph_scaling),
+        ("Step Scaling Test", test_step_scaling),
+        ("Frame Scaling Test", test_frame_scaling),
+        ("Memory Scaling Test", test_memory_scaling),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        try:
+            test_func()
+        except AssertionError as e:
+            print(f"✗ {test_name} FAILED: {e}")
+        except Exception as e:
+            print(f"✗ {test_name} FAILED: {e}")
+            traceback.print_exc()
+        else:
+            passed += 1
+            print(f"✓ {test_name} PASSED")
+
+    print(f"\n{'='*50}")
+    print("Scaling exponents:")
+    for name, result in RESULTS.items():
+        print(f"  {name:<22} N^{result['exponent']:.2f}")
+    print(f"Test Results: {passed}/{total} tests passed")
+    return passed == total
+
+
+if __name__ == "__main__":
+    if '--update-budgets' in sys.argv[1:]:
+        update_budgets()
+        sys.exit(0)
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -6,11 +6,39 @@ This script tests:
 2. Network data creation
 3. Basic simulation initialization
 4. Parameter validation
+5. Community detection
+6. Spatial clustering
+7. Network analytics
+8. Force models
+9. Group gravity
+10. Headless animation export
+11. SVG export
+12. Frame profiler
+13. Headless profiling
+14. Batch layouts
+15. Camera and viewport culling
+16. Spatial picking and hover highlight
+17. Ego-network view
+18. Deterministic seeding
+19. Initial layouts
+20. Adaptive time step and cooling
+21. Shared simulation core and profiles
+22. Shared-memory parallel forces
+23. Thread-pool parallel forces
+24. Asynchronous physics thread
+25. Layout cache
+26. Streaming network generators
+27. Lazy imports and import-time budget
+28. Edge-sampled attraction
 """
 
 import sys
 import traceback
 
+# Seconds a fresh interpreter may take to import the launchers and the
+# analysis modules (numpy included, pygame and pymunk excluded)
+IMPORT_TIME_BUDGET = 1.0
+
 def test_imports():
     """Test that all required modules can be imported"""
     print("Testing imports...")
@@ -160,6 +188,1289 @@ def test_parameter_validation():
         traceback.print_exc()
         return False
 
+def test_community_detection():
+    """Test community detection on the built-in networks"""
+    print("\nTesting community detection...")
+    
+    try:
+        import random
+        from social_network_data import create_social_network, create_clique_network
+        from community_detection import detect_communities, louvain, partition_agreement
+        from network_graph import NetworkGraph
+        
+        # The basic network has three well separated groups
+        result = detect_communities(create_social_network(), rng=random.Random(1))
+        assert result['num_communities'] == 3
+        assert result['modularity'] > 0.5
+        assert result['group_agreement']['nmi'] > 0.99
+        print(f"✓ Louvain found {result['num_communities']} communities (modularity {result['modularity']:.3f})")
+        
+        # Label propagation seeded from the groups keeps the cliques apart
+        result = detect_communities(create_clique_network(), method='label_propagation',
+                                    initial_labels='group', rng=random.Random(1))
+        assert result['num_communities'] >= 3
+        assert len(result['communities']) == 14
+        print(f"✓ Label propagation found {result['num_communities']} communities")
+
+        # Two separate cliques and an isolated node, even with a single pass per level
+        nodes = [{'id': i} for i in range(9)]
+        connections = [{'from': a, 'to': b} for clique in (range(4), range(4, 8))
+                       for a in clique for b in clique if a < b]
+        membership = louvain(NetworkGraph({'nodes': nodes, 'connections': connections}),
+                             rng=1, max_passes=1)
+        assert membership == [0, 0, 0, 0, 1, 1, 1, 1, 2]
+        print("✓ Louvain separates disconnected cliques")
+
+        # Agreement metrics ignore label names
+        agreement = partition_agreement([0, 0, 1, 1], ['x', 'x', 'y', 'y'])
+        assert abs(agreement['nmi'] - 1.0) < 1e-9
+        assert abs(agreement['ari'] - 1.0) < 1e-9
+        print("✓ Partition agreement metrics work correctly")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Community detection test failed: {e}")
+        traceback.print_exc()
+        return False
+
+def test_spatial_clustering():
+    """Test DBSCAN clustering of a layout"""
+    print("\nTesting spatial clustering...")
+    
+    try:
+        from spatial_clustering import dbscan, cluster_layout, NOISE
+        
+        # Two tight blobs and one isolated point
+        points = [(0, 0), (10, 0), (0, 10), (500, 500), (510, 500), (500, 510), (1000, 0)]
+        labels = dbscan(points, eps=20, min_samples=3)
+        assert labels[0] == labels[1] == labels[2]
+        assert labels[3] == labels[4] == labels[5]
+        assert labels[0] != labels[3]
+        assert labels[6] == NOISE
+        print("✓ DBSCAN separates clusters and noise")
+        
+        nodes = [{'id': i + 1, 'group': 'A' if i < 3 else 'B'} for i in range(7)]
+        positions = {node['id']: points[i] for i, node in enumerate(nodes)}
+        result = cluster_layout(positions, nodes, eps=20)
+        assert result['num_clusters'] == 2
+        assert result['noise'] == 1
+        assert result['purity'] == 1.0
+        print(f"✓ Layout clustering found {result['num_clusters']} clusters (purity {result['purity']:.2f})")
+        
+        # Cluster overlay colors in the enhanced simulation
+        from main_enhanced import EnhancedSocialClusteringSimulation
+        simulation = EnhancedSocialClusteringSimulation(width=1000, height=700)
+        simulation.show_clusters = True
+        simulation.update_clusters()
+        colors = [simulation.node_color(node) for node in simulation.nodes]
+        assert all(len(color) == 3 for color in colors)
+        print("✓ Cluster overlay colors available in enhanced simulation")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Spatial clustering test failed: {e}")
+        traceback.print_exc()
+        return False
+
+def test_network_analytics():
+    """Test graph analytics and cache invalidation"""
+    print("\nTesting network analytics...")
+    
+    try:
+        from social_network_data import create_clique_network
+        from network_analytics import NetworkAnalytics
+        
+        analytics = NetworkAnalytics(create_clique_network())
+        
+        # Clique members without bridges have clustering 1; bridge node 13
+        # has one connected pair (5-14) among its three neighbours
+        clustering = analytics.local_clustering()
+        assert clustering[2] == 1.0
+        assert abs(clustering[13] - 1 / 3) < 1e-9
+        print(f"✓ Clustering coefficients computed (average {analytics.average_clustering():.3f})")
+        
+        # Bridge nodes carry the shortest paths between cliques
+        betweenness = analytics.betweenness()
+        assert max(betweenness, key=betweenness.get) in (5, 13, 14)
+        pagerank = analytics.pagerank()
+        assert abs(sum(pagerank.values()) - 1.0) < 1e-6
+        sampled = NetworkAnalytics(create_clique_network()).betweenness(samples=5, rng=3)
+        assert analytics.betweenness(samples=5, rng=3) == sampled
+        print("✓ Betweenness and PageRank computed")
+        
+        # Changing the graph invalidates cached results
+        connections = analytics.summary()['connections']
+        analytics.graph.add_connection({'from': 4, 'to': 12, 'strength': 'weak'})
+        assert analytics.summary()['connections'] == connections + 1
+        assert analytics.local_clustering()[4] < 1.0
+        print("✓ Cached results invalidated after graph change")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Network analytics test failed: {e}")
+        traceback.print_exc()
+        return False
+
+def test_force_models():
+    """Test the registered force models"""
+    print("\nTesting force models...")
+    
+    try:
+        import numpy as np
+        from network_graph import NetworkGraph
+        from force_models import FORCE_MODELS, create_force_model
+        
+        network = {
+            'nodes': [{'id': 1, 'group': 'A'}, {'id': 2, 'group': 'A'}, {'id': 3, 'group': 'B'}],
+            'connections': [{'from': 1, 'to': 2, 'strength': 'strong'}],
+        }
+        graph = NetworkGraph(network)
+        positions = np.array([[0.0, 0.0], [200.0, 0.0], [0.0, 50.0]])
+        
+        # Linear spring: 1-2 attract, 1-3 repel, 2-3 are out of range
+        model = create_force_model('linear_spring', attraction_force=100, repulsion_force=100,
+                                   repulsion_distance=100, rest_length=50)
+        forces = model.compute(positions, graph)
+        assert np.allclose(forces[1], [-150.0, 0.0])
+        assert np.allclose(forces[2], [0.0, 50.0])
+        assert np.allclose(forces.sum(axis=0), 0.0)
+        print("✓ Linear spring forces match the original formulas")
+        
+        # Every registered model produces finite forces
+        for name in FORCE_MODELS:
+            forces = create_force_model(name).compute(positions, graph)
+            assert forces.shape == (3, 2)
+            assert np.isfinite(forces).all()
+        combined = create_force_model('linear_spring+group_gravity')
+        assert combined.compute(positions, graph).shape == (3, 2)
+        print(f"✓ {len(FORCE_MODELS)} registered force models work")
+        
+        try:
+            create_force_model('no_such_model')
+            assert False, "Unknown model name should raise ValueError"
+        except ValueError:
+            print("✓ Unknown model names are rejected")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Force model test failed: {e}")
+        traceback.print_exc()
+        return False
+
+def test_group_gravity():
+    """Test the group-centroid gravity force"""
+    print("\nTesting group gravity...")
+    
+    try:
+        import numpy as np
+        from network_graph import NetworkGraph
+        from force_models import create_force_model
+        
+        network = {
+            'nodes': [{'id': 1, 'group': 'A'}, {'id': 2, 'group': 'A'},
+                      {'id': 3, 'group': 'B'}, {'id': 4}],
+            'connections': [],
+        }
+        graph = NetworkGraph(network)
+        positions = np.array([[0.0, 0.0], [100.0, 0.0], [500.0, 500.0], [50.0, 50.0]])
+        
+        forces = create_force_model('group_gravity', group_gravity=2.0).compute(positions, graph)
+        assert np.allclose(forces[0], [100.0, 0.0])   # Towards centroid (50, 0)
+        assert np.allclose(forces[1], [-100.0, 0.0])
+        assert np.allclose(forces[2], [0.0, 0.0])     # Alone in its group
+        assert np.allclose(forces[3], [0.0, 0.0])     # No group
+        print("✓ Nodes are pulled towards their group centroid")
+        
+        forces = create_force_model('group_gravity', group_gravity=0.0).compute(positions, graph)
+        assert not forces.any()
+        print("✓ Zero strength disables the force")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Group gravity test failed: {e}")
+        traceback.print_exc()
+        return False
+
+def test_video_export():
+    """Test headless frame export"""
+    print("\nTesting headless animation export...")
+    
+    try:
+        import os
+        import tempfile
+        from video_export import create_headless_simulation, export_animation
+        
+        simulation = create_headless_simulation(width=320, height=240)
+        with tempfile.TemporaryDirectory() as tmp:
+            # Raw RGB stream written by a background thread
+            raw_path = os.path.join(tmp, 'frames.rgb')
+            count = export_animation(simulation, raw_path, frames=5)
+            assert count == 5
+            assert os.path.getsize(raw_path) == 5 * 320 * 240 * 3
+            print("✓ Raw frame stream exported")
+            
+            # PNG sequence encoded in worker processes
+            png_dir = os.path.join(tmp, 'frames')
+            count = export_animation(simulation, png_dir, frames=3, workers=2)
+            assert sorted(os.listdir(png_dir)) == ['frame_00000.png', 'frame_00001.png', 'frame_00002.png']
+            print("✓ PNG frame sequence exported")
+        
+    except Exception as e:
+        print(f"✗ Animation export test failed: {e}")
+        traceback.print_exc()
+        return False
+    
+    # Writer failures are checked outside the try block, so a wrong error
+    # fails the test under pytest too
+    import os
+    import tempfile
+    import threading
+    import video_export
+    
+    class FailingStream:
+        def __init__(self):
+            self.release = threading.Event()
+        def write(self, data):
+            self.release.wait()
+            raise OSError("disk full")
+        def close(self):
+            pass
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        # A writer thread that fails with a full queue must not hang close()
+        stream = FailingStream()
+        writer = video_export.RawStreamWriter(os.path.join(tmp, 'failing.rgb'), (1, 1), max_pending=1)
+        writer.stream.close()
+        writer.stream = stream
+        writer.write(b'rgb')
+        writer.write(b'rgb')
+        stream.release.set()
+        writer.thread.join()
+        try:
+            writer.close()
+        except OSError as e:
+            assert str(e) == "disk full"
+        else:
+            raise AssertionError("close() did not re-raise the writer error")
+        print("✓ Writer errors are raised by close() without blocking")
+        
+        # An error while stepping is raised instead of the writer's error,
+        # which the first frame has caused by the time the second step fails
+        stream = FailingStream()
+        stream.release.set()
+        def failing_writer(output, size, **options):
+            writer = video_export.RawStreamWriter(output, size)
+            writer.stream.close()
+            writer.stream = stream
+            return writer
+        steps = []
+        def failing_step():
+            steps.append(1)
+            if len(steps) > 1:
+                raise RuntimeError("step failed")
+        simulation.step_physics = failing_step
+        open_frame_writer = video_export.open_frame_writer
+        video_export.open_frame_writer = failing_writer
+        try:
+            video_export.export_animation(simulation, os.path.join(tmp, 'broken.rgb'), frames=2)
+        except RuntimeError as e:
+            assert str(e) == "step failed"
+        else:
+            raise AssertionError("export_animation did not raise the stepping error")
+        finally:
+            video_export.open_frame_writer = open_frame_writer
+        print("✓ Stepping errors are not hidden by the writer")
+    
+    return True
+
+def test_svg_export():
+    """Test streaming SVG export"""
+    print("\nTesting SVG export...")
+    
+    try:
+        import io
+        import xml.dom.minidom
+        from social_network_data import create_clique_network
+        from svg_export import write_svg
+        
+        network = create_clique_network()
+        positions = {node['id']: (node['id'] * 50.0, (node['id'] % 4) * 80.0) for node in network['nodes']}
+        
+        out = io.StringIO()
+        count = write_svg(out, network['nodes'], network['connections'], positions,
+                          group_colors={'Tech': (255, 165, 0)})
+        document = xml.dom.minidom.parseString(out.getvalue())
+        assert count == len(network['connections'])
+        assert len(document.getElementsByTagName('circle')) == len(network['nodes'])
+        assert 'rgb(255,165,0)' in out.getvalue()
+        print(f"✓ SVG written with {count} connections")
+        
+        # Dropping keeps the strongest connections
+        out = io.StringIO()
+        count = write_svg(out, network['nodes'], iter(network['connections']), positions, max_edges=18)
+        document = xml.dom.minidom.parseString(out.getvalue())
+        classes = [line.getAttribute('class') for line in document.getElementsByTagName('line')]
+        assert count == 18 and set(classes) == {'strong'}
+        out = io.StringIO()
+        count = write_svg(out, network['nodes'], network['connections'], positions, max_edges=0)
+        document = xml.dom.minidom.parseString(out.getvalue())
+        assert count == 0 and not document.getElementsByTagName('line')
+        print("✓ Edge dropping keeps the strongest connections")
+        
+        # Bundling merges connections between the same cells
+        out = io.StringIO()
+        count = write_svg(out, network['nodes'], network['connections'], positions, bundle_cell_size=1000)
+        assert count == 1
+        print("✓ Edge bundling merges connections")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ SVG export test failed: {e}")
+        traceback.print_exc()
+        return False
+
+def test_frame_profiler():
+    """Test per-phase frame timing and trace output"""
+    print("\nTesting frame profiler...")
+    
+    try:
+        import csv
+        import json
+        import os
+        import tempfile
+        import time
+        from frame_profiler import FrameProfiler
+        
+        profiler = FrameProfiler(['forces', 'draw'])
+        
+        # Disabled profiler records nothing
+        with profiler.phase('forces'):
+            pass
+        profiler.end_frame()
+        assert profiler.frame_count == 0 and not profiler.frame_times
+        print("✓ Disabled profiler is a no-op")
+        
+        profiler.toggle()
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ('trace.csv', 'trace.jsonl'):
+                path = os.path.join(directory, name)
+                profiler.open_trace(path)
+                for _ in range(3):
+                    with profiler.phase('draw'):
+                        time.sleep(0.002)
+                        # Nested phases are not counted twice
+                        with profiler.phase('forces'):
+                            time.sleep(0.002)
+                    profiler.end_frame()
+                profiler.close_trace()
+                
+                with open(path) as trace:
+                    if name.endswith('.csv'):
+                        rows = list(csv.DictReader(trace))
+                    else:
+                        rows = [json.loads(line) for line in trace]
+                assert len(rows) == 3
+                row = rows[0]
+                total = int(row['forces_ns']) + int(row['draw_ns'])
+                assert total <= int(row['frame_ns'])
+                assert int(row['draw_ns']) < int(row['frame_ns']) - 1_500_000
+            print("✓ CSV and JSONL traces written")
+        
+        p50, p95, p99 = profiler.percentiles('forces')
+        assert 1.5 < p50 <= p95 <= p99
+        assert set(profiler.summary()) == {'forces', 'draw', 'frame'}
+        print(f"✓ Percentiles: forces p50 {p50:.2f} ms")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Frame profiler test failed: {e}")
+        traceback.print_exc()
+        return False
+
+def test_headless_profile():
+    """Test headless runs with cProfile and the sampling profiler"""
+    print("\nTesting headless profiling...")
+    
+    try:
+        import json
+        import os
+        import pstats
+        import tempfile
+        from headless_profile import profile_headless
+        from main import SocialClusteringSimulation
+        from video_export import create_headless_simulation
+        
+        simulation = create_headless_simulation(SocialClusteringSimulation)
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'run')
+            info = profile_headless(simulation, 30, profiler='cprofile', output=output)
+            stats = pstats.Stats(output + '.pstats')
+            functions = {name for _, _, name in stats.stats}
+            assert 'apply_social_forces' in functions
+            print(f"✓ cProfile run: {info['steps_per_second']:.0f} steps/s")
+            
+            info = profile_headless(simulation, 100, profiler='sample', output=output, interval=0.001)
+            with open(output + '.collapsed') as collapsed:
+                lines = collapsed.read().splitlines()
+            assert lines and sum(int(line.rsplit(' ', 1)[1]) for line in lines) == info['samples']
+            assert all(line.startswith('SocialClusteringSimulation nodes=15') for line in lines)
+            print(f"✓ Sampling profiler collected {info['samples']} samples")
+            
+            with open(output + '.json') as metadata:
+                recorded = json.load(metadata)
+            assert recorded['nodes'] == 15 and recorded['force_model'] == 'linear_spring'
+            print("✓ Network size and force model recorded")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Headless profiling test failed: {e}")
+        traceback.print_exc()
+        return False
+
+def test_batch_layout():
+    """Test headless batch layout jobs"""
+    print("\nTesting batch layouts...")
+    
+    try:
+        import json
+        import os
+        import tempfile
+        from batch_layout import run_batch, parse_param
+        from social_network_data import create_clique_network
+        
+        assert parse_param('rest_length=80') == ('rest_length', 80.0)
+        assert parse_param('max_attraction=none') == ('max_attraction', None)
+        
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'cliques.json')
+            with open(source, 'w') as f:
+                json.dump(create_clique_network(), f)
+            missing = os.path.join(directory, 'missing.json')
+            
+            results = run_batch(['basic', source, missing], output_dir=os.path.join(directory, 'out'),
+                                workers=2, max_steps=120, params={'rest_length': 40})
+            assert [result['source'] for result in results] == ['basic', source, missing]
+            assert 'error' in results[2]
+            print("✓ Failed jobs are reported without stopping the batch")
+            
+            with open(os.path.join(directory, 'out', 'cliques.layout.json')) as f:
+                layout = json.load(f)
+            assert len(layout['positions']) == 14 and layout['steps'] <= 120
+            assert layout['metrics']['connections'] == 23
+            assert layout['params'] == {'rest_length': 40}
+            print(f"✓ Layout written after {layout['steps']} steps")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Batch layout test failed: {e}")
+        traceback.print_exc()
+        return False
+
+def test_viewport():
+    """Test the camera, grid index and viewport culling"""
+    print("\nTesting camera and viewport culling...")
+    
+    try:
+        import numpy as np
+        from viewport import Camera, cull_edges
+        from spatial_index import GridIndex
+        
+        camera = Camera(800, 600)
+        camera.zoom_at((200, 100), 4.0)
+        assert np.allclose(camera.world_to_screen(camera.screen_to_world((200, 100))), (200, 100))
+        assert np.allclose(camera.screen_to_world((200, 100)), (200, 100))
+        camera.pan(40, 0)
+        assert np.allclose(camera.screen_to_world((240, 100)), (200, 100))
+        print("✓ Zoom keeps the point under the cursor fixed")
+        
+        rng = np.random.default_rng(3)
+        positions = rng.uniform(-500, 500, (2000, 2))
+        positions[7] = np.nan
+        index = GridIndex(positions, cell_size=30)
+        for x0, y0, x1, y1 in [(-100, -50, 120, 80), (400, 400, 900, 900), (-1000, -1000, 1000, 1000)]:
+            expected = np.nonzero((positions[:, 0] >= x0) & (positions[:, 0] <= x1) &
+                                  (positions[:, 1] >= y0) & (positions[:, 1] <= y1))[0]
+            assert sorted(index.query_rect(x0, y0, x1, y1).tolist()) == expected.tolist()
+        print("✓ Grid index rectangle queries match a full scan")
+        
+        # Within its slack the index follows moved nodes without a rebuild
+        positions = rng.uniform(-500, 500, (2000, 2))
+        index = GridIndex(positions, cell_size=30, slack=10)
+        moved = positions + rng.uniform(-10, 10, positions.shape)
+        assert index.update(moved)
+        expected = np.nonzero((np.abs(moved) <= 100).all(axis=1))[0]
+        assert sorted(index.query_rect(-100, -100, 100, 100).tolist()) == expected.tolist()
+        assert not index.update(positions + 11)
+        print("✓ Grid index follows small movements and asks for a rebuild after larger ones")
+        
+        # An edge crossing the view with both ends outside is kept
+        ends = np.array([[-100.0, 50.0], [900.0, 50.0], [-100.0, -100.0], [-50.0, -100.0]])
+        mask = cull_edges(ends, np.array([0, 2]), np.array([1, 3]), (0, 0, 800, 600))
+        assert mask.tolist() == [True, False]
+        print("✓ Edges are culled by bounding box")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Viewport test failed: {e}")
+        traceback.print_exc()
+        return False
+
+def test_spatial_picking():
+    """Test grid-based node picking and hover highlighting"""
+    print("\nTesting spatial picking...")
+    
+    try:
+        import numpy as np
+        from spatial_index import GridIndex
+        from main_enhanced import EnhancedSocialClusteringSimulation
+        from video_export import create_headless_simulation, render_frame
+        
+        rng = np.random.default_rng(5)
+        positions = rng.uniform(0, 1000, (3000, 2))
+        index = GridIndex(positions, cell_size=25)
+        for x, y in rng.uniform(0, 1000, (200, 2)):
+            distances = np.hypot(positions[:, 0] - x, positions[:, 1] - y)
+            expected = int(np.argmin(distances)) if distances.min() <= 20 else None
+            assert index.nearest(x, y, 20) == expected
+        print("✓ Nearest-node queries match a full scan")
+        
+        simulation = create_headless_simulation(EnhancedSocialClusteringSimulation)
+        body = simulation.node_bodies[5]
+        node = simulation.pick_node((body.position.x + 3, body.position.y - 3))
+        assert simulation.graph.node_ids[node] == 5
+        assert simulation.pick_node((-1000, -1000)) is None
+        print("✓ Picking finds the node under the cursor")
+        
+        simulation.hover_node = node
+        render_frame(simulation)
+        index = simulation.spatial_index
+        render_frame(simulation)
+        assert simulation.spatial_index is index
+        simulation.create_network()
+        assert simulation.hover_node is None and simulation.spatial_index is None
+        print("✓ Hover highlight drawn and reset with the network")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Spatial picking test failed: {e}")
+        traceback.print_exc()
+        return False
+
+def test_ego_network():
+    """Test the cached ego-network search and view"""
+    print("\nTesting ego-network view...")
+    
+    try:
+        from network_graph import NetworkGraph
+        from main_enhanced import EnhancedSocialClusteringSimulation
+        from video_export import create_headless_simulation, render_frame
+        
+        # Path 0-1-2-3 with a triangle 1-2-4
+        graph = NetworkGraph({
+            'nodes': [{'id': i} for i in range(5)],
+            'connections': [{'from': 0, 'to': 1, 'strength': 'strong'}, {'from': 1, 'to': 2},
+                            {'from': 2, 'to': 3}, {'from': 1, 'to': 4}, {'from': 2, 'to': 4}],
+        })
+        depths, edges = graph.ego_network(0, depth=2)
+        assert depths == {0: 0, 1: 1, 2: 2, 4: 2}
+        assert sorted((a, b) for a, b, _ in edges) == [(0, 1), (1, 2), (1, 4), (2, 4)]
+        assert (0, 1, 3.0) in edges
+        assert graph.ego_network(0, depth=2)[0] is depths
+        graph.add_connection({'from': 0, 'to': 3})
+        assert graph.ego_network(0, depth=2)[0][3] == 1
+        print("✓ BFS to depth k is cached until the graph changes")
+        
+        simulation = create_headless_simulation(EnhancedSocialClusteringSimulation)
+        simulation.ego_mode = True
+        simulation.ego_center = simulation.graph.index[1]
+        render_frame(simulation, include_ui=True)
+        overlay = simulation.dim_overlay
+        render_frame(simulation)
+        assert simulation.dim_overlay is overlay
+        assert simulation.ego_summary()[1] == f"  1-hop: {len(simulation.graph.neighbors(1))}"
+        print("✓ Ego view drawn with a cached dimming overlay")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Ego-network test failed: {e}")
+        traceback.print_exc()
+        return False
+
+def test_seeding():
+    """Test that fixed seeds give identical networks and layouts"""
+    print("\nTesting deterministic seeding...")
+    
+    try:
+        import random
+        import numpy as np
+        from seeding import make_rng, make_generator
+        from social_network_data import create_large_network
+        from community_detection import detect_communities
+        from main_enhanced import EnhancedSocialClusteringSimulation
+        from headless_profile import run_steps
+        from video_export import create_headless_simulation
+        
+        assert make_rng(None) is random
+        assert make_rng(5).random() == random.Random(5).random()
+        source = random.Random(1)
+        assert make_rng(source) is source
+        assert isinstance(make_rng(np.random.default_rng(2)), random.Random)
+        assert make_generator(3).random() == np.random.default_rng(3).random()
+        assert make_generator(random.Random(4)).random() == make_generator(random.Random(4)).random()
+        print("✓ Seeds, Random and Generator instances accepted")
+        
+        assert create_large_network(40, 0.2, rng=7) == create_large_network(40, 0.2, rng=7)
+        assert create_large_network(40, 0.2, rng=7) != create_large_network(40, 0.2, rng=8)
+        network = create_large_network(40, 0.2, rng=7)
+        assert detect_communities(network, rng=11) == detect_communities(network, rng=11)
+        print("✓ Generators and community detection are reproducible")
+        
+        layouts = []
+        for _ in range(2):
+            simulation = create_headless_simulation(EnhancedSocialClusteringSimulation, seed=42)
+            simulation.create_network(create_large_network(40, 0.2, rng=simulation.rng))
+            run_steps(simulation, 120)
+            layouts.append(simulation.body_positions())
+        assert np.array_equal(layouts[0], layouts[1])
+        print("✓ Same seed gives a bit-identical layout")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Seeding test failed: {e}")
+        traceback.print_exc()
+        return False
+
+def test_initial_layouts():
+    """Test the group, spectral and BFS initializers"""
+    print("\nTesting initial layouts...")
+    
+    try:
+        import numpy as np
+        import pygame
+        from network_graph import NetworkGraph
+        from initial_layouts import INITIAL_LAYOUTS, initial_positions, bfs_distances
+        from main_enhanced import EnhancedSocialClusteringSimulation
+        from batch_layout import run_layout
+        from social_network_data import create_large_network
+        from step_control import StepController
+        from video_export import create_headless_simulation
+        
+        # Two groups of 10, each a ring with chords, joined by one connection
+        nodes = [{'id': i, 'group': 'A' if i < 10 else 'B'} for i in range(20)]
+        connections = [{'from': base + i, 'to': base + (i + k) % 10}
+                       for base in (0, 10) for i in range(10) for k in (1, 2)]
+        connections.append({'from': 0, 'to': 10})
+        graph = NetworkGraph({'nodes': nodes, 'connections': connections})
+        
+        assert list(bfs_distances(graph, 0)[[0, 1, 2, 5, 10, 15]]) == [0, 1, 1, 3, 1, 4]
+        indptr, indices, _ = graph.adjacency_arrays()
+        assert sorted(indices[indptr[0]:indptr[1]]) == [1, 2, 8, 9, 10]
+        
+        for name in INITIAL_LAYOUTS:
+            positions = initial_positions(name, graph, 800, 600, margin=50, rng=3)
+            assert positions.shape == (20, 2)
+            assert (positions >= 50).all() and (positions[:, 0] <= 750).all() and (positions[:, 1] <= 550).all()
+            assert np.array_equal(positions, initial_positions(name, graph, 800, 600, margin=50, rng=3))
+            if name != 'random':
+                # Groups start apart: each node is closer to its own group's centre
+                centres = np.array([positions[:10].mean(axis=0), positions[10:].mean(axis=0)])
+                own = np.hypot(*(positions - np.repeat(centres, 10, axis=0)).T)
+                other = np.hypot(*(positions - np.repeat(centres[::-1], 10, axis=0)).T)
+                assert (own < other).mean() >= 0.9, name
+        print(f"✓ {', '.join(INITIAL_LAYOUTS)} place nodes inside the canvas, reproducibly")
+        
+        try:
+            initial_positions('nonexistent', graph, 800, 600)
+            print("✗ Unknown initial layout should raise ValueError")
+            return False
+        except ValueError:
+            print("✓ Unknown initial layout rejected")
+        
+        simulation = create_headless_simulation(EnhancedSocialClusteringSimulation, seed=1)
+        simulation.initial_layout = 'spectral'
+        simulation.create_network({'nodes': nodes, 'connections': connections})
+        assert len(simulation.node_bodies) == 20
+        simulation.handle_key(pygame.K_i)
+        assert simulation.initial_layout == 'bfs'
+        print("✓ Simulation places bodies with the selected initializer")
+        
+        # Steps to convergence on the large network, with the adaptive step
+        # (with the default damping every start freezes within ~300 steps)
+        network = create_large_network(150, 0.06, rng=1)
+        settled = {name: run_layout(network, max_steps=4000, seed=1, initial_layout=name,
+                                    step_control=StepController())
+                   for name in ('random', 'spectral')}
+        assert settled['spectral']['converged']
+        assert (settled['spectral']['metrics']['average_connection_length']
+                < settled['random']['metrics']['average_connection_length'])
+        print("✓ Steps to convergence: " + ', '.join(
+            f"{name} {result['steps']}" for name, result in settled.items()))
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Initial layout test failed: {e}")
+        traceback.print_exc()
+        return False
+
+def test_step_control():
+    """Test the adaptive time step and cooling schedule"""
+    print("\nTesting adaptive time step...")
+    
+    try:
+        import numpy as np
+        from step_control import StepController
+        from batch_layout import run_layout
+        from social_network_data import create_large_network
+        
+        controller = StepController(dt=0.02, min_dt=0.01, max_dt=0.04, shrink=0.5, patience=2)
+        for scale in (4.0, 3.0, 2.0):
+            dt = controller.update(np.full((3, 2), scale))
+        assert dt == 0.04
+        assert controller.update(np.full((3, 2), 5.0)) == 0.02
+        assert controller.update(np.full((3, 2), 6.0)) == 0.01
+        assert controller.update(np.full((3, 2), 7.0)) == 0.01
+        print("✓ Step grows while the energy falls and shrinks when it rises")
+        
+        controller = StepController(temperature=2.0, cooling=0.5)
+        velocities = controller.limit(np.array([[600.0, 800.0], [1.0, 0.0]]), 0.01)
+        assert np.isclose(np.hypot(*velocities[0]) * 0.01, 2.0)
+        assert velocities[1, 0] == 1.0
+        assert controller.temperature == 1.0
+        controller.reset()
+        assert controller.temperature == 2.0 and controller.energy is None
+        print("✓ Temperature caps the per-step movement and cools down")
+        
+        try:
+            StepController(shrink=1.5)
+            print("✗ Invalid shrink factor should raise ValueError")
+            return False
+        except ValueError:
+            print("✓ Invalid settings rejected")
+        
+        network = create_large_network(60, 0.1, rng=2)
+        result = run_layout(network, params={'damping': 0.95}, max_steps=3000, seed=2,
+                            step_control=StepController(temperature=30, cooling=0.98))
+        assert result['converged'], result['movement']
+        print(f"✓ Annealed layout converged in {result['steps']} steps")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Step control test failed: {e}")
+        traceback.print_exc()
+        return False
+
+def test_simulation_core():
+    """Test that the launchers share one core with different profiles"""
+    print("\nTesting shared simulation core...")
+    
+    try:
+        import numpy as np
+        from simulation_core import SocialSimulation, PROFILES
+        from main import SocialClusteringSimulation
+        from main_enhanced import EnhancedSocialClusteringSimulation
+        from all_in_one import EnhancedSocialClusteringSimulation as AllInOneSimulation
+        from headless_profile import run_steps
+        from video_export import create_headless_simulation, render_frame
+        
+        basic = create_headless_simulation(SocialClusteringSimulation, seed=3)
+        enhanced = create_headless_simulation(EnhancedSocialClusteringSimulation, seed=3)
+        all_in_one = create_headless_simulation(AllInOneSimulation, seed=3)
+        assert (basic.profile, enhanced.profile, all_in_one.profile) == ('basic', 'enhanced', 'enhanced')
+        assert basic.attraction_force == PROFILES['basic']['attraction_force']
+        assert basic.node_radius == 15 and enhanced.node_radius == 18
+        assert len(basic.space.shapes) == 15 and len(enhanced.space.shapes) == 19  # walls
+        assert (all_in_one.width, all_in_one.height) == (1200, 800)
+        print("✓ Launchers differ only in their profile")
+        
+        custom = create_headless_simulation(SocialSimulation, profile='basic', seed=3, walls=True)
+        assert len(custom.space.shapes) == 19 and custom.attraction_force == basic.attraction_force
+        try:
+            SocialSimulation(profile='nonexistent')
+            print("✗ Unknown profile should raise ValueError")
+            return False
+        except ValueError:
+            print("✓ Profile overrides applied, unknown profiles rejected")
+        
+        run_steps(basic, 30)
+        model = basic.current_force_model()
+        assert basic.current_force_model() is model
+        basic.force_params['rest_length'] = 70
+        assert basic.current_force_model() is not model
+        print("✓ Force model reused until its settings change")
+        
+        for simulation in (basic, enhanced):
+            render_frame(simulation, include_ui=True)
+            assert np.isfinite(simulation.body_positions()).all()
+        print("✓ Both profiles draw through the shared path")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Simulation core test failed: {e}")
+        traceback.print_exc()
+        return False
+
+def test_parallel_forces():
+    """Test force parts and the shared-memory process backend"""
+    print("\nTesting parallel forces...")
+    
+    try:
+        import numpy as np
+        from force_models import create_force_model, compute_part, CellGrid, FORCE_MODELS
+        from network_graph import NetworkGraph
+        from social_network_data import create_large_network
+        from parallel_forces import SharedMemoryForceBackend
+        
+        graph = NetworkGraph(create_large_network(400, 0.02, rng=4))
+        positions = np.random.default_rng(4).uniform(0, 800, (400, 2))
+        for name in list(FORCE_MODELS) + ['linear_spring+group_gravity']:
+            model = create_force_model(name, group_gravity=0.5)
+            full = model.compute(positions, graph)
+            parts = sum(model.compute(positions, graph, (k, 3)) for k in range(3))
+            assert np.allclose(parts, full), name
+            grid = model.cell_grid(positions)
+            parts = sum(compute_part(model, positions, graph, (k, 3), grid) for k in range(3))
+            assert np.allclose(parts, full), name
+        cells = [CellGrid(positions, 80).part_cells((k, 3)) for k in range(3)]
+        assert np.array_equal(np.concatenate(cells), CellGrid(positions, 80).part_cells())
+        print("✓ Force parts add up to the full forces for every model, with or without a shared grid")
+        
+        model = create_force_model('linear_spring+group_gravity', group_gravity=0.5)
+        with SharedMemoryForceBackend(workers=2, capacity=64) as backend:
+            assert np.allclose(backend.compute(model, positions, graph), model.compute(positions, graph))
+            graph.add_connection({'from': graph.node_ids[0], 'to': graph.node_ids[1], 'strength': 'strong'})
+            assert np.allclose(backend.compute(model, positions, graph), model.compute(positions, graph))
+            bigger = NetworkGraph(create_large_network(900, 0.01, rng=5))
+            spread = np.random.default_rng(5).uniform(0, 1200, (900, 2))
+            assert np.allclose(backend.compute(model, spread, bigger), model.compute(spread, bigger))
+            assert backend.capacity >= 900
+            
+            # Fresh graphs of the same size and version, the old one freed
+            # each time (as pressing R twice while paused does)
+            chain = {'nodes': [{'id': i, 'group': 'A'} for i in range(4)]}
+            line = np.array([[0.0, 0.0], [200.0, 0.0], [400.0, 0.0], [600.0, 0.0]])
+            for pair in [(0, 1), (2, 3), (0, 1), (2, 3)]:
+                bigger = None
+                bigger = NetworkGraph(dict(chain, connections=[{'from': pair[0], 'to': pair[1]}]))
+                assert np.allclose(backend.compute(model, line, bigger), model.compute(line, bigger)), pair
+            print("✓ Workers follow graph changes, new graphs and growing buffers")
+            
+            broken = create_force_model('linear_spring', rest_length='far')
+            try:
+                backend.compute(broken, positions, graph)
+                print("✗ Worker errors should raise RuntimeError")
+                return False
+            except RuntimeError:
+                print("✓ Worker errors reported to the caller")
+        
+        try:
+            backend.compute(model, positions, graph)
+            print("✗ Closed backend should raise RuntimeError")
+            return False
+        except RuntimeError:
+            print("✓ Closed backend rejected")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Parallel force test failed: {e}")
+        traceback.print_exc()
+        return False
+
+def test_thread_forces():
+    """Test the thread-pool force backend"""
+    print("\nTesting thread-pool forces...")
+    
+    try:
+        import numpy as np
+        from force_models import create_force_model
+        from network_graph import NetworkGraph
+        from social_network_data import create_large_network
+        from parallel_forces import ThreadPoolForceBackend, benchmark
+        
+        graph = NetworkGraph(create_large_network(500, 0.01, rng=6))
+        positions = np.random.default_rng(6).uniform(0, 900, (500, 2))
+        model = create_force_model('fruchterman_reingold+group_gravity', group_gravity=0.5)
+        serial = model.compute(positions, graph)
+        for workers, parts in [(1, None), (3, None), (2, 5)]:
+            with ThreadPoolForceBackend(workers=workers, parts=parts) as backend:
+                assert backend.workers == workers
+                assert backend.parts == (parts or workers)
+                assert np.allclose(backend.compute(model, positions, graph), serial)
+        print("✓ Threaded forces match the serial kernel for any worker count")
+        
+        with ThreadPoolForceBackend(workers=2) as backend:
+            graph.add_connection({'from': graph.node_ids[2], 'to': graph.node_ids[3], 'strength': 'strong'})
+            assert np.allclose(backend.compute(model, positions, graph), model.compute(positions, graph))
+        print("✓ Threaded forces follow graph changes")
+        
+        try:
+            backend.compute(model, positions, graph)
+            print("✗ Closed backend should raise RuntimeError")
+            return False
+        except RuntimeError:
+            print("✓ Closed backend rejected")
+        
+        rows = benchmark(sizes=(300,), workers=(1, 2), repeats=1)
+        assert [row['backend'] for row in rows] == ['serial'] + ['ThreadPoolForceBackend'] * 2 + ['SharedMemoryForceBackend'] * 2
+        assert all(row['milliseconds'] > 0 for row in rows)
+        print("✓ Benchmark times the serial kernel and both backends")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Thread force test failed: {e}")
+        traceback.print_exc()
+        return False
+
+def test_async_physics():
+    """Test the background physics thread, its snapshots and mouse commands"""
+    print("\nTesting asynchronous physics...")
+    
+    try:
+        import time
+        import numpy as np
+        from async_physics import SnapshotBuffer
+        from main_enhanced import EnhancedSocialClusteringSimulation
+        from video_export import create_headless_simulation
+        
+        buffer = SnapshotBuffer()
+        first = np.array([[1.0, 2.0], [3.0, 4.0]])
+        buffer.publish(first)
+        first[0, 0] = 99.0
+        snapshot, version = buffer.read()
+        assert version == 1 and snapshot[0, 0] == 1.0
+        snapshot[0, 1] = -1.0
+        buffer.publish(np.zeros((3, 2)))
+        assert buffer.read()[0].shape == (3, 2) and buffer.read()[1] == 2
+        print("✓ Snapshots are copies and swap atomically")
+        
+        def wait_for(condition, timeout=10.0):
+            deadline = time.time() + timeout
+            while not condition():
+                assert time.time() < deadline, "timed out"
+                time.sleep(0.01)
+        
+        simulation = create_headless_simulation(EnhancedSocialClusteringSimulation, seed=8)
+        physics = simulation.start_physics_thread(steps_per_second=None)
+        try:
+            wait_for(lambda: physics.steps > 20)
+            positions, version = physics.snapshot.read()
+            assert positions.shape == (simulation.graph.num_nodes, 2) and version > 20
+            assert np.allclose(simulation.display_positions().shape, positions.shape)
+            print("✓ Physics steps on its own thread and publishes snapshots")
+            
+            target = (700.0, 450.0)
+            simulation.send_mouse_command(('grab', 0, tuple(simulation.display_positions()[0])))
+            wait_for(lambda: simulation.mouse_joint is not None)
+            simulation.send_mouse_command(('drag', target))
+            wait_for(lambda: np.hypot(*(simulation.display_positions()[0] - target)) < 5)
+            simulation.send_mouse_command(('release',))
+            wait_for(lambda: simulation.mouse_joint is None)
+            print("✓ Mouse commands reach the physics thread through the queue")
+            
+            with simulation.physics_locked():
+                simulation.current_network = 2
+                simulation.create_network()
+                assert physics.snapshot.read()[0].shape == (30, 2)
+            wait_for(lambda: physics.steps > 40)
+            assert np.isfinite(simulation.display_positions()).all()
+            print("✓ Network changes under the physics lock stay consistent")
+        finally:
+            simulation.stop_physics_thread()
+        
+        assert not physics.running and simulation.physics_thread is None
+        assert physics.error is None
+        np.testing.assert_array_equal(simulation.display_positions(), simulation.body_positions())
+        print("✓ Stopping returns the physics to the main thread")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Async physics test failed: {e}")
+        traceback.print_exc()
+        return False
+
+def test_layout_cache():
+    """Test the content-addressed layout cache and its LRU eviction"""
+    print("\nTesting layout cache...")
+    
+    try:
+        import os
+        import tempfile
+        import time
+        from layout_cache import LayoutCache, layout_key, network_fingerprint
+        from social_network_data import create_social_network, create_clique_network
+        from batch_layout import run_layout
+        
+        network = create_social_network()
+        renamed = create_social_network()
+        renamed['nodes'][0]['name'] = 'Someone else'
+        assert network_fingerprint(network) == network_fingerprint(renamed)
+        changed = create_social_network()
+        changed['connections'][0]['strength'] = 'weak' if changed['connections'][0].get('strength') != 'weak' else 'strong'
+        assert network_fingerprint(network) != network_fingerprint(changed)
+        settings = {'seed': 1, 'force_params': {'rest_length': 60}}
+        assert layout_key(network, settings) == layout_key(renamed, dict(settings))
+        assert layout_key(network, settings) != layout_key(network, dict(settings, seed=2))
+        assert layout_key(network, settings) != layout_key(create_clique_network(), settings)
+        print("✓ Keys depend on network structure and settings only")
+        
+        with tempfile.TemporaryDirectory() as directory:
+            cache = LayoutCache(directory, max_bytes=10 ** 6)
+            assert cache.get('missing') is None
+            for name in 'abc':
+                cache.put(name, {'payload': name * 300})
+                time.sleep(0.02)
+            assert len(cache) == 3 and 'a' in cache
+            cache.get('a')  # Now the most recently used
+            entry_size = os.path.getsize(cache.path('b'))
+            cache.max_bytes = 2 * entry_size
+            cache.evict()
+            assert 'a' in cache and 'c' in cache and 'b' not in cache
+            print("✓ Least recently used entries are evicted first")
+            
+            cache.max_bytes = 10 ** 6
+            first = run_layout(network, max_steps=120, seed=5, cache=cache)
+            second = run_layout(network, max_steps=120, seed=5, cache=cache)
+            assert not first['cached'] and second['cached']
+            assert second['positions'] == first['positions'] and second['steps'] == first['steps']
+            assert not run_layout(network, max_steps=120, seed=6, cache=cache)['cached']
+            assert not run_layout(network, max_steps=120, seed=5, params={'rest_length': 80}, cache=cache)['cached']
+            count = len(cache)
+            assert not run_layout(network, max_steps=120, cache=cache)['cached']
+            assert len(cache) == count
+            print("✓ Repeated layouts come from the cache; unseeded ones are not stored")
+            
+            from main_enhanced import EnhancedSocialClusteringSimulation
+            from video_export import create_headless_simulation
+            simulation = create_headless_simulation(EnhancedSocialClusteringSimulation, seed=5)
+            simulation.layout_cache = cache
+            simulation.create_network()
+            positions = simulation.body_positions()
+            again = create_headless_simulation(EnhancedSocialClusteringSimulation, seed=5)
+            again.layout_cache = cache
+            size = len(cache)
+            again.create_network()
+            assert len(cache) == size
+            assert (again.body_positions() == positions).all()
+            print("✓ Simulations start from the cached converged layout")
+            
+            cache.clear()
+            assert len(cache) == 0
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Layout cache test failed: {e}")
+        traceback.print_exc()
+        return False
+
+def test_network_streams():
+    """Test the streaming network generators"""
+    print("\nTesting network streams...")
+    
+    try:
+        import os
+        import tempfile
+        import tracemalloc
+        import numpy as np
+        from network_streams import (GroupModelStream, StochasticBlockStream, PreferentialAttachmentStream,
+                                     SmallWorldStream, bernoulli_indices)
+        from network_graph import NetworkGraph
+        from social_network_data import create_large_network
+        from batch_layout import load_network
+        
+        stream = GroupModelStream(300, 0.05, rng=2, chunk_size=100)
+        network = stream.to_network()
+        assert network['nodes'] == create_large_network(300, 0.05, rng=2)['nodes']
+        pairs = [(c['from'], c['to']) for c in network['connections']]
+        assert len(set(pairs)) == len(pairs) and all(a < b for a, b in pairs)
+        for c in network['connections']:
+            same_group = (c['from'] - c['to']) % 5 == 0
+            assert (c['strength'] == 'weak') != same_group
+        assert network == stream.to_network()  # Same seed, same network
+        sizes = [len(chunk[0]) for chunk in stream.edge_chunks()]
+        assert all(size == 100 for size in sizes[:-1]) and 0 < sizes[-1] <= 100
+        expected = 0.05 * 2 * 5 * 60 * 59 / 2 + 0.05 * 0.3 * (300 * 299 / 2 - 5 * 60 * 59 / 2)
+        assert abs(len(pairs) - expected) < 0.15 * expected
+        print("✓ Group model stream matches the create_large_network model")
+        
+        kept = np.concatenate(list(bernoulli_indices(10 ** 6, 0.01, np.random.default_rng(1), batch=1000)))
+        assert (np.diff(kept) > 0).all() and kept[-1] < 10 ** 6 and abs(len(kept) - 10 ** 4) < 400
+        blocks = StochasticBlockStream([40, 60], p_in=1.0, p_out=0.0, rng=1).to_network()
+        assert len(blocks['connections']) == 40 * 39 // 2 + 60 * 59 // 2
+        assert {n['group'] for n in blocks['nodes']} == {'A', 'B'}
+        attachment = PreferentialAttachmentStream(1000, 3, rng=3).to_graph()
+        degrees = attachment.degree_array()
+        assert attachment.num_edges == 6 + 3 * 996 and degrees.min() >= 3 and degrees.max() > 30
+        small_world = SmallWorldStream(500, neighbors=6, rewire=0.1, rng=4).to_network()
+        weak = sum(c['strength'] == 'weak' for c in small_world['connections'])
+        assert len(small_world['connections']) == 1500 and 100 < weak < 200
+        print("✓ Block, preferential attachment and small-world models")
+        
+        graph = stream.to_graph()
+        assert graph.adjacency == NetworkGraph(network).adjacency
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'network.json')
+            stream.write_json(path)
+            assert load_network(path) == network
+        print("✓ Streams feed NetworkGraph and network files directly")
+        
+        tracemalloc.start()
+        try:
+            count = sum(len(chunk[0]) for chunk in SmallWorldStream(200000, neighbors=6, rng=5).edge_chunks())
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        assert count == 600000 and peak < 20 * 1024 * 1024
+        print(f"✓ 600,000 streamed connections peak at {peak / 2 ** 20:.1f} MB")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Network stream test failed: {e}")
+        traceback.print_exc()
+        return False
+
+def test_lazy_imports():
+    """Test that pygame and pymunk load only when they are needed"""
+    print("\nTesting lazy imports...")
+    
+    try:
+        import json
+        import os
+        import subprocess
+        
+        # A fresh interpreter, since this one has imported pygame already
+        script = """
+import json, sys, time
+start = time.perf_counter()
+import main, main_enhanced, all_in_one, examples, batch_layout, headless_profile, video_export
+elapsed = time.perf_counter() - start
+after_import = sorted({'pygame', 'pymunk'} & set(sys.modules))
+from video_export import create_headless_simulation
+simulation = create_headless_simulation(main_enhanced.EnhancedSocialClusteringSimulation, seed=1)
+simulation.step_physics()
+after_create = sorted({'pygame', 'pymunk'} & set(sys.modules))
+simulation.screen
+print(json.dumps({'elapsed': elapsed, 'after_import': after_import, 'after_create': after_create,
+                  'pygame': 'pygame' in sys.modules, 'size': list(simulation.screen.get_size())}))
+"""
+        directory = os.path.dirname(os.path.abspath(__file__))
+        environment = dict(os.environ, SDL_VIDEODRIVER='dummy')
+        output = subprocess.run([sys.executable, '-c', script], cwd=directory, env=environment,
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        assert result['after_import'] == [], result
+        print("✓ Importing the launchers and analysis modules loads neither pygame nor pymunk")
+        
+        assert result['after_create'] == ['pymunk'], result
+        assert result['pygame'] and result['size'] == [1400, 900]
+        print("✓ Creating a simulation loads pymunk; the window opens on first use of the screen")
+        
+        assert result['elapsed'] < IMPORT_TIME_BUDGET, result
+        print(f"✓ Import time {result['elapsed'] * 1000:.0f} ms (budget {IMPORT_TIME_BUDGET * 1000:.0f} ms)")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Lazy import test failed: {e}")
+        traceback.print_exc()
+        return False
+
+def test_edge_sampling():
+    """Test edge-sampled attraction and the adaptive sample rate"""
+    print("\nTesting edge sampling...")
+    
+    try:
+        import numpy as np
+        from edge_sampling import sample_edges, SampleRateController
+        from force_models import create_force_model, sorted_contains
+        from network_graph import NetworkGraph
+        from social_network_data import create_large_network
+        from main_enhanced import EnhancedSocialClusteringSimulation
+        from video_export import create_headless_simulation
+        
+        weights = np.array([1.0, 3.0] * 500)
+        indices, scale = sample_edges(weights, np.cumsum(weights), 0.1, np.random.default_rng(1),
+                                      slice(200, 600))
+        assert len(indices) == 40 and (np.diff(indices) >= 0).all()
+        assert indices.min() >= 200 and indices.max() < 600
+        assert np.allclose(scale * weights[indices], weights[200:600].sum() / 40)
+        counts = np.zeros(len(weights))
+        generator = np.random.default_rng(2)
+        for _ in range(200):
+            np.add.at(counts, sample_edges(weights, np.cumsum(weights), 0.1, generator)[0], 1)
+        assert 2.5 < counts[1::2].sum() / counts[0::2].sum() < 3.5
+        print("✓ Edges are drawn in proportion to their strength, about rate x E per step")
+        
+        graph = NetworkGraph(create_large_network(150, 0.4, rng=1))
+        positions = np.random.default_rng(3).uniform(0, 800, (150, 2))
+        for name in ['linear_spring', 'fruchterman_reingold', 'forceatlas2']:
+            exact = create_force_model(name).compute(positions, graph)
+            assert np.array_equal(create_force_model(name, edge_sample_rate=1.0).compute(positions, graph), exact)
+            model = create_force_model(name, edge_sample_rate=0.1, edge_sample_seed=4)
+            single = model.compute(positions, graph)
+            mean = sum(model.compute(positions, graph) for _ in range(300)) / 300
+            norm = np.linalg.norm(exact)
+            assert np.linalg.norm(single - exact) > 0.05 * norm
+            assert np.linalg.norm(mean - exact) < 0.1 * norm, name
+        print("✓ Sampled forces average out to the exact forces")
+        
+        combined = create_force_model('fruchterman_reingold+group_gravity', edge_sample_rate=0.2)
+        assert combined.edge_sample_rate == 0.2
+        combined.edge_sample_rate = 0.5
+        assert combined.models[0].edge_sample_rate == 0.5
+        keys = np.sort(np.random.default_rng(5).choice(10 ** 6, 5000, replace=False))
+        queries = np.random.default_rng(6).integers(0, 10 ** 6, 20000)
+        assert np.array_equal(sorted_contains(keys, queries), np.isin(queries, keys))
+        print("✓ Combined models share the rate; edge lookups match np.isin")
+        
+        controller = SampleRateController(target_time=0.01)
+        for _ in range(60):
+            controller.update(0.002 + 0.05 * controller.rate)
+        assert abs(controller.rate - 0.16) < 0.01
+        controller.reset()
+        for _ in range(10):
+            controller.update(0.001)
+        assert controller.rate == 1.0
+        print(f"✓ Rate controller settles on the budget (rate {controller.rate:.2f} when it fits)")
+        
+        simulation = create_headless_simulation(EnhancedSocialClusteringSimulation, seed=1)
+        simulation.create_network(create_large_network(150, 0.4, rng=1))
+        simulation.edge_sampling = SampleRateController(target_time=1e-6, min_rate=0.05)
+        for _ in range(10):
+            simulation.step_physics()
+        assert simulation.current_force_model().edge_sample_rate == 0.05
+        assert simulation.layout_settings()['edge_sampling']['min_rate'] == 0.05
+        simulation.edge_sampling = None
+        simulation.step_physics()
+        assert simulation.current_force_model().edge_sample_rate == 1.0
+        print("✓ Simulation adapts the rate and returns to all edges when sampling is off")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Edge sampling test failed: {e}")
+        traceback.print_exc()
+        return False
+
 def run_all_tests():
     """Run all tests and report results"""
     print("Social Clustering Simulation - Test Suite")
@@ -171,6 +1482,30 @@ def run_all_tests():
         ("Basic Simulation Test", test_simulation_initialization),
         ("Enhanced Simulation Test", test_enhanced_simulation_initialization),
         ("Parameter Validation Test", test_parameter_validation),
+        ("Community Detection Test", test_community_detection),
+        ("Spatial Clustering Test", test_spatial_clustering),
+        ("Network Analytics Test", test_network_analytics),
+        ("Force Model Test", test_force_models),
+        ("Group Gravity Test", test_group_gravity),
+        ("Animation Export Test", test_video_export),
+        ("SVG Export Test", test_svg_export),
+        ("Frame Profiler Test", test_frame_profiler),
+        ("Headless Profiling Test", test_headless_profile),
+        ("Batch Layout Test", test_batch_layout),
+        ("Viewport Test", test_viewport),
+        ("Spatial Picking Test", test_spatial_picking),
+        ("Ego Network Test", test_ego_network),
+        ("Seeding Test", test_seeding),
+        ("Initial Layout Test", test_initial_layouts),
+        ("Step Control Test", test_step_control),
+        ("Simulation Core Test", test_simulation_core),
+        ("Parallel Forces Test", test_parallel_forces),
+        ("Thread Forces Test", test_thread_forces),
+        ("Async Physics Test", test_async_physics),
+        ("Layout Cache Test", test_layout_cache),
+        ("Network Stream Test", test_network_streams),
+        ("Lazy Import Test", test_lazy_imports),
+        ("Edge Sampling Test", test_edge_sampling),
     ]
     
     passed = 0
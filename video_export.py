@@ -0,0 +1,263 @@
+"""
+Offline animation export for the Social Clustering Simulation
+
+Runs a simulation without a window and renders every frame to an
+off-screen pygame.Surface, so export speed depends only on the physics and
+drawing code, not on the 60 FPS display clock.
+
+Frames can be written as:
+- a PNG sequence (output is a directory); PNG encoding runs in a process
+  pool so compression never blocks the physics loop
+- a raw RGB24 stream (output ends in .rgb or .raw), written by a
+  background thread
+- an encoded video (any other extension such as .mp4), by piping the raw
+  stream into ffmpeg, which must be on the PATH
+
+Example:
+    python video_export.py --network clique --frames 600 frames/
+"""
+
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+RAW_EXTENSIONS = ('.rgb', '.raw')
+
+
+def _frombytes(data, size):
+    import pygame
+    # pygame < 2.1.3 only has the older fromstring name
+    frombytes = getattr(pygame.image, 'frombytes', None) or pygame.image.fromstring
+    return frombytes(data, size, 'RGB')
+
+
+def _tobytes(surface):
+    import pygame
+    tobytes = getattr(pygame.image, 'tobytes', None) or pygame.image.tostring
+    return tobytes(surface, 'RGB')
+
+
+def _save_png(data, size, path):
+    """Encode one raw RGB frame as PNG (runs in a worker process)"""
+    import pygame
+    pygame.image.save(_frombytes(data, size), path)
+    return path
+
+
+class PNGSequenceWriter:
+    """
+    Write frames as numbered PNG files using a pool of encoder processes.
+
+    At most max_pending frames are queued for encoding; beyond that,
+    write() waits for the oldest frame so memory use stays bounded.
+    """
+
+    def __init__(self, directory, size, workers=None, max_pending=None):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.size = size
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.max_pending = max_pending or 4 * (workers or os.cpu_count() or 1)
+        self.pending = []
+        self.frame_count = 0
+
+    def write(self, data):
+        path = os.path.join(self.directory, f"frame_{self.frame_count:05d}.png")
+        self.pending.append(self.executor.submit(_save_png, data, self.size, path))
+        self.frame_count += 1
+        if len(self.pending) >= self.max_pending:
+            self.pending.pop(0).result()
+
+    def close(self):
+        for future in self.pending:
+            future.result()
+        self.pending = []
+        self.executor.shutdown()
+
+
+class RawStreamWriter:
+    """
+    Write raw RGB24 frames to a file or ffmpeg from a background thread.
+
+    If the output is not a .rgb/.raw file, the frames are piped into
+    ffmpeg, which encodes them into the format implied by the extension.
+    """
+
+    def __init__(self, path, size, fps=60, max_pending=32):
+        self.process = None
+        if path.lower().endswith(RAW_EXTENSIONS):
+            self.stream = open(path, 'wb')
+        else:
+            ffmpeg = shutil.which('ffmpeg')
+            if ffmpeg is None:
+                raise RuntimeError(f"ffmpeg is required to write {path}; "
+                                   "export to a directory or a .rgb file instead")
+            self.process = subprocess.Popen(
+                [ffmpeg, '-y', '-loglevel', 'error',
+                 '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+                 '-s', f"{size[0]}x{size[1]}", '-r', str(fps), '-i', '-',
+                 '-pix_fmt', 'yuv420p', path],
+                stdin=subprocess.PIPE)
+            self.stream = self.process.stdin
+
+        self.frame_count = 0
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.error = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            data = self.queue.get()
+            if data is None:
+                break
+            try:
+                self.stream.write(data)
+            except Exception as e:
+                self.error = e
+                break
+
+    def _put(self, item):
+        """Queue an item for the writer thread; returns False once the thread has stopped"""
+        while self.thread.is_alive():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def write(self, data):
+        if self.error or not self._put(data):
+            raise self.error or RuntimeError("frame writer thread has stopped")
+        self.frame_count += 1
+
+    def close(self):
+        # A writer thread that died on an error no longer empties the queue
+        self._put(None)
+        self.thread.join()
+        try:
+            self.stream.close()
+        except OSError:
+            if self.error is None:
+                raise
+        if self.process:
+            self.process.wait()
+        if self.error:
+            raise self.error
+
+
+def open_frame_writer(output, size, fps=60, workers=None):
+    """Pick a frame writer based on the output path"""
+    extension = os.path.splitext(output)[1]
+    if not extension:
+        return PNGSequenceWriter(output, size, workers=workers)
+    return RawStreamWriter(output, size, fps=fps)
+
+
+def create_headless_simulation(simulation_class=None, **kwargs):
+    """
+    Create a simulation that does not open a visible window.
+
+    Uses SDL's dummy video driver unless a driver was chosen explicitly, in
+    case something draws to simulation.screen (which opens the display).
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    if simulation_class is None:
+        from main_enhanced import EnhancedSocialClusteringSimulation
+        simulation_class = EnhancedSocialClusteringSimulation
+    return simulation_class(**kwargs)
+
+
+def attach_offscreen_surface(simulation):
+    """Redirect a simulation's drawing to a new off-screen surface"""
+    import pygame
+    pygame.init()  # Fonts, without opening a window
+    surface = pygame.Surface((simulation.width, simulation.height))
+    simulation.screen = surface
+    return surface
+
+
+def render_frame(simulation, include_ui=False):
+    """Draw the current state of the simulation onto simulation.screen"""
+    simulation.screen.fill((30, 30, 30))
+    simulation.draw_network()
+    if include_ui and hasattr(simulation, 'draw_ui'):
+        simulation.draw_ui()
+
+
+def export_animation(simulation, output, frames=600, steps_per_frame=1, fps=60,
+                     include_ui=False, workers=None, progress=None):
+    """
+    Run the simulation headlessly and export every frame.
+
+    Args:
+        simulation: Simulation instance (see create_headless_simulation)
+        output: Directory for a PNG sequence, a .rgb/.raw file, or a video
+            file name for ffmpeg
+        frames: Number of frames to export
+        steps_per_frame: Physics steps between exported frames
+        fps: Frame rate written into encoded videos
+        include_ui: Also draw the enhanced simulation's UI panel
+        workers: Number of PNG encoder processes (default: CPU count)
+        progress: Optional callback called with the frame number
+
+    Returns:
+        Number of frames written
+    """
+    surface = attach_offscreen_surface(simulation)
+    writer = open_frame_writer(output, surface.get_size(), fps=fps, workers=workers)
+    try:
+        for frame in range(frames):
+            for _ in range(steps_per_frame):
+                simulation.step_physics()
+            render_frame(simulation, include_ui)
+            writer.write(_tobytes(surface))
+            if progress:
+                progress(frame)
+    except BaseException:
+        # Keep the original error; a writer that also fails is only reported
+        try:
+            writer.close()
+        except Exception as e:
+            print(f"Closing the frame writer also failed: {e!r}", file=sys.stderr)
+        raise
+    writer.close()
+    return writer.frame_count
+
+
+def main():
+    """Command line entry point for animation export"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export the social clustering simulation as frames or video")
+    parser.add_argument('output', help="directory (PNG frames), .rgb/.raw file, or video file (needs ffmpeg)")
+    parser.add_argument('--network', choices=['basic', 'clique', 'large'], default='basic')
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--steps-per-frame', type=int, default=1)
+    parser.add_argument('--fps', type=int, default=60)
+    parser.add_argument('--width', type=int, default=1400)
+    parser.add_argument('--height', type=int, default=900)
+    parser.add_argument('--workers', type=int, default=None, help="PNG encoder processes")
+    parser.add_argument('--ui', action='store_true', help="include the UI panel")
+    parser.add_argument('--seed', type=int, default=None, help="seed for a reproducible animation")
+    args = parser.parse_args()
+
+    simulation = create_headless_simulation(width=args.width, height=args.height, seed=args.seed)
+    simulation.current_network = simulation.network_types.index(args.network)
+    simulation.create_network()
+
+    count = export_animation(simulation, args.output, frames=args.frames,
+                             steps_per_frame=args.steps_per_frame, fps=args.fps,
+                             include_ui=args.ui, workers=args.workers)
+    print(f"Exported {count} frames to {args.output}")
+    import pygame
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
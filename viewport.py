@@ -0,0 +1,93 @@
+"""
+Camera with zoom and pan for drawing large layouts
+
+The camera maps world coordinates (pymunk body positions) to screen
+pixels as screen = (world - offset) * zoom, where offset is the world
+point shown at the top-left corner of the window. world_to_screen
+converts a whole (N, 2) position array in one NumPy operation.
+
+cull_edges finds the connections whose bounding box overlaps the view;
+visible nodes come from spatial_index.GridIndex.query_rect over
+camera.visible_rect().
+"""
+
+import numpy as np
+
+
+class Camera:
+    """
+    Zoomable, pannable view onto the simulation world.
+
+    Args:
+        width, height: Size of the screen in pixels
+        min_zoom, max_zoom: Limits for zoom_at
+    """
+
+    def __init__(self, width, height, min_zoom=0.02, max_zoom=8.0):
+        self.width = width
+        self.height = height
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.reset()
+
+    def reset(self):
+        """Show the world at 1:1 scale with the origin in the top-left corner"""
+        self.zoom = 1.0
+        self.offset = np.zeros(2)
+
+    def world_to_screen(self, points):
+        """Convert an (N, 2) array (or a single point) of world coordinates to screen pixels"""
+        return (np.asarray(points, dtype=float) - self.offset) * self.zoom
+
+    def screen_to_world(self, point):
+        """Convert a screen pixel position to world coordinates"""
+        return (point[0] / self.zoom + self.offset[0], point[1] / self.zoom + self.offset[1])
+
+    def visible_rect(self, margin=0.0):
+        """
+        Return the world rectangle (x0, y0, x1, y1) shown on screen.
+
+        Args:
+            margin: Extra border in world units, e.g. the node radius so
+                that partly visible nodes are kept
+        """
+        x0, y0 = self.offset - margin
+        return (x0, y0,
+                self.offset[0] + self.width / self.zoom + margin,
+                self.offset[1] + self.height / self.zoom + margin)
+
+    def pan(self, dx, dy):
+        """Move the view by (dx, dy) screen pixels"""
+        self.offset -= np.array([dx, dy], dtype=float) / self.zoom
+
+    def zoom_at(self, screen_pos, factor):
+        """Zoom by factor while keeping the world point under screen_pos in place"""
+        anchor = np.array(self.screen_to_world(screen_pos))
+        self.zoom = min(max(self.zoom * factor, self.min_zoom), self.max_zoom)
+        self.offset = anchor - np.array(screen_pos, dtype=float) / self.zoom
+
+    def fit(self, positions, margin=20.0):
+        """Zoom and pan so that all positions are visible"""
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        if not len(positions):
+            self.reset()
+            return
+        low = positions.min(axis=0) - margin
+        size = np.maximum(positions.max(axis=0) + margin - low, 1.0)
+        self.zoom = min(max(min(self.width / size[0], self.height / size[1]), self.min_zoom), self.max_zoom)
+        # Centre the layout on the screen
+        self.offset = low + size / 2 - np.array([self.width, self.height]) / self.zoom / 2
+
+
+def cull_edges(positions, sources, targets, rect):
+    """
+    Return a mask of the edges whose bounding box overlaps rect.
+
+    Edges crossing the view with both ends outside it are kept, so long
+    connections do not disappear when zoomed in.
+    """
+    x0, y0, x1, y1 = rect
+    start = positions[sources]
+    end = positions[targets]
+    return ((np.minimum(start[:, 0], end[:, 0]) <= x1) & (np.maximum(start[:, 0], end[:, 0]) >= x0) &
+            (np.minimum(start[:, 1], end[:, 1]) <= y1) & (np.maximum(start[:, 1], end[:, 1]) >= y0))